@@ -0,0 +1,264 @@
+"""
+Benchmark python_custom_ops_bn against nn.BatchNorm2d.
+
+Sweeps batch / channels / spatial size, dtype, memory format, thread count and
+train / eval mode, and measures wall time, throughput and peak memory for the
+forward, backward and full (forward + backward) step.
+
+Usage:
+    python benchmarks/benchmark_batchnorm.py --output results.json
+    python benchmarks/benchmark_batchnorm.py --output results.json --baseline baseline.json --threshold 0.1
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import torch
+import torch.nn as nn
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_custom_ops_bn import BatchNorm2dCustom, MEMORY_POLICIES
+
+DTYPES = {"float32": torch.float32, "float64": torch.float64, "bfloat16": torch.bfloat16, "float16": torch.float16}
+MEMORY_FORMATS = {"contiguous": torch.contiguous_format, "channels_last": torch.channels_last}
+IMPLS = ("custom", "native")
+MODES = ("train", "eval")
+
+# fields identifying one measurement when comparing against a baseline
+KEY_FIELDS = ("impl", "memory_policy", "N", "C", "H", "W", "dtype", "memory_format", "threads", "mode", "phase")
+
+
+def _synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def measure_peak_memory(fn, device):
+    """Peak bytes allocated while running fn(), or None if it cannot be observed."""
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        baseline = torch.cuda.memory_allocated(device)
+        fn()
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device) - baseline
+
+    # CPU has no allocator statistics; replay allocations recorded by the profiler
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True, record_shapes=True, with_stack=True) as prof:
+        fn()
+    try:
+        from torch.profiler._memory_profiler import Action
+
+        timeline = prof._memory_profile().timeline
+    except Exception:
+        return None
+
+    # key is (TensorKey, version); in-place / out= writes bump the version, so a tensor is usually
+    # destroyed under a later version than it was created with -> match on the TensorKey alone
+    live, peak, sizes = 0, 0, {}
+    for _, action, (tensor, _version), size in timeline:
+        if action == Action.CREATE:
+            sizes[tensor] = size
+            live += size
+            peak = max(peak, live)
+        elif action == Action.DESTROY and tensor in sizes:
+            live -= sizes.pop(tensor)
+    return peak
+
+
+def is_unsupported_config(error):
+    """True if error means the device / dtype cannot run a configuration (skipped, not a failure)."""
+    if isinstance(error, (NotImplementedError, torch.OutOfMemoryError)):
+        return True
+    # e.g. "... not implemented for 'Half'" from kernels without a reduced-precision CPU path
+    return isinstance(error, RuntimeError) and "not implemented for" in str(error)
+
+
+def _time(fn, setup, iters, device):
+    times = []
+    for _ in range(iters):
+        state = setup()
+        _synchronize(device)
+        start = time.perf_counter()
+        fn(state)
+        _synchronize(device)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _make_layer(impl, C, dtype, device, memory_policy):
+    if impl == "custom":
+        layer = BatchNorm2dCustom(C, memory_policy=memory_policy)
+    else:
+        layer = nn.BatchNorm2d(C)
+    # parameters and running statistics stay fp32 for reduced-precision inputs
+    param_dtype = dtype if dtype == torch.float64 else torch.float32
+    return layer.to(device=device, dtype=param_dtype)
+
+
+def benchmark_config(impl, N, C, H, W, dtype, memory_format, threads, mode, device,
+                     warmup=3, iters=10, memory_policy="recompute"):
+    """Measure one configuration; returns one result dict per phase."""
+    torch.set_num_threads(threads)
+    torch.manual_seed(0)
+
+    layer = _make_layer(impl, C, DTYPES[dtype], device, memory_policy).train(mode == "train")
+    input_base = torch.randn(N, C, H, W, device=device, dtype=DTYPES[dtype]).contiguous(
+        memory_format=MEMORY_FORMATS[memory_format]
+    )
+    grad_output = torch.randn_like(input_base)
+
+    def fresh_input():
+        return input_base.detach().requires_grad_(mode == "train")
+
+    def forward(input):
+        if mode == "eval":
+            with torch.inference_mode():
+                return layer(input)
+        return layer(input)
+
+    def step(input):
+        output = forward(input)
+        if mode == "train":
+            output.backward(grad_output)
+
+    phases = {
+        "forward": (lambda: fresh_input(), forward, lambda: forward(fresh_input())),
+    }
+    if mode == "train":
+        phases["backward"] = (
+            lambda: forward(fresh_input()),
+            lambda output: output.backward(grad_output),
+            lambda: forward(fresh_input()).backward(grad_output),
+        )
+        phases["step"] = (lambda: fresh_input(), step, lambda: step(fresh_input()))
+
+    results = []
+    for phase, (setup, fn, run_once) in phases.items():
+        _time(fn, setup, warmup, device)
+        times = _time(fn, setup, iters, device)
+        median = statistics.median(times)
+        results.append({
+            "impl": impl, "N": N, "C": C, "H": H, "W": W, "dtype": dtype,
+            "memory_format": memory_format, "threads": threads, "mode": mode, "phase": phase,
+            "memory_policy": memory_policy if impl == "custom" else None,
+            "median_ms": median * 1e3,
+            "mean_ms": statistics.mean(times) * 1e3,
+            "min_ms": min(times) * 1e3,
+            "throughput_samples_per_s": N / median,
+            "peak_memory_bytes": measure_peak_memory(run_once, device),
+        })
+    return results
+
+
+def run_sweep(args):
+    device = torch.device(args.device)
+    results = []
+    configs = itertools.product(
+        args.batch, args.channels, args.spatial, args.dtypes, args.memory_formats, args.threads, args.modes, args.impls
+    )
+    for N, C, S, dtype, memory_format, threads, mode, impl in configs:
+        label = f"{impl:>6} N={N} C={C} HxW={S}x{S} {dtype} {memory_format} threads={threads} {mode}"
+        try:
+            config_results = benchmark_config(
+                impl, N, C, S, S, dtype, memory_format, threads, mode, device,
+                warmup=args.warmup, iters=args.iters, memory_policy=args.memory_policy,
+            )
+        except RuntimeError as e:
+            if not is_unsupported_config(e):
+                raise
+            print(f"{label}: skipped ({e})")
+            continue
+        for result in config_results:
+            peak = result["peak_memory_bytes"]
+            peak_text = "n/a" if peak is None else f"{peak / 2**20:.1f} MiB"
+            print(f"{label} {result['phase']:>8}: {result['median_ms']:8.3f} ms, "
+                  f"{result['throughput_samples_per_s']:10.1f} samples/s, peak {peak_text}")
+        results.extend(config_results)
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=0.1):
+    """Return the measurements whose time or peak memory grew by more than ``threshold``."""
+    baseline_by_key = {tuple(r.get(f) for f in KEY_FIELDS): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        reference = baseline_by_key.get(tuple(result[f] for f in KEY_FIELDS))
+        if reference is None:
+            continue
+        for metric in ("median_ms", "peak_memory_bytes"):
+            current, previous = result[metric], reference[metric]
+            if current is None or not previous:
+                continue
+            change = current / previous - 1.0
+            if change > threshold:
+                regressions.append({
+                    **{f: result[f] for f in KEY_FIELDS},
+                    "metric": metric, "baseline": previous, "current": current, "change": change,
+                })
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--channels", type=int, nargs="+", default=[64])
+    parser.add_argument("--spatial", type=int, nargs="+", default=[28, 56])
+    parser.add_argument("--dtypes", nargs="+", choices=sorted(DTYPES), default=["float32"])
+    parser.add_argument("--memory-formats", nargs="+", choices=sorted(MEMORY_FORMATS), default=["contiguous"])
+    parser.add_argument("--threads", type=int, nargs="+", default=[torch.get_num_threads()])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--impls", nargs="+", choices=IMPLS, default=list(IMPLS))
+    parser.add_argument("--memory-policy", choices=MEMORY_POLICIES, default="recompute")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown / memory growth reported as a regression (default: 0.1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "device": args.device,
+        },
+        "results": run_sweep(args),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report["results"], baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['impl']} N={r['N']} C={r['C']} HxW={r['H']}x{r['W']} {r['dtype']} "
+                  f"{r['memory_format']} threads={r['threads']} {r['mode']} {r['phase']} {r['metric']}: "
+                  f"{r['baseline']:.4g} -> {r['current']:.4g} ({r['change']:+.1%})")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
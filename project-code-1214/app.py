@@ -1,21 +1,26 @@
 import streamlit as st
 import json
-import requests
 import networkx as nx
 import matplotlib.pyplot as plt
-import time
 import re
-import random
 import ast
+import io
 import os
-from datetime import datetime
 from PIL import Image
 
+from prompt_templates import build_curator_prompt
+from recommender import Recommender
+from thumbnails import ThumbnailCache
+from image_index import INDEX_FILE, ImageHashIndex, build_index, dhash_file
+from inference_client import InferenceClient, InferenceError
+from run_log import RunLog
+
 # ==========================================
 # 1. 설정
 # ==========================================
 st.set_page_config(layout="wide", page_title="Deep Context Art Curator")
-SERVER_URL = "http://localhost:8080/generate"
+SERVER_URL = "http://localhost:8080"
+CURATOR_SEED = 0  # Optimized 모드의 큐레이터 요청은 seed 고정 (서버 캐시 사용)
 IMAGE_DIR = "./images" 
 
 # CSS로 여백 미세 조정 (선택사항)
@@ -38,13 +43,78 @@ def load_db():
     try:
         with open('artgraph_db.json', 'r', encoding='utf-8') as f:
             return json.load(f)
-    except: return {}
+    except (OSError, json.JSONDecodeError): return {}
 
 art_db = load_db()
 
+@st.cache_resource
+def load_recommender():
+    # 추천 색인은 한 번만 생성 (DB 가 바뀌면 recommender.sync(new_db) 로 바뀐 항목만 갱신)
+    return Recommender(art_db)
+
+recommender = load_recommender()
+
+@st.cache_resource
+def load_client():
+    # 세션(스레드)들이 keep-alive 연결 풀과 백그라운드 스레드 풀을 공유
+    return InferenceClient(SERVER_URL)
+
+client = load_client()
+
+@st.cache_resource
+def load_run_log():
+    # 요청마다 runs.jsonl 에 한 줄 (백그라운드에서 모아서 씀) -> python run_log.py report 로 baseline / optimized 비교
+    return RunLog()
+
+run_log = load_run_log()
+
+@st.cache_resource
+def load_thumbnails():
+    # 갤러리는 원본 대신 썸네일 bytes 를 표시 (python thumbnails.py 로 미리 생성 가능, 없으면 처음 볼 때 생성)
+    return ThumbnailCache()
+
+thumbnails = load_thumbnails()
+
+@st.cache_resource
+def load_image_index():
+    # 업로드 이미지를 내용(dHash)으로 찾는 색인: python image_index.py build 로 미리 만든 파일, 없으면 여기서 생성
+    if os.path.exists(INDEX_FILE):
+        return ImageHashIndex.load(INDEX_FILE)
+    return build_index(art_db, IMAGE_DIR)[0]
+
+image_index = load_image_index()
+
+def resolve_upload(up):
+    """업로드 파일 -> (작품 id, 찾은 방법). 파일 이름이 DB 에 있으면 그대로, 아니면 이미지 내용으로 검색"""
+    tid = up.name.split('.')[0]
+    if tid in art_db:
+        return tid, "filename"
+    try:
+        matches = image_index.query(dhash_file(io.BytesIO(up.getvalue())))
+    except (OSError, Image.DecompressionBombError):
+        # 이미지로 읽을 수 없는 파일 -> 내용 검색 없이 "없음" 처리
+        return tid, None
+    if matches:
+        pid, distance = matches[0]
+        return pid, f"image match (distance {distance})"
+    return tid, None
+
 def get_name(rid):
     return ID_MAP.get(str(rid), rid)
 
+REASON_FORMATS = {
+    "artist": "Created by same artist: {}",
+    "style": "Shared Movement: {}",
+    "genre": "Same genre: {}",
+    "material": "Same material: {}",
+}
+
+def recommendation_reason(shared):
+    if shared is None:
+        return "Curatorial Discovery"
+    facet, value = shared
+    return REASON_FORMATS[facet].format(get_name(value))
+
 # ---------------------------------------------------------
 # 추천 로직 (Hybrid)
 # ---------------------------------------------------------
@@ -59,89 +129,50 @@ def get_smart_recommendations(target_id, target_info):
             {"id": "vincent-van-gogh_the-starry-night-1889", "title": "vincent-van-gogh_the-starry-night-1889.jpg", "reason": "Stylistic Contrast (Post-Impressionism)"}
         ]
 
-    # 2. 일반 로직
-    my_meta = target_info.get('metadata', {})
-    my_artists = set(my_meta.get('artist', []))
-    my_styles = set(my_meta.get('style', []))
-    
-    candidates = list(art_db.items())
-    random.shuffle(candidates)
-    
-    for pid, info in candidates:
-        if pid == target_id: continue
-        if len(recs) >= 3: break
-        
-        other_meta = info.get('metadata', {})
-        other_artists = set(other_meta.get('artist', []))
-        other_styles = set(other_meta.get('style', []))
-        
-        common_artist = my_artists & other_artists
-        if common_artist:
-            recs.append({"id": pid, "title": info['title'], "reason": f"Created by same artist: {get_name(list(common_artist)[0])}"})
-            continue
-            
-        common_style = my_styles & other_styles
-        if common_style:
-            recs.append({"id": pid, "title": info['title'], "reason": f"Shared Movement: {get_name(list(common_style)[0])}"})
-            continue
-    
-    while len(recs) < 3:
-        pid, info = random.choice(candidates)
-        if pid != target_id and not any(r['id'] == pid for r in recs):
-             recs.append({"id": pid, "title": info['title'], "reason": "Curatorial Discovery"})
-    
+    # 2. 일반 로직: 역색인 추천 (artist / style / genre / material 가중 overlap, 항상 같은 결과)
+    for r in recommender.recommend(target_id, k=3):
+        recs.append({"id": r["id"], "title": r["title"], "reason": recommendation_reason(r["shared"])})
     return recs
 
-def generate_long_prompt(input_context, recommended_titles):
-    long_text = f"### SYSTEM LOG: Knowledge Graph Retrieval ###\n"
-    for i in range(30):
-        long_text += f"[Step {i+1}] Accessing Ontology Layer... Node verified.\n"
-    
-    long_text += f"\n### INPUT ANALYSIS ###\n{input_context}\n"
-    long_text += f"\n### RECOMMENDATION LIST ###\n"
-    for i, t in enumerate(recommended_titles):
-        long_text += f"{i+1}. {t}\n"
-    return long_text
-
-def save_artifacts(target_id, latency, full_response, is_optimized):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    mode = "optimized" if is_optimized else "baseline"
-    
-    # [New] Throughput 계산 로직 추가
-    # 대략 4글자(Characters) = 1토큰으로 추산 (Llama-2 기준 Rule of Thumb)
-    estimated_tokens = len(full_response) / 4
-    throughput = estimated_tokens / latency if latency > 0 else 0.0
-    
-    # 1. JSON 파일 저장 (상세 데이터)
-    rec_file = f"recommendations_{mode}_{target_id}.json"
-    with open(rec_file, "w", encoding='utf-8') as f:
-        json.dump({
-            "id": target_id, 
-            "mode": mode, 
-            "latency": latency,
-            "estimated_tokens": int(estimated_tokens),
-            "throughput": f"{throughput:.2f} tok/s", # <-- JSON에도 저장
-            "response": full_response
-        }, f, indent=2, ensure_ascii=False)
-    
-    # 2. TXT 리포트 저장 (한 줄 요약 - 교수님 보여드리기 용)
-    rep_file = f"final_report_{mode}.txt"
-    log_line = (
-        f"[{timestamp}] Mode: {mode} | ID: {target_id} | "
-        f"Latency: {latency:.4f}s | "
-        f"Throughput: {throughput:.2f} tok/s\n" # <-- 여기에 추가됨!
-    )
-    
-    with open(rep_file, "a", encoding='utf-8') as f:
-        f.write(log_line)
-        
-    return rec_file, rep_file
+def curator_prompt(info, rec_titles):
+    return build_curator_prompt(info.get('context_text', ''), rec_titles)
+
+def log_prefetch(future, artwork_id):
+    """prefetch 결과를 실행 기록에 추가 (mode "prefetch": 화면에 보인 생성과 따로 집계). 실패(429 / 503 / 연결 실패)도 기록"""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        run_log.record("prefetch", "art_curator", "error", artwork_id=artwork_id, error=str(error))
+    else:
+        run_log.record("prefetch", "art_curator", artwork_id=artwork_id, latency_s=future.result().latency_s)
+
+def prefetch_commentaries(recs):
+    """추천 작품들의 코멘터리를 백그라운드에서 미리 생성 (seed 고정 -> 서버 응답 캐시에 저장됨).
+    사용자가 추천 작품을 이어서 보면 바로 캐시에서 반환. batch 우선순위라 대화형 요청을 밀어내지 않음"""
+    for r in recs:
+        info = art_db.get(r['id'])
+        if info is None:
+            continue
+        # 추천 작품을 열었을 때와 같은 프롬프트 (그 작품의 추천 목록 포함) -> 같은 캐시 키
+        rec_titles = [x['title'] for x in get_smart_recommendations(r['id'], info)]
+        future = client.submit(client.generate, curator_prompt(info, rec_titles), "art_curator", 256,
+                               seed=CURATOR_SEED, priority="batch")
+        future.add_done_callback(lambda f, pid=r['id']: log_prefetch(f, pid))
+
+def log_generation(gen, mode, adapter, artwork_id=None, error=None):
+    """스트리밍 생성 하나를 실행 기록에 추가 (토큰 수는 서버가 보낸 usage, 서버 캐시 적중이면 없음)"""
+    run_log.record(mode, adapter, "error" if error else "success", artwork_id=artwork_id,
+                   prompt_tokens=gen.usage.get("prompt_tokens"), completion_tokens=gen.usage.get("completion_tokens"),
+                   cached_tokens=gen.usage.get("cached_tokens"), ttft_s=gen.ttft_s, latency_s=gen.latency_s,
+                   error=error)
 # ==========================================
 # 3. UI 구성
 # ==========================================
 st.sidebar.title("🛠️ Config")
 test_mode = st.sidebar.radio("Mode:", ["Optimized", "Baseline"])
 is_opt = True if "Optimized" in test_mode else False
+mode = "optimized" if is_opt else "baseline"
 
 st.sidebar.markdown("---")
 st.sidebar.title("💬 Chat")
@@ -151,14 +182,16 @@ for msg in st.session_state.messages: st.sidebar.chat_message(msg["role"]).write
 if prompt := st.sidebar.chat_input("Ask about art..."):
     st.session_state.messages.append({"role": "user", "content": prompt})
     st.sidebar.chat_message("user").write(prompt)
+    gen = client.stream(prompt, "chat_bot", 100, timeout=5)
     try:
-        res = requests.post(SERVER_URL, json={"prompt": prompt, "adapter_type": "chat_bot", "max_tokens": 100}, timeout=5)
-        if res.status_code == 200:
-            ans = res.json().get("response", "")
-            full = f"{ans}\n\n*(Latency: {time.time()-time.time():.2f}s)*"
-            st.session_state.messages.append({"role": "assistant", "content": full})
-            st.sidebar.chat_message("assistant").write(ans)
-    except: st.sidebar.error("Fail")
+        # 토큰이 도착하는 대로 바로 화면에 출력
+        ans = st.sidebar.chat_message("assistant").write_stream(gen)
+        full = f"{ans}\n\n*(Latency: {gen.latency_s:.2f}s)*"
+        st.session_state.messages.append({"role": "assistant", "content": full})
+        log_generation(gen, mode, "chat_bot")
+    except InferenceError as e:
+        log_generation(gen, mode, "chat_bot", error=str(e))
+        st.sidebar.error(f"Chat failed: {e}")
 
 st.title("🎨 Art-KG Curator Demo")
 
@@ -173,7 +206,9 @@ with col1:
         tid = None
         if up:
             st.image(up, use_container_width=True) # 꽉 차게
-            tid = up.name.split('.')[0]
+            tid, matched_by = resolve_upload(up)
+            if matched_by and matched_by != "filename":
+                st.caption(f"🔎 Resolved by {matched_by}")
         else:
             st.info("Waiting for upload...")
 
@@ -191,58 +226,58 @@ if tid and tid in art_db:
 
             if st.button("🚀 Analyze & Recommend", type="primary"):
                 recs = get_smart_recommendations(tid, info)
-                rec_titles = [r['title'] for r in recs]
-                
-                long_ctx = generate_long_prompt(info.get('context_text', ''), rec_titles)
-                
-                # [핵심] 프롬프트 개선: 예시(One-shot)를 넣어서 말투 고정
-                final_input = (
-                    f"{long_ctx}\n\n"
-                    "### INSTRUCTION ###\n"
-                    "1. Act as a professional Art Curator. Write a **cohesive, narrative commentary** explaining the connection between the INPUT artwork and the RECOMMENDATION LIST.\n"
-                    "2. Do NOT repeat the task instructions. Do NOT use prefixes like 'Response:'. Just write the paragraph in full sentence.\n\n"
-                    "3. Few shot: IDEAL OUTPUT EXAMPLE is as follows(Follow the style below)):\n"
-                    "- The water-lilies-6.jpg is a photo captured by Claude Monet in 1899 in France. Water Lillies is a Japanese-style garden that was built in the 1890s for Monet, who suffered from severe asthma. In his water garden, he had three ponds connected by small waterfalls. The Japanese-style garden was created to relax and reflect, and the pond’s lily pads were a place where Claude Monet could sit and paint. Claude Monet was influenced by the Japanese school of painting, especially the impressionists.\n\n"
-                )
+                final_input = curator_prompt(info, [r['title'] for r in recs])
                 
                 box = st.empty()
                 box.info("Inference Running on GPU...")
                 
                 try:
-                    t0 = time.time()
-                    resp = requests.post(SERVER_URL, json={"prompt": final_input, "adapter_type": "art_curator", "max_tokens": 256}, timeout=60)
-                    lat = time.time() - t0
+                    st.markdown("### 🧠 Curator's Commentary")
+                    commentary_box = st.empty()
+
+                    # [스트리밍] 토큰이 생성되는 대로 코멘터리를 갱신
+                    gen = client.stream(final_input, "art_curator", 256, seed=CURATOR_SEED if is_opt else None)
+                    comm = ""
+                    for delta in gen:
+                        comm += delta
+                        commentary_box.markdown(f">{comm}")
+                    ttft, lat = gen.ttft_s, gen.latency_s
+                    if is_opt:
+                        prefetch_commentaries(recs)
+
+                    # 혹시 모를 태그 제거 (후처리)
+                    comm = comm.replace("ArtCurator:", "").replace("RESPONSE:", "").strip()
+                    
+                    ttft_text = "n/a" if ttft is None else f"{ttft:.4f}s"
+                    box.success(f"Done! (TTFT: {ttft_text} | Latency: {lat:.4f}s)")
+                    log_generation(gen, mode, "art_curator", artwork_id=tid)
+                    
+                    # 텍스트가 넓게 보이도록 마크다운 활용
+                    commentary_box.markdown(f">{comm}") 
                     
-                    if resp.status_code == 200:
-                        comm = resp.json().get("response", "")
-                        
-                        # 혹시 모를 태그 제거 (후처리)
-                        comm = comm.replace("ArtCurator:", "").replace("RESPONSE:", "").strip()
-                        
-                        box.success(f"Done! (Latency: {lat:.4f}s)")
-                        save_artifacts(tid, lat, comm, is_opt)
-                        
-                        st.markdown("### 🧠 Curator's Commentary")
-                        # 텍스트가 넓게 보이도록 마크다운 활용
-                        st.markdown(f">{comm}") 
-                        
-                        st.markdown("---")
-                        st.markdown("### 🖼️ Recommended Gallery")
-                        
-                        cols = st.columns(3)
-                        for i, r in enumerate(recs):
-                            with cols[i]:
-                                img_path = os.path.join(IMAGE_DIR, r['title'])
-                                if os.path.exists(img_path):
-                                    st.image(Image.open(img_path), use_container_width=True)
-                                else:
-                                    st.warning(f"No Image: {r['title']}")
-                                
-                                st.caption(f"**{r['reason']}**")
-                                
-                    else:
-                        box.error("Server Error")
+                    st.markdown("---")
+                    st.markdown("### 🖼️ Recommended Gallery")
+                    
+                    cols = st.columns(3)
+                    for i, r in enumerate(recs):
+                        with cols[i]:
+                            try:
+                                thumb = thumbnails.get(os.path.join(IMAGE_DIR, r['title']))
+                            except (OSError, Image.DecompressionBombError) as e:
+                                thumb = None
+                                st.warning(f"Unreadable Image: {r['title']} ({e})")
+                            if thumb is not None:
+                                st.image(thumb, use_container_width=True)
+                            elif not os.path.exists(os.path.join(IMAGE_DIR, r['title'])):
+                                st.warning(f"No Image: {r['title']}")
+                            
+                            st.caption(f"**{r['reason']}**")
+                            
+                except InferenceError as e:
+                    log_generation(gen, mode, "art_curator", artwork_id=tid, error=str(e))
+                    box.error(f"Error: {e}")
                 except Exception as e:
+                    # 갤러리 (썸네일 생성 / 이미지 읽기) 등 추론 외의 오류도 페이지 대신 메시지로
                     box.error(f"Error: {e}")
 elif tid:
     with col2: 
@@ -0,0 +1,155 @@
+# image_index.py
+# 업로드된 이미지를 파일 이름이 아니라 내용으로 찾기 위한 perceptual hash (dHash, 64bit) 색인
+#
+#   색인 생성 (오프라인, 한 번):  python image_index.py build --db artgraph_db.json --image-dir images
+#   조회:                         python image_index.py query some_upload.jpg
+#
+# 조회는 multi-index hashing: 64bit 해시를 16bit 조각 4개로 나눠 조각별 dict 에 넣어 둠.
+# 해밍 거리 r 이내인 해시는 적어도 한 조각이 r // 4 비트 이내로 같으므로 (비둘기집 원리),
+# 그 범위의 조각 값만 dict 에서 찾아 후보를 모은 뒤 실제 거리를 계산 -> 카탈로그 크기에 거의 무관.
+import argparse
+import json
+import os
+from collections import defaultdict
+from itertools import combinations
+
+from PIL import Image, ImageOps
+
+INDEX_FILE = "image_hashes.json"
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+MAX_DISTANCE = 10          # 이 거리 이내면 같은 작품으로 봄 (재압축 / 크기 변경 / 약간의 색 보정)
+
+
+def dhash(image):
+    """difference hash: 9x8 흑백으로 줄인 뒤 가로로 이웃한 픽셀의 밝기 비교 -> 64bit 정수"""
+    image.draft("L", (64, 64))
+    small = ImageOps.exif_transpose(image).convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = small.tobytes()      # L 모드: 픽셀당 1 byte
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def dhash_file(path):
+    with Image.open(path) as image:
+        return dhash(image)
+
+
+def _flip_masks(bits, max_flips):
+    """bits 비트 중 max_flips 개 이하를 뒤집는 xor 마스크들"""
+    for n in range(max_flips + 1):
+        for positions in combinations(range(bits), n):
+            mask = 0
+            for p in positions:
+                mask |= 1 << p
+            yield mask
+
+
+class ImageHashIndex:
+    def __init__(self):
+        self._hashes = {}                                        # 작품 id -> 해시
+        self._tables = [defaultdict(set) for _ in range(CHUNKS)]  # 조각 값 -> 작품 id 집합
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _chunks(self, value):
+        mask = (1 << CHUNK_BITS) - 1
+        return [(value >> (i * CHUNK_BITS)) & mask for i in range(CHUNKS)]
+
+    def add(self, pid, value):
+        self.remove(pid)
+        self._hashes[pid] = value
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            table[chunk].add(pid)
+
+    def remove(self, pid):
+        value = self._hashes.pop(pid, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            table[chunk].discard(pid)
+            if not table[chunk]:
+                del table[chunk]
+
+    def query(self, value, max_distance=MAX_DISTANCE, k=1):
+        """해밍 거리 max_distance 이내인 작품 [(id, 거리)] 최대 k개 (거리, id 순)"""
+        candidates = set()
+        masks = list(_flip_masks(CHUNK_BITS, max_distance // CHUNKS))
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket:
+                    candidates |= bucket
+        matches = []
+        for pid in candidates:
+            distance = (self._hashes[pid] ^ value).bit_count()
+            if distance <= max_distance:
+                matches.append((distance, pid))
+        matches.sort()
+        return [(pid, distance) for distance, pid in matches[:k]]
+
+    def save(self, path=INDEX_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"hash": "dhash", "bits": HASH_BITS,
+                       "hashes": {pid: f"{value:016x}" for pid, value in sorted(self._hashes.items())}}, f)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls()
+        for pid, text in data["hashes"].items():
+            index.add(pid, int(text, 16))
+        return index
+
+
+def build_index(art_db, image_dir):
+    """artgraph_db.json 이 가리키는 이미지 (image_dir/title) 중 실제로 있는 것만 색인. (색인, 없는 이미지 수)"""
+    index = ImageHashIndex()
+    missing = 0
+    for pid, info in sorted(art_db.items()):
+        path = os.path.join(image_dir, info.get('title', pid))
+        if not os.path.exists(path):
+            missing += 1
+            continue
+        index.add(pid, dhash_file(path))
+    return index, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual-hash index for content-based upload lookup.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="hash every image referenced by the DB and save the index")
+    build.add_argument("--db", default="artgraph_db.json")
+    build.add_argument("--image-dir", default="./images")
+    build.add_argument("--out", default=INDEX_FILE)
+    query = sub.add_parser("query", help="find the artwork matching an image file")
+    query.add_argument("image")
+    query.add_argument("--index", default=INDEX_FILE)
+    query.add_argument("--max-distance", type=int, default=MAX_DISTANCE)
+    query.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with open(args.db, 'r', encoding='utf-8') as f:
+            art_db = json.load(f)
+        index, missing = build_index(art_db, args.image_dir)
+        index.save(args.out)
+        print(f">>> Indexed {len(index)} images ({missing} DB entries without an image file) -> {args.out}")
+        return
+
+    index = ImageHashIndex.load(args.index)
+    matches = index.query(dhash_file(args.image), args.max_distance, args.k)
+    if not matches:
+        print("No match")
+    for pid, distance in matches:
+        print(f"  distance {distance:2d}  {pid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# inference_client.py
+# 추론 서버(/generate, /generate_stream) 클라이언트: keep-alive 연결 풀 + 재시도 + 타임아웃 + 동시 요청
+#
+#   client = InferenceClient()                          # 프로세스당 하나 (app.py 는 st.cache_resource)
+#   gen = client.stream(prompt, "chat_bot", 100)        # SSE: for delta in gen: ... -> gen.ttft_s / gen.latency_s / gen.usage
+#   res = client.generate(prompt, "art_curator", 256)   # 한 번에: res.text / res.latency_s
+#   fut = client.submit(client.generate, prompt, ...)   # 스레드 풀에서 실행 -> concurrent.futures.Future
+#
+# 요청마다 연결을 새로 열지 않고 requests.Session 의 연결 풀을 재사용. 재시도는 연결 실패와
+# 서버가 바로 거절한 응답(503 부하 차단 / 502 / 504)만 -> 생성이 이미 시작된 요청을 중복 실행하지 않음.
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "http://localhost:8080"
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 60.0        # 스트리밍에서는 토큰 사이 최대 대기 시간
+RETRIES = 2
+BACKOFF = 0.3              # 재시도 간격 0.3s, 0.6s, ... (Retry-After 헤더가 있으면 그 값)
+POOL_SIZE = 8
+MAX_WORKERS = 4
+RETRY_STATUS = (502, 503, 504)
+
+
+class InferenceError(Exception):
+    """연결 실패 / HTTP 오류 / 서버가 보낸 생성 오류"""
+
+
+class Generation:
+    """스트리밍 생성 하나. 순회하면 텍스트 조각(delta)을 yield 하고, 끝나면 측정값이 채워짐"""
+
+    def __init__(self, client, payload, timeout):
+        self._client = client
+        self._payload = payload
+        self._timeout = timeout
+        self.text = ""
+        self.ttft_s = None
+        self.latency_s = None
+        self.usage = {}
+        self.cached = False
+
+    def __iter__(self):
+        t0 = time.perf_counter()
+        try:
+            with self._client.session.post(self._client.url("/generate_stream"), json=self._payload,
+                                           stream=True, timeout=self._timeout) as res:
+                _check_status(res)
+                for line in res.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    try:
+                        event = json.loads(line[len("data:"):])
+                    except ValueError as e:
+                        raise InferenceError(f"malformed stream event: {line[:80]!r}") from e
+                    if "error" in event:
+                        raise InferenceError(event["error"])
+                    if event.get("done"):
+                        self.usage = event.get("usage") or {}
+                        self.cached = event.get("cached", False)
+                        break
+                    delta = event.get("delta", "")
+                    if self.ttft_s is None and delta:
+                        self.ttft_s = time.perf_counter() - t0
+                    self.text += delta
+                    yield delta
+        except requests.RequestException as e:
+            raise InferenceError(_describe(e)) from e
+        finally:
+            self.latency_s = time.perf_counter() - t0
+
+    def result(self):
+        """끝까지 받은 뒤 자기 자신 반환 (스트리밍이 필요 없을 때)"""
+        for _ in self:
+            pass
+        return self
+
+
+class GenerationResult:
+    def __init__(self, text, latency_s, cached):
+        self.text = text
+        self.latency_s = latency_s
+        self.cached = cached
+
+
+def _check_status(res):
+    """HTTP 오류 응답 -> 서버가 보낸 detail 을 담은 InferenceError (스트리밍 응답도 닫히기 전에 본문을 읽음)"""
+    if res.ok:
+        return
+    try:
+        detail = res.json().get("detail")
+    except ValueError:
+        detail = None
+    raise InferenceError(f"HTTP {res.status_code}" + (f": {detail}" if detail else ""))
+
+
+def _describe(e):
+    if isinstance(e, requests.Timeout):
+        return "inference server timed out"
+    if isinstance(e, requests.ConnectionError):
+        return "cannot reach inference server"
+    return type(e).__name__
+
+
+class InferenceClient:
+    def __init__(self, base_url=BASE_URL, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, pool_size=POOL_SIZE, max_workers=MAX_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        retry = Retry(total=retries, connect=retries, read=0, status=retries,
+                      status_forcelist=RETRY_STATUS, allowed_methods=frozenset({"GET", "POST"}),
+                      backoff_factor=backoff, respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+    def url(self, path):
+        return self.base_url + path
+
+    def _timeout(self, read_timeout):
+        return (self.connect_timeout, self.read_timeout if read_timeout is None else read_timeout)
+
+    @staticmethod
+    def _payload(prompt, adapter_type, max_tokens, seed, priority):
+        payload = {"prompt": prompt, "adapter_type": adapter_type, "max_tokens": max_tokens}
+        if seed is not None:
+            # seed 고정 -> 같은 프롬프트는 서버 응답 캐시에서 바로 반환됨
+            payload["seed"] = seed
+        if priority is not None:
+            payload["priority"] = priority
+        return payload
+
+    def stream(self, prompt, adapter_type="chat_bot", max_tokens=128, seed=None, priority=None, timeout=None):
+        """/generate_stream 요청. 순회를 시작할 때 전송됨"""
+        return Generation(self, self._payload(prompt, adapter_type, max_tokens, seed, priority), self._timeout(timeout))
+
+    def generate(self, prompt, adapter_type="chat_bot", max_tokens=128, seed=None, priority=None, timeout=None):
+        """/generate 요청 -> GenerationResult"""
+        t0 = time.perf_counter()
+        try:
+            res = self.session.post(self.url("/generate"), json=self._payload(prompt, adapter_type, max_tokens, seed, priority),
+                                    timeout=self._timeout(timeout))
+            _check_status(res)
+            body = res.json()
+        except requests.RequestException as e:
+            raise InferenceError(_describe(e)) from e
+        if body.get("status") != "success":
+            raise InferenceError(body.get("detail", "generation failed"))
+        return GenerationResult(body["response"], time.perf_counter() - t0, body.get("cached", False))
+
+    def submit(self, fn, *args, **kwargs):
+        """fn 을 클라이언트 스레드 풀에서 실행 (예: client.submit(client.generate, prompt, ...))"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def generate_many(self, prompts, adapter_type="art_curator", max_tokens=256, seed=None, priority=None, timeout=None):
+        """여러 프롬프트를 동시에 /generate -> 같은 순서의 [GenerationResult 또는 InferenceError]"""
+        futures = [self.submit(self.generate, p, adapter_type, max_tokens, seed, priority, timeout) for p in prompts]
+        results = []
+        for f in futures:
+            try:
+                results.append(f.result())
+            except InferenceError as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
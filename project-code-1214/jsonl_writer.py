@@ -0,0 +1,61 @@
+# jsonl_writer.py
+# JSONL 파일에 한 줄씩 기록을 덧붙이는 버퍼 writer (run_log.RunLog, server/serving_metrics 요청 로그가 공유)
+#
+#   writer = BufferedJsonlWriter("runs.jsonl")
+#   writer.write({"request_id": ..., ...})    # 큐에 넣기만 함
+#   writer.close()                            # 남은 기록을 모두 쓰고 종료 (프로세스 종료 시에도 자동 호출)
+#
+# write() 는 큐에 넣기만 하고, 백그라운드 스레드가 flush_every 개 또는 flush_interval_s 초마다 모아서 한 번에 write
+# -> 요청 경로(이벤트 루프 / Streamlit 스크립트)에서 파일 I/O 없음.
+import atexit
+import json
+import queue
+import threading
+import time
+
+FLUSH_EVERY = 32           # 이만큼 모이면 바로 write
+FLUSH_INTERVAL_S = 1.0     # 덜 모여도 이 시간이 지나면 write
+
+
+class BufferedJsonlWriter:
+    def __init__(self, path, flush_every=FLUSH_EVERY, flush_interval_s=FLUSH_INTERVAL_S, name="jsonl-writer"):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval_s = flush_interval_s
+        self.written = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name=name, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        """기록 하나 추가 (JSON 으로 직렬화 가능한 dict). 파일에는 백그라운드에서 씀"""
+        self._queue.put(entry)
+
+    def _run(self):
+        done = False
+        while not done:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.flush_every:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:       # close()
+                    done = True
+                    break
+                batch.append(entry)
+            if batch:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in batch))
+                self.written += len(batch)
+
+    def close(self):
+        """남은 기록을 모두 쓰고 writer 스레드 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
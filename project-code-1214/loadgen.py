@@ -0,0 +1,297 @@
+# loadgen.py
+# /generate_stream 부하 생성기 + 지연시간 벤치마크
+#
+#   closed-loop (동시 사용자 N명이 응답을 받자마자 다음 요청):
+#     python loadgen.py --concurrency 8 --num-requests 200 --output run_optimized.json
+#   open-loop (Poisson 도착, 초당 rate 개):
+#     python loadgen.py --rate 4 --num-requests 200 --output run_baseline.json
+#   두 실행 비교:
+#     python loadgen.py --compare run_baseline.json run_optimized.json
+#   prefix caching 효과 (같은 optimized 서버에서 프롬프트 템플릿만 바꿔 비교):
+#     python loadgen.py --template curator-v1 --label v1 --output run_v1.json
+#     python loadgen.py --template curator-v2 --label v2 --output run_v2.json
+#   요청별 결과를 실행 기록(run_log.py)에도 추가 -> python run_log.py report 로 여러 실행 누적 비교:
+#     python loadgen.py --label optimized --run-log runs.jsonl
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from prompt_templates import DEFAULT_TEMPLATE, PROMPT_TEMPLATES, build_curator_prompt
+from recommender import Recommender
+from run_log import RunLog
+
+STREAM_URL = "http://localhost:8080/generate_stream"
+DB_FILE = "artgraph_db.json"
+
+CHAT_TEMPLATES = [
+    "Who painted {title}?",
+    "Tell me briefly about {title}.",
+    "What art movement does {title} belong to?",
+    "Describe the colors used in {title}.",
+]
+
+# 요약 / 비교에 쓰는 지표
+SUMMARY_METRICS = [
+    "throughput_req_s", "goodput_req_s", "output_tok_s", "error_rate",
+    "latency_p50_s", "latency_p95_s", "latency_p99_s",
+    "ttft_p50_s", "ttft_p95_s", "ttft_p99_s", "tpot_p50_s", "prefix_cache_hit_rate",
+]
+
+
+def build_workload(art_db, num_requests, curator_fraction, seed, template=DEFAULT_TEMPLATE):
+    """긴 큐레이터 프롬프트와 짧은 chat_bot 프롬프트를 섞은 요청 목록 (seed 가 같으면 같은 워크로드)"""
+    rng = random.Random(seed)
+    ids = sorted(art_db)
+    recommender = Recommender(art_db)
+    workload = []
+    for _ in range(num_requests):
+        pid = rng.choice(ids)
+        info = art_db[pid]
+        if rng.random() < curator_fraction:
+            prompt = build_curator_prompt(info.get('context_text', ''), [r["title"] for r in recommender.recommend(pid, k=3)], template)
+            workload.append({"prompt": prompt, "adapter_type": "art_curator", "max_tokens": 256})
+        else:
+            title = info.get('title', pid).rsplit('.', 1)[0]
+            prompt = rng.choice(CHAT_TEMPLATES).format(title=title)
+            workload.append({"prompt": prompt, "adapter_type": "chat_bot", "max_tokens": 100})
+    return workload
+
+
+def send_request(session, url, payload, timeout):
+    """스트리밍 요청 하나 실행 -> 측정 결과 dict"""
+    result = {"adapter": payload["adapter_type"], "ok": False, "ttft_s": None, "latency_s": None,
+              "prompt_tokens": None, "cached_tokens": None, "completion_tokens": None, "error": None}
+    t0 = time.perf_counter()
+    try:
+        with session.post(url, json=payload, stream=True, timeout=timeout) as res:
+            if res.status_code != 200:
+                result["error"] = f"HTTP {res.status_code}"
+                return result
+            for line in res.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):])
+                if "error" in event:
+                    result["error"] = event["error"]
+                    return result
+                if event.get("done"):
+                    result["ok"] = True
+                    usage = event.get("usage") or {}
+                    result["prompt_tokens"] = usage.get("prompt_tokens")
+                    result["cached_tokens"] = usage.get("cached_tokens")
+                    result["completion_tokens"] = usage.get("completion_tokens")
+                    break
+                if result["ttft_s"] is None and event.get("delta"):
+                    result["ttft_s"] = time.perf_counter() - t0
+    except requests.RequestException as e:
+        result["error"] = type(e).__name__
+    finally:
+        result["latency_s"] = time.perf_counter() - t0
+    return result
+
+
+def run_closed_loop(workload, url, concurrency, timeout):
+    results = [None] * len(workload)
+    next_index = iter(range(len(workload)))
+    lock = threading.Lock()
+
+    def user():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            results[i] = {"start_s": time.perf_counter() - start, **send_request(session, url, workload[i], timeout)}
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - start
+
+
+def run_open_loop(workload, url, rate, seed, max_inflight, timeout):
+    """Poisson 도착: 응답을 기다리지 않고 평균 rate req/s 로 요청을 보냄"""
+    rng = random.Random(seed + 1)
+    local = threading.local()
+
+    def task(i, start_s):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return {"start_s": start_s, **send_request(local.session, url, workload[i], timeout)}
+
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        next_arrival = 0.0
+        for i in range(len(workload)):
+            delay = start + next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(task, i, time.perf_counter() - start))
+            next_arrival += rng.expovariate(rate)
+        results = [f.result() for f in futures]
+    return results, time.perf_counter() - start
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(results, duration_s, slo_ttft_s, slo_latency_s):
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["latency_s"] for r in ok]
+    ttfts = [r["ttft_s"] for r in ok if r["ttft_s"] is not None]
+    tpots = [(r["latency_s"] - r["ttft_s"]) / (r["completion_tokens"] - 1)
+             for r in ok if r["ttft_s"] is not None and (r["completion_tokens"] or 0) > 1]
+    # goodput: SLO(TTFT, 전체 지연시간)를 만족한 성공 요청만 계산
+    good = [r for r in ok if r["ttft_s"] is not None and r["ttft_s"] <= slo_ttft_s and r["latency_s"] <= slo_latency_s]
+    tokens = sum(r["completion_tokens"] or 0 for r in ok)
+    # 프롬프트 토큰 중 prefix cache 로 prefill 을 건너뛴 비율
+    prompt_tokens = sum(r.get("prompt_tokens") or 0 for r in ok)
+    cached_tokens = sum(r.get("cached_tokens") or 0 for r in ok)
+
+    summary = {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "error_rate": 1 - len(ok) / len(results) if results else 0.0,
+        "duration_s": duration_s,
+        "throughput_req_s": len(ok) / duration_s,
+        "goodput_req_s": len(good) / duration_s,
+        "output_tok_s": tokens / duration_s,
+        "tpot_p50_s": percentile(tpots, 50),
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "prefix_cache_hit_rate": cached_tokens / prompt_tokens if prompt_tokens else None,
+    }
+    for q in (50, 95, 99):
+        summary[f"latency_p{q}_s"] = percentile(latencies, q)
+        summary[f"ttft_p{q}_s"] = percentile(ttfts, q)
+    summary["by_adapter"] = {
+        adapter: {
+            "requests": len(rs),
+            "latency_p50_s": percentile([r["latency_s"] for r in rs if r["ok"]], 50),
+            "latency_p95_s": percentile([r["latency_s"] for r in rs if r["ok"]], 95),
+            "ttft_p95_s": percentile([r["ttft_s"] for r in rs if r["ok"] and r["ttft_s"] is not None], 95),
+        }
+        for adapter in sorted({r["adapter"] for r in results})
+        for rs in [[r for r in results if r["adapter"] == adapter]]
+    }
+    return summary
+
+
+def print_summary(summary, label=""):
+    def fmt(v):
+        return "n/a" if v is None else f"{v:.4f}"
+
+    print(f"=== {label} ===")
+    print(f"requests: {summary['requests']} (ok {summary['succeeded']}, error rate {summary['error_rate']:.1%}) "
+          f"in {summary['duration_s']:.1f}s")
+    print(f"throughput: {summary['throughput_req_s']:.2f} req/s | goodput: {summary['goodput_req_s']:.2f} req/s | "
+          f"{summary['output_tok_s']:.1f} tok/s")
+    print(f"latency p50/p95/p99: {fmt(summary['latency_p50_s'])} / {fmt(summary['latency_p95_s'])} / "
+          f"{fmt(summary['latency_p99_s'])} s")
+    print(f"TTFT    p50/p95/p99: {fmt(summary['ttft_p50_s'])} / {fmt(summary['ttft_p95_s'])} / "
+          f"{fmt(summary['ttft_p99_s'])} s | TPOT p50: {fmt(summary['tpot_p50_s'])} s")
+    print(f"prefill: {summary['prompt_tokens']} prompt tokens, {summary['cached_tokens']} from prefix cache "
+          f"(hit rate {fmt(summary['prefix_cache_hit_rate'])})")
+    for adapter, s in summary["by_adapter"].items():
+        print(f"  {adapter:>12}: {s['requests']} req, latency p50 {fmt(s['latency_p50_s'])} s, "
+              f"p95 {fmt(s['latency_p95_s'])} s, TTFT p95 {fmt(s['ttft_p95_s'])} s")
+
+
+def compare_runs(path_a, path_b):
+    """두 실행 결과(JSON)의 요약 지표를 나란히 출력"""
+    with open(path_a, 'r', encoding='utf-8') as f:
+        run_a = json.load(f)
+    with open(path_b, 'r', encoding='utf-8') as f:
+        run_b = json.load(f)
+
+    name_a = run_a["config"].get("label") or path_a
+    name_b = run_b["config"].get("label") or path_b
+    print(f"{'metric':<18} {name_a:>16} {name_b:>16} {'change':>9}")
+    for metric in SUMMARY_METRICS:
+        a, b = run_a["summary"].get(metric), run_b["summary"].get(metric)
+        change = f"{b / a - 1:+.1%}" if a and b is not None else "n/a"
+        a_text = "n/a" if a is None else f"{a:.4f}"
+        b_text = "n/a" if b is None else f"{b:.4f}"
+        print(f"{metric:<18} {a_text:>16} {b_text:>16} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the /generate_stream API.")
+    parser.add_argument("--url", default=STREAM_URL)
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--curator-fraction", type=float, default=0.3, help="share of long art_curator prompts")
+    parser.add_argument("--template", choices=sorted(PROMPT_TEMPLATES), default=DEFAULT_TEMPLATE,
+                        help="curator prompt template version")
+    parser.add_argument("--concurrency", type=int, default=4, help="closed-loop users (ignored with --rate)")
+    parser.add_argument("--rate", type=float, help="open-loop Poisson arrival rate (req/s)")
+    parser.add_argument("--max-inflight", type=int, default=256, help="open-loop client thread limit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--slo-ttft", type=float, default=1.0, help="goodput SLO for TTFT (s)")
+    parser.add_argument("--slo-latency", type=float, default=10.0, help="goodput SLO for end-to-end latency (s)")
+    parser.add_argument("--label", help="name of this run in --compare output (e.g. baseline)")
+    parser.add_argument("--output", help="write config, summary and per-request results to this JSON file")
+    parser.add_argument("--run-log", help="also append every request to this run log (JSONL, mode = --label)")
+    parser.add_argument("--compare", nargs=2, metavar=("RUN_A", "RUN_B"), help="compare two --output files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_runs(*args.compare)
+        return
+
+    with open(args.db, 'r', encoding='utf-8') as f:
+        art_db = json.load(f)
+    workload = build_workload(art_db, args.num_requests, args.curator_fraction, args.seed, args.template)
+
+    if args.rate:
+        mode = f"open-loop Poisson {args.rate} req/s"
+        results, duration = run_open_loop(workload, args.url, args.rate, args.seed, args.max_inflight, args.timeout)
+    else:
+        mode = f"closed-loop concurrency {args.concurrency}"
+        results, duration = run_closed_loop(workload, args.url, args.concurrency, args.timeout)
+
+    summary = summarize(results, duration, args.slo_ttft, args.slo_latency)
+    print_summary(summary, f"{args.label or 'run'}: {mode}")
+
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "config": config,
+                "summary": summary,
+                "results": results,
+            }, f, indent=2)
+        print(f">>> Results written to {args.output}")
+
+    if args.run_log:
+        run_log = RunLog(args.run_log)
+        for r in results:
+            run_log.record(args.label or "run", r["adapter"], "success" if r["ok"] else "error",
+                           prompt_tokens=r["prompt_tokens"], completion_tokens=r["completion_tokens"],
+                           cached_tokens=r["cached_tokens"], ttft_s=r["ttft_s"], latency_s=r["latency_s"],
+                           error=r["error"])
+        run_log.close()
+        print(f">>> {run_log.written} requests appended to {args.run_log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# precompute_commentary.py
+# artgraph_db.json 의 모든 작품에 대한 큐레이터 코멘터리를 /generate_batch 로 일괄 생성
+#   python precompute_commentary.py --output commentary_all.json
+import argparse
+import json
+import time
+
+import requests
+
+from prompt_templates import build_curator_prompt
+from recommender import Recommender
+
+BATCH_URL = "http://localhost:8080/generate_batch"
+DB_FILE = "artgraph_db.json"
+
+
+def iter_batch_results(items, url, timeout):
+    """/generate_batch (stream=True) 결과를 항목이 끝나는 대로 yield"""
+    with requests.post(url, json={"items": items, "stream": True}, stream=True, timeout=timeout) as res:
+        res.raise_for_status()
+        for line in res.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            if event.get("done"):
+                break
+            yield event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute curator commentary for every artwork in the DB.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--output", default="commentary_all.json")
+    parser.add_argument("--url", default=BATCH_URL)
+    parser.add_argument("--batch-size", type=int, default=64, help="items per /generate_batch call (server max 256)")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0, help="fixed seed, so results are reproducible / cacheable")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    with open(args.db, 'r', encoding='utf-8') as f:
+        art_db = json.load(f)
+    ids = sorted(art_db)
+    recommender = Recommender(art_db)
+
+    results = {}
+    errors = 0
+    t0 = time.time()
+    for start in range(0, len(ids), args.batch_size):
+        chunk = ids[start:start + args.batch_size]
+        items = []
+        for pid in chunk:
+            recs = [r["title"] for r in recommender.recommend(pid, k=3)]
+            items.append({
+                "prompt": build_curator_prompt(art_db[pid].get('context_text', ''), recs),
+                "adapter_type": "art_curator",
+                "max_tokens": args.max_tokens,
+                "seed": args.seed,
+            })
+
+        # 한 배치 전체가 서버에서 동시에 엔진에 들어감 (continuous batching)
+        for event in iter_batch_results(items, args.url, args.timeout):
+            pid = chunk[event["index"]]
+            if event["status"] == "success":
+                results[pid] = {"status": "success", "response": event["response"].strip()}
+            else:
+                errors += 1
+                results[pid] = {"status": "error", "detail": event.get("detail")}
+            print(f"[{len(results)}/{len(ids)}] {pid}: {event['status']}")
+
+    elapsed = time.time() - t0
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f">>> {len(results)} artworks ({errors} errors) in {elapsed:.1f}s "
+          f"({len(results) / elapsed:.2f} items/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
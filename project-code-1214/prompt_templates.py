@@ -0,0 +1,78 @@
+# prompt_templates.py
+# 버전이 있는 프롬프트 템플릿 (app.py / precompute_commentary.py / loadgen.py 에서 공용으로 사용)
+#
+# 템플릿 = 정적 부분(static_prefix) + 요청마다 달라지는 부분(variable_format).
+# 정적 부분(system / instruction / few-shot)을 앞에 두면 모든 큐레이터 요청이 같은 접두어를 공유해서
+# 엔진의 prefix caching (engines.ENGINE_PROFILES 의 enable_prefix_caching) 이 그 부분의 prefill 을 건너뜀.
+# 템플릿 문구를 바꿀 때는 기존 항목을 고치지 말고 새 버전을 추가 (실행 기록 / 캐시된 응답과 비교 가능하도록).
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: int
+    static_prefix: str      # 모든 요청이 공유하는 앞부분 (prefix cache 대상)
+    variable_format: str    # str.format 으로 채우는 요청별 부분
+
+    def render(self, **fields):
+        return self.static_prefix + self.variable_format.format(**fields)
+
+
+_KG_LOG = "### SYSTEM LOG: Knowledge Graph Retrieval ###\n" + "".join(
+    f"[Step {i+1}] Accessing Ontology Layer... Node verified.\n" for i in range(30)
+)
+
+_FEW_SHOT = (
+    "- The water-lilies-6.jpg is a photo captured by Claude Monet in 1899 in France. Water Lillies is a Japanese-style garden that was built in the 1890s for Monet, who suffered from severe asthma. In his water garden, he had three ponds connected by small waterfalls. The Japanese-style garden was created to relax and reflect, and the pond’s lily pads were a place where Claude Monet could sit and paint. Claude Monet was influenced by the Japanese school of painting, especially the impressionists.\n\n"
+)
+
+PROMPT_TEMPLATES = {
+    # v1: 기존 배치 (작품 context 가 instruction / few-shot 앞에 있어 그 뒤로는 공유 접두어가 없음)
+    "curator-v1": PromptTemplate(
+        name="curator",
+        version=1,
+        static_prefix=_KG_LOG,
+        variable_format=(
+            "\n### INPUT ANALYSIS ###\n{input_context}\n"
+            "\n### RECOMMENDATION LIST ###\n{recommendations}\n\n"
+            "### INSTRUCTION ###\n"
+            "1. Act as a professional Art Curator. Write a **cohesive, narrative commentary** explaining the connection between the INPUT artwork and the RECOMMENDATION LIST.\n"
+            "2. Do NOT repeat the task instructions. Do NOT use prefixes like 'Response:'. Just write the paragraph in full sentence.\n\n"
+            "3. Few shot: IDEAL OUTPUT EXAMPLE is as follows(Follow the style below)):\n"
+            + _FEW_SHOT
+        ),
+    ),
+    # v2: system / 검색 로그 / instruction / few-shot 을 모두 앞에, 작품 context 와 추천 목록은 맨 뒤
+    "curator-v2": PromptTemplate(
+        name="curator",
+        version=2,
+        static_prefix=(
+            "### SYSTEM ###\n"
+            "You are a professional Art Curator for an art knowledge graph.\n\n"
+            + _KG_LOG +
+            "\n### INSTRUCTION ###\n"
+            "1. Write a **cohesive, narrative commentary** explaining the connection between the INPUT artwork and the RECOMMENDATION LIST given at the end.\n"
+            "2. Do NOT repeat the task instructions. Do NOT use prefixes like 'Response:'. Just write the paragraph in full sentence.\n"
+            "3. Few shot: IDEAL OUTPUT EXAMPLE is as follows (Follow the style below):\n"
+            + _FEW_SHOT
+        ),
+        variable_format=(
+            "### INPUT ANALYSIS ###\n{input_context}\n"
+            "\n### RECOMMENDATION LIST ###\n{recommendations}\n"
+            "### COMMENTARY ###\n"
+        ),
+    ),
+}
+DEFAULT_TEMPLATE = "curator-v2"
+
+
+def get_template(name=DEFAULT_TEMPLATE):
+    if name not in PROMPT_TEMPLATES:
+        raise ValueError(f"Unknown prompt template '{name}' (choose from {sorted(PROMPT_TEMPLATES)})")
+    return PROMPT_TEMPLATES[name]
+
+
+def build_curator_prompt(input_context, recommended_titles, template=DEFAULT_TEMPLATE):
+    recommendations = "".join(f"{i+1}. {t}\n" for i, t in enumerate(recommended_titles))
+    return get_template(template).render(input_context=input_context, recommendations=recommendations)
@@ -0,0 +1,148 @@
+# recommender.py
+# artgraph_db.json 의 메타데이터(artist / style / genre / material)로 만든 역색인 기반 추천
+#
+#   rec = Recommender(art_db)           # 로딩 시 한 번 색인
+#   rec.recommend("water-lilies-6", k=3)
+#   rec.add(pid, info) / rec.remove(pid) / rec.sync(new_db)   # DB 가 바뀌면 바뀐 항목만 다시 색인
+#
+# 점수 = 공유하는 facet 값마다 FACET_WEIGHTS 가중치를 더한 값. 같은 점수면 id 순 -> 항상 같은 결과.
+# 작품마다 점수를 계산하지 않고, target 의 facet 값 조합을 점수 순으로 보면서 postings 교집합(set, C 수준)으로
+# 후보를 찾음 -> 상위 조합(artist & style ...)에서 k개가 차면 큰 style / genre postings 는 건드리지 않음.
+# facet 값이 MAX_TERMS 개보다 많으면 조합 수(2^n)가 너무 커지므로 postings 를 돌며 작품별 점수를 누적.
+import bisect
+import heapq
+from collections import defaultdict
+
+FACETS = ("artist", "style", "genre", "material")
+FACET_WEIGHTS = {"artist": 3.0, "style": 2.0, "genre": 1.0, "material": 0.5}
+MAX_TERMS = 10      # target 의 facet 값이 이보다 많으면 조합 대신 postings 점수 누적으로 계산
+
+
+def _facet_values(info):
+    meta = info.get('metadata', {})
+    return {facet: frozenset(str(v) for v in meta.get(facet, [])) for facet in FACETS}
+
+
+class Recommender:
+    def __init__(self, art_db=None, weights=FACET_WEIGHTS):
+        self.weights = dict(weights)
+        self._postings = {facet: defaultdict(set) for facet in FACETS}   # facet -> 값 id -> 작품 id 집합
+        self._facets = {}       # 작품 id -> {facet: 값 집합}
+        self._titles = {}
+        self._ids = []          # 정렬된 작품 id (빈자리 채우기용)
+        for pid, info in (art_db or {}).items():
+            self.add(pid, info)
+
+    def __len__(self):
+        return len(self._facets)
+
+    def __contains__(self, pid):
+        return pid in self._facets
+
+    def add(self, pid, info):
+        """작품 추가 (이미 있으면 새 메타데이터로 교체)"""
+        if pid in self._facets:
+            self.remove(pid)
+        facets = _facet_values(info)
+        self._facets[pid] = facets
+        self._titles[pid] = info.get('title', pid)
+        for facet, values in facets.items():
+            for value in values:
+                self._postings[facet][value].add(pid)
+        bisect.insort(self._ids, pid)
+
+    def remove(self, pid):
+        facets = self._facets.pop(pid, None)
+        if facets is None:
+            return False
+        del self._titles[pid]
+        for facet, values in facets.items():
+            for value in values:
+                posting = self._postings[facet][value]
+                posting.discard(pid)
+                if not posting:
+                    del self._postings[facet][value]
+        del self._ids[bisect.bisect_left(self._ids, pid)]
+        return True
+
+    def sync(self, art_db):
+        """새 DB 와 비교해서 추가 / 변경 / 삭제된 작품만 다시 색인. (추가+변경 수, 삭제 수) 반환"""
+        removed = [pid for pid in self._facets if pid not in art_db]
+        for pid in removed:
+            self.remove(pid)
+        changed = 0
+        for pid, info in art_db.items():
+            if (self._facets.get(pid) != _facet_values(info)
+                    or self._titles.get(pid) != info.get('title', pid)):
+                self.add(pid, info)
+                changed += 1
+        return changed, len(removed)
+
+    def _shared(self, target, pid):
+        """가장 가중치가 큰 공유 facet 값 (facet, 값 id). 없으면 None"""
+        facets = self._facets[pid]
+        for facet in sorted(FACETS, key=lambda f: -self.weights[f]):
+            common = target[facet] & facets[facet]
+            if common:
+                return facet, min(common)
+        return None
+
+    def _accumulate(self, target):
+        """target 과 facet 값을 공유하는 작품마다 공유 값의 가중치 합 {작품 id: 점수}"""
+        scores = defaultdict(float)
+        for facet in FACETS:
+            weight = self.weights[facet]
+            for value in target[facet]:
+                for pid in self._postings[facet].get(value, ()):
+                    scores[pid] += weight
+        return {pid: round(score, 9) for pid, score in scores.items()}
+
+    def recommend(self, target_id, k=3, exclude=()):
+        """
+        target_id 와 비슷한 작품 k개: [{"id", "title", "score", "shared": (facet, 값 id) 또는 None}]
+        공유 facet 이 있는 작품이 k개보다 적으면 id 순서상 target 다음 작품으로 채움 (score 0, shared None).
+        """
+        target = self._facets.get(target_id)
+        seen = set(exclude) | {target_id}
+        recs = []
+        if target is not None and sum(map(len, target.values())) > MAX_TERMS:
+            scores = self._accumulate(target)
+            for pid in heapq.nsmallest(k, scores.keys() - seen, key=lambda pid: (-scores[pid], pid)):
+                recs.append({"id": pid, "title": self._titles[pid], "score": scores[pid],
+                             "shared": self._shared(target, pid)})
+            seen |= scores.keys()
+        elif target is not None:
+            terms = [(f, v) for f in FACETS for v in sorted(target[f])]
+            postings = [self._postings[f].get(v, set()) for f, v in terms]
+            # 공유하는 값의 조합(부분집합)별로, 가중치 합이 같은 것끼리 묶음
+            levels = defaultdict(list)
+            for mask in range(1, 1 << len(terms)):
+                members = [i for i in range(len(terms)) if mask >> i & 1]
+                if all(postings[i] for i in members):
+                    levels[round(sum(self.weights[terms[i][0]] for i in members), 9)].append(members)
+
+            # 점수가 높은 조합부터: 여기서 처음 나온 작품은 더 큰 조합에 없었으므로 점수가 정확히 이 값
+            for score in sorted(levels, reverse=True):
+                new = set()
+                for members in levels[score]:
+                    sets = sorted((postings[i] for i in members), key=len)
+                    new |= sets[0].intersection(*sets[1:])
+                new -= seen
+                for pid in heapq.nsmallest(k - len(recs), new):
+                    recs.append({"id": pid, "title": self._titles[pid], "score": score,
+                                 "shared": self._shared(target, pid)})
+                if len(recs) >= k:
+                    break
+                seen |= new
+
+        if len(recs) < k and self._ids:
+            chosen = seen | {r["id"] for r in recs}
+            start = bisect.bisect_right(self._ids, target_id)
+            for i in range(len(self._ids)):
+                pid = self._ids[(start + i) % len(self._ids)]
+                if pid in chosen:
+                    continue
+                recs.append({"id": pid, "title": self._titles[pid], "score": 0.0, "shared": None})
+                if len(recs) >= k:
+                    break
+        return recs
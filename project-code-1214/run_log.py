@@ -0,0 +1,188 @@
+# run_log.py
+# 추론 요청 결과를 한 줄에 하나씩 JSON 으로 쌓는 실행 기록 (append-only JSONL) + 리포트
+#
+#   run_log = RunLog()                     # 프로세스당 하나 (app.py 는 st.cache_resource)
+#   run_log.record(mode="optimized", adapter="art_curator", artwork_id=tid, ttft_s=..., latency_s=..., ...)
+#
+#   리포트 (percentile + baseline 대비 optimized 변화):
+#     python run_log.py report                       # 기본 파일 runs.jsonl
+#     python run_log.py report runs_*.jsonl --adapter art_curator
+#
+# record() 는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 한 번에 write (jsonl_writer) -> 요청 경로에서 파일 I/O 없음.
+# 리포트는 파일을 한 줄씩 읽으면서 그룹별 로그 버킷 히스토그램에 누적 -> 기록 수와 무관한 메모리,
+# percentile 상대 오차 약 1%.
+import argparse
+import glob
+import json
+import math
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+from jsonl_writer import FLUSH_EVERY, FLUSH_INTERVAL_S, BufferedJsonlWriter
+
+RUN_LOG_FILE = "runs.jsonl"
+FIELDS = ("request_id", "timestamp", "mode", "adapter", "artwork_id", "status", "prompt_tokens",
+          "completion_tokens", "cached_tokens", "ttft_s", "latency_s", "error")
+PERCENTILES = (50, 95, 99)
+
+
+class RunLog:
+    def __init__(self, path=RUN_LOG_FILE, flush_every=FLUSH_EVERY, flush_interval_s=FLUSH_INTERVAL_S):
+        self.path = path
+        self._writer = BufferedJsonlWriter(path, flush_every, flush_interval_s, name="run-log-writer")
+
+    @property
+    def written(self):
+        return self._writer.written
+
+    def record(self, mode, adapter, status="success", request_id=None, **fields):
+        """기록 하나 추가 (파일에는 백그라운드에서 씀). 기록의 request_id 반환"""
+        entry = {"request_id": request_id or uuid.uuid4().hex,
+                 "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+                 "mode": mode, "adapter": adapter, "status": status}
+        entry.update(fields)
+        self._writer.write({key: entry.get(key) for key in FIELDS})
+        return entry["request_id"]
+
+    def close(self):
+        """남은 기록을 모두 쓰고 writer 스레드 종료"""
+        self._writer.close()
+
+
+def iter_runs(paths):
+    """JSONL 파일(들)을 한 줄씩 읽어 기록 dict 를 yield (깨진 줄은 건너뜀)"""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class LogHistogram:
+    """양수 값을 (1 + 2*error) 배씩 커지는 버킷에 세는 히스토그램. 메모리 = 버킷 수 (값의 범위에 로그 비례)"""
+
+    def __init__(self, error=0.01, min_value=1e-4):
+        self.gamma = 1 + 2 * error
+        self.min_value = min_value
+        self.buckets = defaultdict(int)
+        self.count = 0
+
+    def add(self, value):
+        bucket = math.ceil(math.log(max(value, self.min_value) / self.min_value, self.gamma))
+        self.buckets[bucket] += 1
+        self.count += 1
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # 버킷 [gamma^(b-1), gamma^b] 의 가운데 값 -> 상대 오차 error 이내
+                return self.min_value * self.gamma ** bucket * 2 / (1 + self.gamma)
+        return None
+
+
+class RunStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.ttft = LogHistogram()
+        self.latency = LogHistogram()
+        self.tpot = LogHistogram()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.decode_s = 0.0
+
+    def add(self, run):
+        self.requests += 1
+        if run.get("status") != "success":
+            self.errors += 1
+            return
+        if run.get("ttft_s") is not None:
+            self.ttft.add(run["ttft_s"])
+        if run.get("latency_s") is not None:
+            self.latency.add(run["latency_s"])
+        self.prompt_tokens += run.get("prompt_tokens") or 0
+        self.cached_tokens += run.get("cached_tokens") or 0
+        completion = run.get("completion_tokens") or 0
+        self.completion_tokens += completion
+        if completion > 1 and run.get("ttft_s") is not None and run.get("latency_s") is not None:
+            decode_s = run["latency_s"] - run["ttft_s"]
+            self.tpot.add(decode_s / (completion - 1))
+            self.decode_s += decode_s
+
+    def summary(self):
+        summary = {"requests": self.requests, "error_rate": self.errors / self.requests if self.requests else None}
+        for q in PERCENTILES:
+            summary[f"ttft_p{q}_s"] = self.ttft.percentile(q)
+            summary[f"latency_p{q}_s"] = self.latency.percentile(q)
+        summary["tpot_p50_s"] = self.tpot.percentile(50)
+        summary["decode_tok_s"] = self.completion_tokens / self.decode_s if self.decode_s > 0 else None
+        summary["prefix_cache_hit_rate"] = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else None
+        return summary
+
+
+# 리포트 지표, 값이 클수록 좋은지
+REPORT_METRICS = [("requests", None), ("error_rate", False)] + \
+    [(f"ttft_p{q}_s", False) for q in PERCENTILES] + [(f"latency_p{q}_s", False) for q in PERCENTILES] + \
+    [("tpot_p50_s", False), ("decode_tok_s", True), ("prefix_cache_hit_rate", True)]
+
+
+def aggregate(runs, adapter=None):
+    """(mode, adapter) 별 RunStats. adapter 를 지정하지 않으면 "*" 에 어댑터 전체 합도 계산"""
+    stats = defaultdict(RunStats)
+    for run in runs:
+        if adapter is not None and run.get("adapter") != adapter:
+            continue
+        stats[(run.get("mode"), run.get("adapter"))].add(run)
+        if adapter is None:
+            stats[(run.get("mode"), "*")].add(run)
+    return stats
+
+
+def print_report(stats, baseline="baseline", candidate="optimized"):
+    """mode 별 지표 표 + baseline 대비 candidate 변화(%), ✓ 는 개선"""
+    def fmt(v):
+        if v is None:
+            return "-"
+        return f"{v:.4f}" if isinstance(v, float) else str(v)
+
+    modes = sorted({str(m) for m, _ in stats}, key=lambda m: (m != baseline, m != candidate, m))
+    for adapter in sorted({a for _, a in stats}, key=lambda a: (a == "*", str(a))):
+        summaries = {mode: stats[(mode, adapter)].summary() for mode in modes if (mode, adapter) in stats}
+        print(f"=== adapter: {'all' if adapter == '*' else adapter} ===")
+        print(f"  {'metric':<24}" + "".join(f"{mode:>12}" for mode in modes) + f"{'delta':>12}")
+        for metric, higher_is_better in REPORT_METRICS:
+            values = [summaries.get(mode, {}).get(metric) for mode in modes]
+            delta = ""
+            base, opt = summaries.get(baseline, {}).get(metric), summaries.get(candidate, {}).get(metric)
+            if higher_is_better is not None and base and opt is not None:
+                change = (opt - base) / base * 100
+                better = change > 0 if higher_is_better else change < 0
+                delta = f"{change:+.1f}%" + (" ✓" if better else "")
+            print(f"  {metric:<24}" + "".join(f"{fmt(v):>12}" for v in values) + f"{delta:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentile report over run logs, baseline vs optimized.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="stream one or more JSONL run logs and print per-mode percentiles")
+    report.add_argument("paths", nargs="*", default=[RUN_LOG_FILE], help="JSONL files (glob patterns allowed)")
+    report.add_argument("--adapter", default=None, help="only this adapter")
+    report.add_argument("--baseline", default="baseline", help="mode the delta column is relative to")
+    report.add_argument("--candidate", default="optimized", help="mode compared against --baseline")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+    print_report(aggregate(iter_runs(paths), args.adapter), args.baseline, args.candidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# PEFT save_pretrained() 가 만드는 파일: 이 파일이 있는 폴더만 어댑터로 인정
+ADAPTER_CONFIG = "adapter_config.json"
+
+
+@dataclass(frozen=True)
+class AdapterRequest:
+    """엔진에 넘기는 어댑터 정보 (vLLM LoRARequest 와 같은 필드 이름, 엔진이 변환)"""
+    lora_name: str
+    lora_int_id: int
+    lora_path: str
+
+
+class AdapterRegistry:
+    """
+    LoRA 어댑터 목록 (ADAPTER_DIR 을 한 번만 스캔해서 메모리에 보관).
+
+    - 어댑터마다 고유한 lora_id 부여 (스캔 순서 = 이름 순서, 한 번 쓴 id 는 재사용하지 않음)
+    - 요청 시 존재 확인은 dict 조회 (파일시스템 접근 없음)
+    - 최근 사용한 어댑터를 max_loras 한도 안에서 LRU 순서로 기록 (엔진에 실제로 올라간 목록의 추정치:
+      엔진에 알리지 않으며, vLLM 은 자기 기준으로 어댑터를 내림)
+    - 서버 재시작 없이 새 어댑터 추가(scan) / 가중치 교체(reload)
+    """
+
+    def __init__(self, adapter_dir, max_loras):
+        self.adapter_dir = adapter_dir
+        self.max_loras = max_loras
+        self._adapters = {}             # name -> AdapterRequest
+        self._recently_used = OrderedDict()  # name -> None, 오래 안 쓴 순서
+        self._next_id = 1
+        self.estimated_loads = 0        # recently_used 에 없던 어댑터 요청 수 (엔진 로딩 횟수 추정치)
+        self.scan()
+
+    def _register(self, name, path):
+        lora_req = AdapterRequest(name, self._next_id, path)
+        self._next_id += 1
+        self._adapters[name] = lora_req
+        return lora_req
+
+    def scan(self):
+        """ADAPTER_DIR 에서 새 어댑터를 찾아 등록. 새로 추가된 이름 목록 반환"""
+        added = []
+        if not os.path.isdir(self.adapter_dir):
+            return added
+        for name in sorted(os.listdir(self.adapter_dir)):
+            path = os.path.join(self.adapter_dir, name)
+            if name in self._adapters or not os.path.isfile(os.path.join(path, ADAPTER_CONFIG)):
+                continue
+            self._register(name, path)
+            added.append(name)
+        return added
+
+    async def reload(self, engine, name):
+        """가중치가 바뀐 어댑터를 새 id 로 다시 등록 (엔진은 id 로 캐시하므로 새 id 가 필요).
+        이전 id 는 엔진에서 내림 -> reload 를 반복해도 엔진에 옛 가중치가 쌓이지 않음"""
+        old = self._adapters.get(name)
+        if old is None:
+            return None
+        lora_req = self._register(name, old.lora_path)
+        self._recently_used.pop(name, None)
+        await engine.remove_lora(old)   # 엔진에 없는 id 면 아무 일도 안 함
+        return lora_req
+
+    def get(self, name):
+        return self._adapters.get(name)
+
+    def __contains__(self, name):
+        return name in self._adapters
+
+    def acquire(self, name):
+        """요청에 쓸 AdapterRequest 를 반환하고 recently_used 목록을 갱신. 없는 어댑터면 None"""
+        lora_req = self._adapters.get(name)
+        if lora_req is None:
+            return None
+        if name in self._recently_used:
+            self._recently_used.move_to_end(name)
+        else:
+            self.estimated_loads += 1
+            self._recently_used[name] = None
+            while len(self._recently_used) > self.max_loras:
+                self._recently_used.popitem(last=False)   # 기록에서만 제거 (엔진은 그대로)
+        return lora_req
+
+    async def preload(self, engine, names):
+        """서버 시작 시 어댑터를 미리 엔진에 올려 첫 요청의 로딩 지연을 없앰"""
+        loaded = []
+        for name in names[:self.max_loras]:
+            lora_req = self.acquire(name)
+            if lora_req is None:
+                print(f">>> [Adapter] '{name}' not found, skipped preload")
+                continue
+            await engine.add_lora(lora_req)
+            loaded.append(name)
+        return loaded
+
+    def stats(self):
+        return {
+            "adapters": {name: req.lora_int_id for name, req in self._adapters.items()},
+            "recently_used": list(self._recently_used),
+            "max_loras": self.max_loras,
+            "estimated_loads": self.estimated_loads,
+        }
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import itertools
+
+# 우선순위 클래스 (숫자가 작을수록 먼저 처리)
+PRIORITY_CLASSES = {"interactive": 0, "standard": 1, "batch": 2}
+# 요청에 priority 가 없을 때 어댑터별 기본값: 짧은 채팅이 긴 큐레이션 뒤에 밀리지 않도록
+ADAPTER_PRIORITY = {"chat_bot": "interactive", "art_curator": "standard"}
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나(429) 대기 시간 초과(503)로 거절"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AdmissionTicket:
+    """입장 1회분. release() 는 한 번만 반영됨.
+
+    스트리밍 응답이 시작되기 전에 클라이언트가 끊겨 생성기가 그냥 버려져도 __del__ 에서 자리를 반납.
+    """
+
+    def __init__(self, controller):
+        self._controller = controller
+
+    def release(self):
+        controller, self._controller = self._controller, None
+        if controller is not None:
+            controller.release()
+
+    def __del__(self):
+        self.release()
+
+
+class AdmissionController:
+    """
+    엔진에 동시에 들어가는 요청 수(in-flight)를 제한하는 입장 관리자.
+
+    - in-flight 가 max_inflight 미만이면 바로 입장
+    - 아니면 우선순위 대기열에서 대기 (같은 우선순위는 도착 순서)
+    - 대기열이 max_queue 개로 가득 차면: 더 낮은 우선순위 대기자가 있으면 그 요청을 밀어내고(503) 대기,
+      없으면 즉시 429. queue_timeout_s 안에 입장 못 하면 503
+    - bounded=False (배치 항목 등) 는 대기열 한도 / 시간 제한 없이 기다림
+    - max_inflight=None 이면 제한 없음 (in-flight 수만 집계)
+    """
+
+    def __init__(self, max_inflight=32, max_queue=64, queue_timeout_s=10.0):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.inflight = 0
+        self._waiters = []   # heap: [priority, 순번, future, bounded]
+        self._order = itertools.count()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.shed = 0        # 높은 우선순위 요청에 밀려난 수
+
+    async def acquire(self, priority=1, bounded=True):
+        if (self.max_inflight is None or self.inflight < self.max_inflight) and not self._waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return
+
+        if bounded and self._queued() >= self.max_queue and not self._shed(priority):
+            self.rejected_full += 1
+            raise AdmissionRejected(429, "Server busy: request queue is full, retry later.")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._order), future, bounded]
+        heapq.heappush(self._waiters, entry)
+        try:
+            if bounded:
+                await asyncio.wait_for(future, self.queue_timeout_s)
+            else:
+                await future
+        except asyncio.TimeoutError:
+            self._remove(entry)
+            self.rejected_timeout += 1
+            raise AdmissionRejected(503, "Server overloaded: timed out waiting for a slot.")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()      # 자리를 넘겨받은 직후 취소됨 -> 다음 대기자에게
+            else:
+                self._remove(entry)
+            raise
+
+    async def admit(self, priority=1, bounded=True):
+        """acquire() 후 AdmissionTicket 반환"""
+        await self.acquire(priority, bounded)
+        return AdmissionTicket(self)
+
+    def release(self):
+        # 자리를 비우지 않고 가장 우선순위가 높은 대기자에게 바로 넘김
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                self.admitted += 1
+                return
+        self.inflight -= 1
+
+    def _queued(self):
+        # 한도는 bounded 대기자만 계산 (배치 항목이 대화형 요청의 자리를 막지 않도록)
+        return sum(1 for entry in self._waiters if entry[3])
+
+    def _shed(self, priority):
+        """priority 보다 낮은 우선순위의 bounded 대기자 중 가장 늦게 온 요청을 503 으로 내보냄"""
+        victims = [entry for entry in self._waiters if entry[3] and entry[0] > priority]
+        if not victims:
+            return False
+        victim = max(victims)
+        self._remove(victim)
+        victim[2].set_exception(AdmissionRejected(503, "Server overloaded: preempted by a higher priority request."))
+        self.shed += 1
+        return True
+
+    def _remove(self, entry):
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def stats(self):
+        return {
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "shed": self.shed,
+        }
@@ -0,0 +1,386 @@
+import asyncio
+import hashlib
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# ======================================================
+# 엔진 프로필: baseline / optimized 의 차이는 여기에만 둠
+# ======================================================
+MODEL_NAME = "NousResearch/Llama-2-7b-hf"
+
+# 두 프로필 공통 vLLM 설정
+COMMON_ENGINE_ARGS = dict(
+    model=MODEL_NAME,
+    dtype="auto",
+    gpu_memory_utilization=0.9,
+    enable_lora=True,
+    max_lora_rank=16,
+    disable_log_stats=True,
+)
+
+ENGINE_PROFILES = {
+    # 🔴 최적화 기술 비활성화 (OFF)
+    "baseline": {
+        "description": "No Optimization",
+        "engine_args": dict(
+            enable_chunked_prefill=False,   # ❌ 최적화 끔
+            enable_prefix_caching=False,    # ❌ 공통 접두어도 매번 prefill (최신 vLLM 은 기본값이 켜짐이라 명시)
+            max_loras=1,                    # ❌ LoRA 제한
+        ),
+        "response_cache": False,
+        "admission_control": False,         # ❌ 동시 요청 수 무제한
+    },
+    "optimized": {
+        "description": "Chunked Prefill, Prefix Caching & Multi-LoRA",
+        "engine_args": dict(
+            enable_chunked_prefill=True,
+            max_num_batched_tokens=512,
+            enable_prefix_caching=True,     # 프롬프트 템플릿의 정적 앞부분 KV cache 재사용
+            max_loras=4,
+        ),
+        "response_cache": True,
+        "admission_control": True,
+    },
+}
+
+ENGINE_BACKENDS = ("vllm", "simulated")
+
+
+def get_profile(name):
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown profile '{name}' (choose from {sorted(ENGINE_PROFILES)})")
+    profile = ENGINE_PROFILES[name]
+    return {**profile, "engine_args": {**COMMON_ENGINE_ARGS, **profile["engine_args"]}}
+
+
+def create_engine(profile_name, backend="vllm"):
+    """프로필 설정으로 엔진 생성. backend="simulated" 는 GPU / 모델 없이 CPU 에서 동작"""
+    engine_args = get_profile(profile_name)["engine_args"]
+    if backend == "vllm":
+        return VLLMEngine(engine_args)
+    if backend == "simulated":
+        return SimulatedEngine(engine_args)
+    raise ValueError(f"Unknown engine backend '{backend}' (choose from {ENGINE_BACKENDS})")
+
+
+# ======================================================
+# 엔진 인터페이스
+#   generate(prompt, sampling, request_id, adapter) : RequestOutput 을 async 로 yield
+#       sampling = {"temperature", "max_tokens", "seed"(선택)}
+#       adapter  = adapter_registry.AdapterRequest 또는 None
+#   add_lora(adapter)  : 어댑터를 미리 올려둠
+#   remove_lora(adapter) : 엔진에 올라간 어댑터를 내림 (reload 전의 id)
+#   abort(request_id)  : 진행 중인 요청 중단
+# ======================================================
+class VLLMEngine:
+    """vLLM AsyncLLMEngine 백엔드"""
+
+    def __init__(self, engine_args):
+        from vllm import AsyncEngineArgs, AsyncLLMEngine
+
+        self.engine_args = engine_args
+        self._engine = AsyncLLMEngine.from_engine_args(AsyncEngineArgs(**engine_args))
+
+    @staticmethod
+    def _lora_request(adapter):
+        from vllm.lora.request import LoRARequest
+
+        return LoRARequest(adapter.lora_name, adapter.lora_int_id, adapter.lora_path)
+
+    async def generate(self, prompt, sampling, request_id, adapter=None):
+        from vllm import SamplingParams
+
+        lora_request = None if adapter is None else self._lora_request(adapter)
+        async for request_output in self._engine.generate(
+            prompt, SamplingParams(**sampling), request_id=request_id, lora_request=lora_request
+        ):
+            yield request_output
+
+    async def add_lora(self, adapter):
+        await self._engine.add_lora(self._lora_request(adapter))
+
+    async def remove_lora(self, adapter):
+        await self._engine.remove_lora(adapter.lora_int_id)
+
+    async def abort(self, request_id):
+        await self._engine.abort(request_id)
+
+
+# ------------------------------------------------------
+# CPU 대체 엔진 (vLLM RequestOutput 과 같은 모양의 결과를 돌려줌)
+# ------------------------------------------------------
+@dataclass
+class CompletionOutput:
+    text: str
+    token_ids: List[int]
+
+
+@dataclass
+class RequestMetrics:
+    arrival_time: float
+    first_scheduled_time: Optional[float] = None
+    first_token_time: Optional[float] = None
+    time_in_queue: Optional[float] = None
+    finished_time: Optional[float] = None
+
+
+@dataclass
+class RequestOutput:
+    request_id: str
+    prompt_token_ids: List[int]
+    outputs: List[CompletionOutput]
+    finished: bool
+    metrics: RequestMetrics
+    num_cached_tokens: int = 0           # prefix cache 에서 재사용한 프롬프트 토큰 수
+
+
+@dataclass
+class _SimRequest:
+    request_id: str
+    prompt_token_ids: List[int]
+    output_token_ids: List[int]          # 생성될 토큰 전체 (미리 결정됨)
+    adapter: Optional[str]
+    metrics: RequestMetrics
+    block_hashes: List[int] = field(default_factory=list)   # 꽉 찬 프롬프트 블록들의 prefix 해시
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    num_cached_tokens: int = 0
+    num_prefilled: int = 0
+    num_generated: int = 0
+    finished: bool = False
+
+
+VOCAB = (
+    "the painting light color brush canvas garden water reflection impression artist movement "
+    "composition texture harmony shadow landscape portrait style modern early late period oil "
+    "study scene surface motif palette atmosphere nature figure contrast influence"
+).split()
+
+
+def simulated_tokenize(text):
+    """단어 단위의 결정적 토큰 id (같은 접두어 -> 같은 토큰 id 접두어)"""
+    return [int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "little") % 32000
+            for word in text.split()]
+
+
+class SimulatedEngine:
+    """
+    GPU 없이 동작하는 결정적 대체 엔진 (vLLM 스케줄러를 단순화한 시뮬레이션).
+
+    - 출력: (prompt, adapter, sampling) 해시로 정해지는 단어열 -> 같은 입력이면 항상 같은 출력
+    - 시간: continuous batching 의 step 마다 prefill / decode 비용만큼 asyncio.sleep
+        chunked prefill  : step 당 토큰 예산(max_num_batched_tokens) 안에서 decode 우선, 남은 예산으로 prefill 조각 처리
+        chunked prefill X : prefill 이 있는 step 은 decode 를 멈추고 프롬프트 전체를 처리
+        max_loras         : 한 batch 의 어댑터 수 제한, resident 가 아닌 어댑터는 로딩 비용 발생
+        prefix caching    : block_size 토큰 단위로 (어댑터, 앞 블록들) 해시가 같은 블록은 prefill 생략 (LRU)
+    기본 비용은 A100 + Llama-2-7B 의 대략적인 값 (decode 약 20ms/step).
+    """
+
+    def __init__(self, engine_args, max_num_seqs=64, step_overhead_s=0.002, prefill_s_per_token=0.0002,
+                 decode_s_per_step=0.018, decode_s_per_seq=0.0003, lora_load_s=0.25,
+                 block_size=16, prefix_cache_blocks=8192):
+        self.engine_args = engine_args
+        self.chunked_prefill = engine_args.get("enable_chunked_prefill", False)
+        self.prefix_caching = engine_args.get("enable_prefix_caching", False)
+        self.block_size = block_size
+        self.prefix_cache_blocks = prefix_cache_blocks
+        self.max_num_batched_tokens = engine_args.get("max_num_batched_tokens") or 4096
+        self.max_loras = engine_args.get("max_loras", 1)
+        self.max_num_seqs = max_num_seqs
+        self.step_overhead_s = step_overhead_s
+        self.prefill_s_per_token = prefill_s_per_token
+        self.decode_s_per_step = decode_s_per_step
+        self.decode_s_per_seq = decode_s_per_seq
+        self.lora_load_s = lora_load_s
+
+        self._requests = {}
+        self._waiting = deque()
+        self._running = []
+        self._resident = OrderedDict()   # 엔진에 올라간 어댑터 (LRU)
+        self._prefix_cache = OrderedDict()   # 블록 해시 -> None (LRU)
+        self._loop_task = None
+
+    # ---------- 인터페이스 ----------
+    async def generate(self, prompt, sampling, request_id, adapter=None):
+        request = self._submit(prompt, sampling, request_id, None if adapter is None else adapter.lora_name)
+        try:
+            while True:
+                request_output = await request.queue.get()
+                if request_output is None:
+                    return
+                yield request_output
+        finally:
+            if not request.finished:
+                self._abort(request)
+
+    async def add_lora(self, adapter):
+        if self._load_adapter(adapter.lora_name):
+            await asyncio.sleep(self.lora_load_s)
+
+    async def remove_lora(self, adapter):
+        self._resident.pop(adapter.lora_name, None)
+
+    async def abort(self, request_id):
+        request = self._requests.get(request_id)
+        if request is not None:
+            self._abort(request)
+
+    # ---------- 내부 ----------
+    def _submit(self, prompt, sampling, request_id, adapter_name):
+        seed_text = f"{adapter_name}|{sampling.get('seed')}|{sampling.get('temperature')}|{prompt}"
+        rng = random.Random(hashlib.sha256(seed_text.encode("utf-8")).digest())
+        prompt_token_ids = simulated_tokenize(prompt)
+        request = _SimRequest(
+            request_id=request_id,
+            prompt_token_ids=prompt_token_ids,
+            output_token_ids=[rng.randrange(len(VOCAB)) for _ in range(sampling.get("max_tokens", 16))],
+            adapter=adapter_name,
+            metrics=RequestMetrics(arrival_time=time.time()),
+            block_hashes=self._block_hashes(prompt_token_ids, adapter_name) if self.prefix_caching else [],
+        )
+        self._requests[request_id] = request
+        self._waiting.append(request)
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+        return request
+
+    def _abort(self, request):
+        request.finished = True
+        self._requests.pop(request.request_id, None)
+        if request in self._waiting:
+            self._waiting.remove(request)
+        if request in self._running:
+            self._running.remove(request)
+        request.queue.put_nowait(None)
+
+    def _load_adapter(self, name):
+        """resident 목록 갱신. 새로 올려야 했으면 True"""
+        if name is None:
+            return False
+        if name in self._resident:
+            self._resident.move_to_end(name)
+            return False
+        self._resident[name] = None
+        while len(self._resident) > self.max_loras:
+            self._resident.popitem(last=False)
+        return True
+
+    def _block_hashes(self, token_ids, adapter_name):
+        # 블록 해시는 앞 블록 해시를 포함 -> 같은 해시 = 처음부터 그 블록까지 같은 토큰 (어댑터가 다르면 KV 도 다름)
+        hashes = []
+        parent = hash(adapter_name)
+        for start in range(0, len(token_ids) - self.block_size + 1, self.block_size):
+            parent = hash((parent, tuple(token_ids[start:start + self.block_size])))
+            hashes.append(parent)
+        return hashes
+
+    def _match_prefix(self, request):
+        """prefix cache 에 있는 앞부분 토큰 수 (마지막 토큰은 logits 계산을 위해 항상 다시 계산)"""
+        num_blocks = 0
+        for block_hash in request.block_hashes:
+            if block_hash not in self._prefix_cache:
+                break
+            self._prefix_cache.move_to_end(block_hash)
+            num_blocks += 1
+        return min(num_blocks * self.block_size, len(request.prompt_token_ids) - 1)
+
+    def _cache_prefix(self, request):
+        for block_hash in request.block_hashes:
+            self._prefix_cache[block_hash] = None
+            self._prefix_cache.move_to_end(block_hash)
+        while len(self._prefix_cache) > self.prefix_cache_blocks:
+            self._prefix_cache.popitem(last=False)
+
+    def _admit(self, now):
+        # FCFS: 맨 앞 요청의 어댑터가 batch 의 max_loras 한도를 넘으면 뒤 요청도 기다림
+        while self._waiting and len(self._running) < self.max_num_seqs:
+            request = self._waiting[0]
+            adapters = {r.adapter for r in self._running if r.adapter is not None}
+            if request.adapter is not None and request.adapter not in adapters and len(adapters) >= self.max_loras:
+                break
+            self._waiting.popleft()
+            self._running.append(request)
+            request.metrics.first_scheduled_time = now
+            request.metrics.time_in_queue = now - request.metrics.arrival_time
+            if request.block_hashes:
+                request.num_cached_tokens = request.num_prefilled = self._match_prefix(request)
+
+    def _schedule(self):
+        """이번 step 에 처리할 (prefill 할당 [(request, 토큰 수)], decode 요청 목록)"""
+        prefilling = [r for r in self._running if r.num_prefilled < len(r.prompt_token_ids)]
+        decoding = [r for r in self._running if r.num_prefilled >= len(r.prompt_token_ids)]
+        budget = self.max_num_batched_tokens
+        prefills = []
+        if self.chunked_prefill:
+            decodes = decoding[:budget]
+            budget -= len(decodes)
+            for request in prefilling:
+                if budget <= 0:
+                    break
+                n = min(budget, len(request.prompt_token_ids) - request.num_prefilled)
+                prefills.append((request, n))
+                budget -= n
+            return prefills, decodes
+
+        if not prefilling:
+            return [], decoding
+        for request in prefilling:
+            n = len(request.prompt_token_ids) - request.num_prefilled
+            if prefills and n > budget:
+                break
+            prefills.append((request, n))
+            budget -= n
+        return prefills, []
+
+    def _emit(self, request, now):
+        token_ids = request.output_token_ids[:request.num_generated]
+        text = "".join(" " + VOCAB[t] for t in token_ids)
+        finished = request.num_generated >= len(request.output_token_ids)
+        if finished:
+            request.finished = True
+            request.metrics.finished_time = now
+            self._requests.pop(request.request_id, None)
+            self._running.remove(request)
+        request.queue.put_nowait(RequestOutput(
+            request_id=request.request_id,
+            prompt_token_ids=request.prompt_token_ids,
+            outputs=[CompletionOutput(text=text, token_ids=token_ids)],
+            finished=finished,
+            metrics=request.metrics,
+            num_cached_tokens=request.num_cached_tokens,
+        ))
+        if finished:
+            request.queue.put_nowait(None)
+
+    async def _run(self):
+        while self._waiting or self._running:
+            self._admit(time.time())
+            prefills, decodes = self._schedule()
+
+            step_s = self.step_overhead_s
+            for request in self._running:
+                if self._load_adapter(request.adapter):
+                    step_s += self.lora_load_s
+            step_s += sum(n for _, n in prefills) * self.prefill_s_per_token
+            if decodes:
+                step_s += self.decode_s_per_step + len(decodes) * self.decode_s_per_seq
+            await asyncio.sleep(step_s)
+
+            now = time.time()
+            emitted = []
+            for request, n in prefills:
+                request.num_prefilled += n
+                if request.num_prefilled >= len(request.prompt_token_ids):
+                    emitted.append(request)   # prefill 을 끝낸 step 에서 첫 토큰 샘플링
+                    if request.block_hashes:
+                        self._cache_prefix(request)
+            emitted += decodes
+            for request in emitted:
+                if request.finished:          # step 도중 abort 된 요청
+                    continue
+                request.num_generated += 1
+                if request.num_generated == 1:
+                    request.metrics.first_token_time = now
+                self._emit(request, now)
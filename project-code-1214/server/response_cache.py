@@ -0,0 +1,65 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(adapter_type, prompt, sampling):
+    """(adapter, prompt sha256, sampling params) -> 캐시 키"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return (adapter_type, prompt_hash, tuple(sorted(sampling.items())))
+
+
+class ResponseCache:
+    """
+    생성 결과 캐시 (LRU + TTL).
+
+    - max_entries 를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    - ttl 초가 지난 항목은 조회 시 만료 처리
+    같은 입력에 같은 출력이 보장되는 요청(temperature 0 또는 seed 고정)만 저장해야 함.
+    """
+
+    def __init__(self, max_entries=256, ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (저장 시각, 응답)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, response):
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,70 +1,375 @@
 import os
+import json
+import asyncio
+import argparse
+import time
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from vllm import AsyncLLMEngine, SamplingParams, AsyncEngineArgs
-from vllm.lora.request import LoRARequest
 
-# 1. 모델 및 어댑터 설정
-MODEL_NAME = "NousResearch/Llama-2-7b-hf"
+from adapter_registry import AdapterRegistry
+from admission import ADAPTER_PRIORITY, PRIORITY_CLASSES, AdmissionController, AdmissionRejected
+from engines import ENGINE_BACKENDS, ENGINE_PROFILES, create_engine, get_profile
+from serving_metrics import ServingMetrics, engine_queue_wait
+from response_cache import ResponseCache, make_cache_key
+
+# 1. 서버 설정 (환경 변수 또는 명령행: python server_api.py --profile baseline --engine simulated)
+#   SERVER_PROFILE : 엔진 프로필 이름 (engines.ENGINE_PROFILES: baseline / optimized)
+#   ENGINE_BACKEND : vllm (GPU) 또는 simulated (CPU 대체 엔진)
+SERVER_PROFILE = os.environ.get("SERVER_PROFILE", "optimized")
+ENGINE_BACKEND = os.environ.get("ENGINE_BACKEND", "vllm")
 ADAPTER_DIR = "./adapters" 
+MAX_BATCH_ITEMS = 256
+# 요청마다 한 줄씩 남는 구조화 로그 (JSONL), 기본값은 request_log_<profile>.jsonl
+REQUEST_LOG = os.environ.get("REQUEST_LOG")
+# 서버 시작 시 미리 엔진에 올려둘 어댑터
+PRELOAD_ADAPTERS = os.environ.get("PRELOAD_ADAPTERS", "art_curator,chat_bot").split(",")
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 600))
+# 입장 제어: 엔진에 동시에 넣는 요청 수 / 대기열 길이 / 대기 시간 한도
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", 32))
+MAX_QUEUE = int(os.environ.get("MAX_QUEUE", 64))
+QUEUE_TIMEOUT = float(os.environ.get("QUEUE_TIMEOUT", 5))
+DISCONNECT_POLL_S = 0.5     # /generate 에서 클라이언트 연결 확인 주기
 
 app = FastAPI()
 
-# 2. vLLM 엔진 초기화
-print(">>> Initializing vLLM Engine with Chunked Prefill & Multi-LoRA...")
-
-engine_args = AsyncEngineArgs(
-    model=MODEL_NAME,
-    dtype="auto",
-    gpu_memory_utilization=0.9,
-    enable_chunked_prefill=True,
-    max_num_batched_tokens=512,
-    enable_lora=True,
-    max_loras=4,
-    max_lora_rank=16,
-    disable_log_stats=True
-)
-engine = AsyncLLMEngine.from_engine_args(engine_args)
+# 2. 엔진 및 서버 구성요소: 프로필에 따라 startup 시 생성
+engine = None
+adapter_registry = None
+serving_metrics = None
+response_cache = None   # 프로필에서 response_cache 를 켠 경우에만 사용
+admission = None
+
+@app.on_event("startup")
+async def init_server():
+    global engine, adapter_registry, serving_metrics, response_cache, admission
+
+    profile = get_profile(SERVER_PROFILE)
+    print(f">>> [{SERVER_PROFILE.upper()}] Initializing {ENGINE_BACKEND} engine ({profile['description']})...")
+    engine = create_engine(SERVER_PROFILE, ENGINE_BACKEND)
+
+    # 어댑터 목록은 한 번만 스캔 (요청마다 파일시스템을 확인하지 않음)
+    adapter_registry = AdapterRegistry(ADAPTER_DIR, max_loras=profile["engine_args"]["max_loras"])
+    serving_metrics = ServingMetrics(SERVER_PROFILE, log_path=REQUEST_LOG or f"request_log_{SERVER_PROFILE}.jsonl")
+    # 같은 프롬프트 반복 요청(큐레이터 화면 등)은 엔진을 거치지 않고 캐시에서 응답
+    if profile["response_cache"]:
+        response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+    # 과부하 시 무한정 쌓지 않고 빠르게 429/503, 짧은 chat_bot 요청을 먼저 입장 (끄면 제한 없이 집계만)
+    if profile["admission_control"]:
+        admission = AdmissionController(MAX_INFLIGHT, MAX_QUEUE, QUEUE_TIMEOUT)
+    else:
+        admission = AdmissionController(max_inflight=None)
+
+    loaded = await adapter_registry.preload(engine, PRELOAD_ADAPTERS)
+    print(f">>> Preloaded adapters: {loaded}")
+
+@app.on_event("shutdown")
+async def close_server():
+    # 버퍼에 남은 요청 로그를 파일에 씀
+    if serving_metrics is not None:
+        serving_metrics.close()
 
 # 3. 데이터 구조 정의
 class ChatRequest(BaseModel):
     prompt: str
     adapter_type: str = "chat_bot"
     max_tokens: int = 128
+    # 결정적 생성 (opt-in): 이 경우에만 응답을 캐시함
+    deterministic: bool = False     # True -> temperature 0 (greedy)
+    seed: Optional[int] = None      # 고정 seed 샘플링
+    # 입장 우선순위: interactive / standard / batch (없으면 어댑터별 기본값)
+    priority: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    items: List[ChatRequest]
+    stream: bool = False    # True -> 항목이 끝나는 대로 SSE로 전송
+
+def sampling_options(request):
+    options = {"temperature": 0.0 if request.deterministic else 0.7, "max_tokens": request.max_tokens}
+    if request.seed is not None:
+        options["seed"] = request.seed
+    return options
+
+def cache_key(request, lora_req):
+    """결정적 요청이면 캐시 키, 아니면 None (샘플링 결과는 재사용하면 안 됨)"""
+    if response_cache is None or (not request.deterministic and request.seed is None):
+        return None
+    # lora_id 포함: 어댑터를 reload 하면 이전 가중치로 만든 응답은 더 이상 맞지 않음
+    adapter = f"{request.adapter_type}#{lora_req.lora_int_id}"
+    return make_cache_key(adapter, request.prompt, sampling_options(request))
 
 # 4. 추론 엔드포인트
-@app.post("/generate")
-async def generate_response(request: ChatRequest):
+def make_lora_request(adapter_type):
+    lora_req = adapter_registry.acquire(adapter_type)
+    if lora_req is None:
+        raise HTTPException(status_code=400, detail=f"Adapter '{adapter_type}' not found.")
+    return lora_req
+
+
+def request_priority(request, default=None):
+    """요청의 priority -> 대기열 순위 (요청 값 > default > 어댑터별 기본값)"""
+    name = request.priority or default or ADAPTER_PRIORITY.get(request.adapter_type, "standard")
+    if name not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority '{name}' (choose from {list(PRIORITY_CLASSES)}).")
+    return PRIORITY_CLASSES[name]
+
+
+async def admit(priority, bounded=True):
+    """엔진에 들어갈 자리를 기다림 -> AdmissionTicket. 대기열이 가득 차면 429, 너무 오래 기다리면 503"""
+    try:
+        return await admission.admit(priority, bounded)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def cancel_on_disconnect(http_request, awaitable):
+    """awaitable 을 실행하다가 클라이언트 연결이 끊기면 취소 (-> stream_text 에서 엔진 요청 abort)"""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_S)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client disconnected.")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def stream_text(request, lora_req, usage=None):
+    """engine.generate을 감싸서 (새로 생성된 텍스트 조각, 전체 텍스트)를 순서대로 내보냄. 요청이 끝나면 지표/로그 기록.
+
+    usage(dict)를 넘기면 끝날 때 prompt_tokens / completion_tokens / cached_tokens(prefix cache 적중) 를 채워줌.
+    """
+    request_id = f"req-{os.urandom(4).hex()}"
+
+    t0 = time.perf_counter()
+    ttft = None
+    text = ""
+    request_output = None
+    status = "error"
     try:
-        adapter_path = os.path.join(ADAPTER_DIR, request.adapter_type)
-        if not os.path.exists(adapter_path):
-            raise HTTPException(status_code=400, detail=f"Adapter '{request.adapter_type}' not found.")
-
-        lora_id = 1 if request.adapter_type == "art_curator" else 2
-        lora_req = LoRARequest(request.adapter_type, lora_id, adapter_path)
-        
-        sampling_params = SamplingParams(temperature=0.7, max_tokens=request.max_tokens)
-        request_id = f"req-{os.urandom(4).hex()}"
-        
         results_generator = engine.generate(
             request.prompt, 
-            sampling_params, 
+            sampling_options(request), 
             request_id=request_id, 
-            lora_request=lora_req
+            adapter=lora_req
         )
+        async for request_output in results_generator:
+            new_text = request_output.outputs[0].text
+            delta = new_text[len(text):]
+            text = new_text
+            if delta and ttft is None:
+                ttft = time.perf_counter() - t0
+            yield delta, text
+        status = "success"
+    except (GeneratorExit, asyncio.CancelledError):
+        # 클라이언트가 끊김 -> 엔진에서도 바로 중단 (남은 토큰을 생성하느라 batch 자리를 쓰지 않도록)
+        status = "aborted"
+        asyncio.ensure_future(engine.abort(request_id))
+        raise
+    finally:
+        # 토큰 수는 엔진이 실제로 처리한 값 (글자 수 추정 아님)
+        entry = serving_metrics.record(
+            request_id, request.adapter_type, status,
+            prompt_tokens=len(request_output.prompt_token_ids or []) if request_output else 0,
+            completion_tokens=len(request_output.outputs[0].token_ids) if request_output else 0,
+            queue_wait_s=engine_queue_wait(request_output),
+            ttft_s=ttft,
+            e2e_latency_s=time.perf_counter() - t0,
+            cached_tokens=getattr(request_output, "num_cached_tokens", None) or 0,   # vLLM 버전에 따라 없을 수 있음
+        )
+        if usage is not None:
+            usage.update(prompt_tokens=entry["prompt_tokens"], completion_tokens=entry["completion_tokens"],
+                         cached_tokens=entry["cached_tokens"])
+        ttft_text = "n/a" if ttft is None else f"{ttft:.4f}s"
+        tpot_text = "n/a" if entry["tpot_s"] is None else f"{entry['tpot_s'] * 1000:.1f}ms"
+        print(f"[{request_id}] adapter={request.adapter_type} status={status} "
+              f"tokens={entry['prompt_tokens']}+{entry['completion_tokens']} | TTFT: {ttft_text} | "
+              f"TPOT: {tpot_text} | Total latency: {entry['e2e_latency_s']:.4f}s")
+
 
+async def generate_text(request, lora_req, priority, bounded=True):
+    """캐시 확인 후 (입장 제어를 거쳐) 전체 응답 생성. (응답, 캐시 사용 여부) 반환"""
+    key = cache_key(request, lora_req)
+    cached = response_cache.get(key) if key is not None else None
+    if cached is not None:
+        return cached, True
+
+    ticket = await admit(priority, bounded)
+    try:
         final_output = ""
-        async for request_output in results_generator:
-            final_output = request_output.outputs[0].text
+        async for _, final_output in stream_text(request, lora_req):
+            pass
+    finally:
+        ticket.release()
+
+    if key is not None:
+        response_cache.put(key, final_output)
+    return final_output, False
+
 
-        return {"status": "success", "response": final_output}
+@app.post("/generate")
+async def generate_response(request: ChatRequest, http_request: Request):
+    try:
+        lora_req = make_lora_request(request.adapter_type)
+        priority = request_priority(request)
+        final_output, cached = await cancel_on_disconnect(http_request, generate_text(request, lora_req, priority))
+        return {"status": "success", "response": final_output, "cached": cached}
 
+    except HTTPException:
+        raise   # 400 (어댑터 / priority), 429 / 503 (과부하) 는 HTTP 상태 코드로 응답
     except Exception as e:
         print(f"Server Error: {str(e)}")
         return {"status": "error", "detail": str(e)}
 
-if __name__ == "__main__":
+
+def sse_event(data):
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# Server-Sent Events: 토큰이 생성되는 대로 텍스트 조각(delta)을 전송
+#   data: {"delta": "..."}   (반복)
+#   data: {"done": true, "usage": {...}}  (종료, 토큰 수 포함) / data: {"error": "..."} (실패)
+# 과부하로 입장하지 못하면 스트림을 열기 전에 HTTP 429 / 503.
+# 클라이언트가 연결을 끊으면 생성기가 닫히면서 엔진 요청도 abort 됨.
+@app.post("/generate_stream")
+async def generate_stream(request: ChatRequest):
+    lora_req = make_lora_request(request.adapter_type)
+    priority = request_priority(request)
+    key = cache_key(request, lora_req)
+    cached = response_cache.get(key) if key is not None else None
+    # 캐시 적중은 엔진을 쓰지 않으므로 입장 제어를 거치지 않음
+    ticket = await admit(priority) if cached is None else None
+
+    async def event_stream():
+        try:
+            if cached is not None:
+                yield sse_event({"delta": cached})
+                yield sse_event({"done": True, "cached": True})
+                return
+
+            final_output = ""
+            usage = {}
+            async for delta, final_output in stream_text(request, lora_req, usage):
+                if delta:
+                    yield sse_event({"delta": delta})
+            if key is not None:
+                response_cache.put(key, final_output)
+            yield sse_event({"done": True, "cached": False, "usage": usage})
+        except Exception as e:
+            print(f"Server Error: {str(e)}")
+            yield sse_event({"error": str(e)})
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+async def run_batch_item(index, item):
+    """배치의 한 항목 실행. 실패해도 예외 대신 항목별 에러를 반환
+
+    배치 항목은 기본 우선순위 batch, 대기열 한도 없이 순서를 기다림 (대화형 요청이 먼저 입장)
+    """
+    try:
+        lora_req = make_lora_request(item.adapter_type)
+        priority = request_priority(item, default="batch")
+        text, cached = await generate_text(item, lora_req, priority, bounded=False)
+        return {"index": index, "status": "success", "response": text, "cached": cached}
+    except HTTPException as e:
+        return {"index": index, "status": "error", "detail": e.detail}
+    except Exception as e:
+        print(f"Server Error: {str(e)}")
+        return {"index": index, "status": "error", "detail": str(e)}
+
+
+# 여러 프롬프트를 한 번에 엔진에 제출 -> vLLM continuous batching 으로 함께 처리
+#   stream=False : {"results": [...]} (입력 순서대로)
+#   stream=True  : 항목이 끝나는 순서대로 data: {"index": i, ...}, 마지막에 data: {"done": true}
+@app.post("/generate_batch")
+async def generate_batch(request: BatchRequest, http_request: Request):
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_BATCH_ITEMS}).")
+
+    tasks = [asyncio.create_task(run_batch_item(i, item)) for i, item in enumerate(request.items)]
+    if not request.stream:
+        return {"status": "success", "results": await cancel_on_disconnect(http_request, asyncio.gather(*tasks))}
+
+    async def event_stream():
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield sse_event(await next_result)
+            yield sse_event({"done": True})
+        finally:
+            for task in tasks:      # 연결이 끊기면 남은 항목 취소
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/cache_stats")
+async def cache_stats():
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+
+@app.get("/admission_stats")
+async def admission_stats():
+    return admission.stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(serving_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# 어댑터 관리: 목록 / 최근 사용 목록 조회, 새 어댑터 추가, 가중치 교체
+@app.get("/adapters")
+async def list_adapters():
+    return adapter_registry.stats()
+
+
+@app.post("/adapters/scan")
+async def scan_adapters():
+    return {"added": adapter_registry.scan(), **adapter_registry.stats()}
+
+
+@app.post("/adapters/{name}/reload")
+async def reload_adapter(name: str):
+    lora_req = await adapter_registry.reload(engine, name)
+    if lora_req is None:
+        raise HTTPException(status_code=404, detail=f"Adapter '{name}' not registered.")
+    return {"name": name, "lora_id": lora_req.lora_int_id}
+
+
+@app.get("/profile")
+async def server_profile():
+    return {"profile": SERVER_PROFILE, "engine": ENGINE_BACKEND, **get_profile(SERVER_PROFILE)}
+
+
+def main(argv=None):
+    global SERVER_PROFILE, ENGINE_BACKEND
+
+    parser = argparse.ArgumentParser(description="Art curator inference server")
+    parser.add_argument("--profile", choices=sorted(ENGINE_PROFILES), default=SERVER_PROFILE)
+    parser.add_argument("--engine", choices=ENGINE_BACKENDS, default=ENGINE_BACKEND)
+    parser.add_argument("--host", default="0.0.0.0")
     # [수정 완료] 포트를 8080으로 통일했습니다.
-    print(">>> Starting API Server on Port 8080...")
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    SERVER_PROFILE = args.profile
+    ENGINE_BACKEND = args.engine
+    print(f">>> Starting API Server ({SERVER_PROFILE}, {ENGINE_BACKEND}) on Port {args.port}...")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
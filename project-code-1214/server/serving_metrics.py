@@ -0,0 +1,179 @@
+import math
+import os
+import sys
+import threading
+import time
+
+# 요청 로그 writer 는 run_log.py 와 같은 코드 (project-code-1214/jsonl_writer.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonl_writer import BufferedJsonlWriter
+
+# 요청 단위 서빙 지표 (Prometheus text format 으로 /metrics 에 노출)
+#   - 히스토그램: TTFT, TPOT, queue wait, end-to-end latency, prompt / completion 토큰 수
+#   - 카운터: 요청 수(status 별), 생성 토큰 수 -> rate() 로 어댑터별 tok/s,
+#             prefix cache 로 재사용한 프롬프트 토큰 수 (/ llm_prompt_tokens_total = 절약한 prefill 비율)
+# 모든 지표는 adapter / profile(baseline, optimized) 라벨을 가짐.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (1, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+LOG_FLUSH_EVERY = 64       # 요청 로그: 이만큼 모이면 바로 write
+LOG_FLUSH_INTERVAL_S = 1.0  # 덜 모여도 이 시간이 지나면 write
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 과 같은 의미: _bucket / _sum / _count)"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series = {}   # labels -> [bucket별 개수, sum, count]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(self.label_names, labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class ServingMetrics:
+    """요청 기록을 받아 지표를 갱신하고, 구조화된 요청 로그(JSONL)를 남김"""
+
+    LABELS = ("adapter", "profile")
+
+    def __init__(self, profile, log_path=None):
+        self.profile = profile
+        self.log_path = log_path
+        self._log = (BufferedJsonlWriter(log_path, LOG_FLUSH_EVERY, LOG_FLUSH_INTERVAL_S, name="request-log-writer")
+                     if log_path else None)
+        self._lock = threading.Lock()
+        self.requests = Counter("llm_requests_total", "Finished generation requests.", self.LABELS + ("status",))
+        self.generated_tokens = Counter("llm_generated_tokens_total", "Completion tokens generated.", self.LABELS)
+        self.prompt_tokens_total = Counter("llm_prompt_tokens_total", "Prompt tokens processed.", self.LABELS)
+        self.cached_tokens_total = Counter("llm_prompt_tokens_cached_total",
+                                           "Prompt tokens served from the prefix cache (prefill skipped).", self.LABELS)
+        self.histograms = {
+            "queue_wait_s": Histogram("llm_request_queue_wait_seconds", "Time from arrival to first scheduling.",
+                                      self.LABELS, LATENCY_BUCKETS),
+            "ttft_s": Histogram("llm_request_ttft_seconds", "Time to first token.", self.LABELS, LATENCY_BUCKETS),
+            "tpot_s": Histogram("llm_request_tpot_seconds", "Time per output token after the first.",
+                                self.LABELS, LATENCY_BUCKETS),
+            "e2e_latency_s": Histogram("llm_request_e2e_latency_seconds", "End-to-end request latency.",
+                                       self.LABELS, LATENCY_BUCKETS),
+            "prompt_tokens": Histogram("llm_request_prompt_tokens", "Prompt length in tokens.",
+                                       self.LABELS, TOKEN_BUCKETS),
+            "completion_tokens": Histogram("llm_request_completion_tokens", "Completion length in tokens.",
+                                           self.LABELS, TOKEN_BUCKETS),
+        }
+
+    def record(self, request_id, adapter, status, prompt_tokens, completion_tokens,
+               queue_wait_s, ttft_s, e2e_latency_s, cached_tokens=0):
+        tpot_s = None
+        if ttft_s is not None and completion_tokens > 1:
+            tpot_s = (e2e_latency_s - ttft_s) / (completion_tokens - 1)
+        entry = {
+            "ts": time.time(),
+            "request_id": request_id,
+            "profile": self.profile,
+            "adapter": adapter,
+            "status": status,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "queue_wait_s": queue_wait_s,
+            "ttft_s": ttft_s,
+            "tpot_s": tpot_s,
+            "e2e_latency_s": e2e_latency_s,
+        }
+
+        labels = (adapter, self.profile)
+        with self._lock:
+            self.requests.inc(labels + (status,))
+            self.generated_tokens.inc(labels, completion_tokens)
+            self.prompt_tokens_total.inc(labels, prompt_tokens)
+            self.cached_tokens_total.inc(labels, cached_tokens)
+            for field, histogram in self.histograms.items():
+                if entry[field] is not None:
+                    histogram.observe(labels, entry[field])
+        if self._log is not None:
+            self._log.write(entry)
+        return entry
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+
+    def render(self):
+        with self._lock:
+            lines = (self.requests.render() + self.generated_tokens.render() + self.prompt_tokens_total.render()
+                     + self.cached_tokens_total.render())
+            for histogram in self.histograms.values():
+                lines += histogram.render()
+        return "\n".join(lines) + "\n"
+
+
+def engine_queue_wait(request_output):
+    """vLLM RequestOutput.metrics 에서 대기 시간(도착 -> 첫 스케줄링)을 꺼냄. 없으면 None"""
+    metrics = getattr(request_output, "metrics", None)
+    if metrics is None:
+        return None
+    if getattr(metrics, "time_in_queue", None) is not None:
+        return metrics.time_in_queue
+    if getattr(metrics, "first_scheduled_time", None) is not None:
+        return metrics.first_scheduled_time - metrics.arrival_time
+    return None
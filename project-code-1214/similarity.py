@@ -0,0 +1,190 @@
+# similarity.py
+# artgraph_db.json 메타데이터(artist / style / genre / material)의 multi-hot + IDF 벡터로 전체 카탈로그에서 비슷한 작품 찾기
+#
+#   색인 생성 (한 번):  python similarity.py build --db artgraph_db.json --out similarity_index
+#   조회:               python similarity.py query water-lilies-6 vincent-van-gogh_the-starry-night-1889 -k 5
+#
+# 색인 = 행마다 L2 정규화된 희소 행렬을 작품 기준(CSR)과 특징 기준(CSC, 특징별 postings) 두 가지로 .npy 에 저장
+#        -> np.load(mmap_mode='r') 로 메모리에 다 올리지 않고 사용.
+# 조회는 쿼리들이 쓰는 특징의 postings 만 모아서 (쿼리 x 작품) 점수 행렬을 한 번의 벡터 연산으로 계산
+# (여러 작품을 한 번에 조회하면 같은 연산에 함께 들어감).
+import argparse
+import json
+import os
+
+import numpy as np
+
+FACETS = ("artist", "style", "genre", "material")
+INDEX_DIR = "similarity_index"
+QUERY_CHUNK = 64       # top_k_batch 에서 한 번에 점수를 계산하는 쿼리 수 (점수 행렬 = QUERY_CHUNK x 작품 수)
+
+
+def _features(info):
+    meta = info.get('metadata', {})
+    return sorted({f"{facet}:{v}" for facet in FACETS for v in meta.get(facet, [])})
+
+
+def build_index(art_db, out_dir=INDEX_DIR):
+    """multi-hot + IDF (smooth: log((1+N)/(1+df)) + 1) 행렬을 CSR 로 만들어 out_dir 에 저장"""
+    ids = sorted(art_db)
+    rows = [_features(art_db[pid]) for pid in ids]
+    vocab = sorted({f for feats in rows for f in feats})
+    column = {f: j for j, f in enumerate(vocab)}
+
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(feats) for feats in rows])
+    indices = np.fromiter((column[f] for feats in rows for f in feats), dtype=np.int32, count=int(indptr[-1]))
+
+    df = np.bincount(indices, minlength=len(vocab))
+    idf = (np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32)
+    data = idf[indices]
+    # 행마다 L2 정규화 -> 내적 = cosine
+    row = np.repeat(np.arange(len(ids)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row, weights=data ** 2, minlength=len(ids))).astype(np.float32)
+    data /= norms[row]
+
+    # 같은 행렬의 특징 기준 (CSC): 특징마다 (작품 행 번호, 값)
+    order = np.argsort(indices, kind="stable")
+    col_indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    col_indptr[1:] = np.cumsum(df)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(out_dir, "indices.npy"), indices)
+    np.save(os.path.join(out_dir, "data.npy"), data)
+    np.save(os.path.join(out_dir, "col_indptr.npy"), col_indptr)
+    np.save(os.path.join(out_dir, "col_rows.npy"), row[order].astype(np.int32))
+    np.save(os.path.join(out_dir, "col_data.npy"), data[order])
+    np.save(os.path.join(out_dir, "idf.npy"), idf)
+    with open(os.path.join(out_dir, "ids.json"), 'w', encoding='utf-8') as f:
+        json.dump(ids, f)
+    with open(os.path.join(out_dir, "vocab.json"), 'w', encoding='utf-8') as f:
+        json.dump(vocab, f)
+    return len(ids), len(vocab), len(indices)
+
+
+class SimilarityIndex:
+    def __init__(self, index_dir=INDEX_DIR, mmap=True):
+        mode = 'r' if mmap else None
+        self.indptr = np.load(os.path.join(index_dir, "indptr.npy"), mmap_mode=mode)
+        self.indices = np.load(os.path.join(index_dir, "indices.npy"), mmap_mode=mode)
+        self.data = np.load(os.path.join(index_dir, "data.npy"), mmap_mode=mode)
+        self.col_indptr = np.load(os.path.join(index_dir, "col_indptr.npy"), mmap_mode=mode)
+        self.col_rows = np.load(os.path.join(index_dir, "col_rows.npy"), mmap_mode=mode)
+        self.col_data = np.load(os.path.join(index_dir, "col_data.npy"), mmap_mode=mode)
+        self.idf = np.load(os.path.join(index_dir, "idf.npy"))
+        with open(os.path.join(index_dir, "ids.json"), 'r', encoding='utf-8') as f:
+            self.ids = json.load(f)
+        with open(os.path.join(index_dir, "vocab.json"), 'r', encoding='utf-8') as f:
+            self.vocab = {feature: j for j, feature in enumerate(json.load(f))}
+        self.row_of = {pid: i for i, pid in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query_matrix(self, pids):
+        """색인에 있는 작품들의 벡터를 밀집 행렬 (len(pids), 특징 수) 로"""
+        queries = np.zeros((len(pids), len(self.vocab)), dtype=np.float32)
+        for q, pid in enumerate(pids):
+            start, end = self.indptr[self.row_of[pid]], self.indptr[self.row_of[pid] + 1]
+            queries[q, self.indices[start:end]] = self.data[start:end]
+        return queries
+
+    def encode(self, infos):
+        """색인에 없는 작품(메타데이터 dict)도 같은 방식으로 벡터화. 색인에 없는 특징은 무시"""
+        queries = np.zeros((len(infos), len(self.vocab)), dtype=np.float32)
+        for q, info in enumerate(infos):
+            cols = [self.vocab[f] for f in _features(info) if f in self.vocab]
+            queries[q, cols] = self.idf[cols]
+            norm = np.linalg.norm(queries[q])
+            if norm > 0:
+                queries[q] /= norm
+        return queries
+
+    def scores(self, queries):
+        """(쿼리 수, 작품 수) cosine 점수 = queries @ X^T.
+
+        쿼리의 0 이 아닌 특징마다 그 특징의 postings (작품 행, 값) 을 모두 펼쳐서 (쿼리, 작품) 위치별로 한 번의
+        bincount 로 합산 -> 쿼리가 쓰는 postings 길이에 비례하는 비용, 쿼리 여러 개도 같은 연산 한 번.
+        """
+        n = len(self.ids)
+        q_rows, q_cols = np.nonzero(queries)
+        starts, lengths = self.col_indptr[q_cols], np.diff(self.col_indptr)[q_cols]
+        # 여러 postings 구간 [start, start + length) 을 한 번에 모으는 위치 배열
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        flat = np.repeat(q_rows.astype(np.int64) * n, lengths) + self.col_rows[positions]
+        weights = np.repeat(queries[q_rows, q_cols], lengths) * self.col_data[positions]
+        out = np.bincount(flat, weights=weights, minlength=queries.shape[0] * n)
+        return out.reshape(queries.shape[0], n).astype(np.float32)
+
+    def top_k(self, pid, k=10):
+        return self.top_k_batch([pid], k)[0]
+
+    def top_k_batch(self, pids, k=10, exclude_self=True):
+        """작품마다 [(id, cosine)] k개. 모든 쿼리를 한 번의 행렬 연산으로 점수 계산, 같은 점수면 id 순"""
+        results = []
+        for start in range(0, len(pids), QUERY_CHUNK):
+            chunk = pids[start:start + QUERY_CHUNK]
+            scores = self.scores(self.query_matrix(chunk))
+            if exclude_self:
+                scores[np.arange(len(chunk)), [self.row_of[pid] for pid in chunk]] = -np.inf
+            results += self._top_k(scores, k)
+        return results
+
+    def search(self, infos, k=10):
+        """메타데이터 dict 들로 조회 (업로드된 작품처럼 색인에 없는 경우)"""
+        results = []
+        for start in range(0, len(infos), QUERY_CHUNK):
+            results += self._top_k(self.scores(self.encode(infos[start:start + QUERY_CHUNK])), k)
+        return results
+
+    def _top_k(self, scores, k):
+        """행마다 점수 상위 k개 (점수 내림차순, 같은 점수면 id 순). 전체 정렬 없이 행렬 단위로 계산"""
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in scores]
+        # 대부분 0 인 행에서는 partition(scores, -k) 가 매우 느려서 부호를 바꿔 앞쪽 k 개로 찾음
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        # k 번째 점수와 같은 작품은 (id 순서 = 행 순서) 앞에서부터 모자란 만큼만
+        ties = scores == kth
+        need = k - above.sum(axis=1)
+        for r in np.flatnonzero(ties.sum(axis=1) > need):
+            ties[r, np.flatnonzero(ties[r])[need[r]:]] = False
+        rows, cols = np.nonzero(above | ties)
+        order = np.lexsort((cols, -scores[rows, cols], rows))
+        results = [[] for _ in scores]
+        for r, c in zip(rows[order], cols[order]):
+            if np.isfinite(scores[r, c]):
+                results[r].append((self.ids[c], float(scores[r, c])))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-hot IDF similarity index over artgraph_db.json metadata.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="encode the DB and write the memory-mappable index")
+    build.add_argument("--db", default="artgraph_db.json")
+    build.add_argument("--out", default=INDEX_DIR)
+    query = sub.add_parser("query", help="top-k similar artworks for one or more artwork ids")
+    query.add_argument("ids", nargs="+")
+    query.add_argument("--index", default=INDEX_DIR)
+    query.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with open(args.db, 'r', encoding='utf-8') as f:
+            art_db = json.load(f)
+        n, features, nnz = build_index(art_db, args.out)
+        print(f">>> Indexed {n} artworks, {features} features, {nnz} non-zeros -> {args.out}")
+        return
+
+    index = SimilarityIndex(args.index)
+    for pid, neighbors in zip(args.ids, index.top_k_batch(args.ids, args.k)):
+        print(f"=== {pid} ===")
+        for other, score in neighbors:
+            print(f"  {score:.4f}  {other}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# thumbnails.py
+# 갤러리용 썸네일: 원본을 한 번만 표시 크기로 줄여 디스크(THUMB_DIR)에 저장하고, 인코딩된 JPEG bytes 를
+# 메모리 LRU (전체 바이트 수 제한) 에 보관 -> 렌더링 시간 / 전송 바이트가 원본 크기와 무관.
+#
+#   일괄 생성:  python thumbnails.py --image-dir images
+#   app.py:    st.image(thumbnails.get(img_path))
+#
+# 원본이 바뀌면 (mtime / 크기) 썸네일 파일 이름(해시)이 달라지므로 자동으로 다시 생성됨.
+import argparse
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+THUMB_DIR = "./thumbnails"
+THUMB_SIZE = (480, 480)            # 갤러리 한 칸 (페이지 폭의 1/3) 보다 약간 크게
+THUMB_QUALITY = 85
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def make_thumbnail(image_path, size=THUMB_SIZE, quality=THUMB_QUALITY):
+    """원본을 size 안에 들어가게 줄인 JPEG bytes"""
+    with Image.open(image_path) as img:
+        # JPEG 는 디코딩 단계에서 1/2, 1/4, 1/8 로 줄여 읽음 (큰 원본도 전체 해상도로 풀지 않음)
+        img.draft("RGB", size)
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(size, Image.LANCZOS)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(self, thumb_dir=THUMB_DIR, size=THUMB_SIZE, max_bytes=CACHE_MAX_BYTES):
+        self.thumb_dir = thumb_dir
+        self.size = tuple(size)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # 원본 경로 -> (버전 키, JPEG bytes), 오래 안 쓴 순서
+        self._bytes = 0
+        self._lock = threading.Lock()   # Streamlit 세션(스레드)들이 같은 캐시를 공유
+        self.hits = 0
+        self.disk_hits = 0
+        self.generated = 0
+
+    def _version(self, image_path):
+        st = os.stat(image_path)
+        text = f"{os.path.abspath(image_path)}|{st.st_mtime_ns}|{st.st_size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    def thumb_path(self, image_path, version):
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        return os.path.join(self.thumb_dir, f"{stem}.{version}.jpg")
+
+    def get(self, image_path):
+        """썸네일 JPEG bytes. 원본이 없으면 None"""
+        try:
+            version = self._version(image_path)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(image_path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(image_path)
+                self.hits += 1
+                return entry[1]
+
+        path = self.thumb_path(image_path, version)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            self.disk_hits += 1
+        else:
+            data = make_thumbnail(image_path, self.size)
+            os.makedirs(self.thumb_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)     # 다른 세션이 반쯤 쓴 파일을 읽지 않도록
+            self.generated += 1
+
+        self._put(image_path, version, data)
+        return data
+
+    def _put(self, image_path, version, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(image_path, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[image_path] = (version, data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "disk_hits": self.disk_hits, "generated": self.generated}
+
+
+def precompute(image_dir, cache):
+    """image_dir 의 모든 이미지 썸네일을 미리 생성하고, 같은 이미지의 이전 버전(원본이 바뀌기 전) 썸네일은 삭제"""
+    current = {}
+    for name in sorted(os.listdir(image_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image_path = os.path.join(image_dir, name)
+        cache.get(image_path)
+        thumb = os.path.basename(cache.thumb_path(image_path, cache._version(image_path)))
+        current[thumb.rsplit(".", 2)[0]] = thumb
+
+    removed = 0
+    for name in os.listdir(cache.thumb_dir) if os.path.isdir(cache.thumb_dir) else []:
+        stem = name.rsplit(".", 2)[0]
+        if name.endswith(".jpg") and stem in current and name != current[stem]:
+            os.remove(os.path.join(cache.thumb_dir, name))
+            removed += 1
+    return len(current), removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute gallery thumbnails for every image in a directory.")
+    parser.add_argument("--image-dir", default="./images")
+    parser.add_argument("--thumb-dir", default=THUMB_DIR)
+    parser.add_argument("--size", type=int, default=THUMB_SIZE[0], help="max width / height in pixels")
+    args = parser.parse_args()
+
+    cache = ThumbnailCache(args.thumb_dir, size=(args.size, args.size))
+    count, removed = precompute(args.image_dir, cache)
+    print(f">>> {count} thumbnails in {args.thumb_dir} (generated {cache.generated}, removed {removed} stale)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,27 @@
-from .ops import BatchNormCustom
+from .ops import BatchNormCustom, MEMORY_POLICIES, backward_memory_footprint, batchnorm
+from .chunked import BatchNormChunkedCustom
+from .fused import BatchNormAddReLUCustom, BatchNormReLUCustom
+from .modules import BatchNorm1dCustom, BatchNorm2dCustom, BatchNorm3dCustom, convert_model
+from .fold import FoldedBatchNorm, fold_batchnorm, fold_layer_batchnorm, verify_folding
+from .distributed import SyncBatchNormCustom, SyncBatchNormCustomFunction, convert_sync_batchnorm
 
-__all__ = ["BatchNormCustom"]
\ No newline at end of file
+__all__ = [
+    "BatchNormCustom",
+    "MEMORY_POLICIES",
+    "backward_memory_footprint",
+    "batchnorm",
+    "BatchNormChunkedCustom",
+    "BatchNormReLUCustom",
+    "BatchNormAddReLUCustom",
+    "BatchNorm1dCustom",
+    "BatchNorm2dCustom",
+    "BatchNorm3dCustom",
+    "convert_model",
+    "FoldedBatchNorm",
+    "fold_batchnorm",
+    "fold_layer_batchnorm",
+    "verify_folding",
+    "SyncBatchNormCustom",
+    "SyncBatchNormCustomFunction",
+    "convert_sync_batchnorm",
+]
\ No newline at end of file
@@ -0,0 +1,189 @@
+import torch
+from torch import Tensor
+from typing import Tuple
+
+from .ops import (
+    _acc_dtype, _batch_stats, _batchnorm_eval_backward, _channel_shape, _grad_input, _grad_sums, _welford_merge,
+)
+
+# Streaming BatchNorm: the batch is processed in micro-batches of `chunk_size`
+# samples, so every temporary is chunk-sized and only the output / grad_input
+# are full-size.
+#   ghost=False : exact. Partial statistics are merged (parallel Welford), the
+#                 result equals BatchNorm over the whole batch.
+#   ghost=True  : ghost batch norm. Each chunk is normalized with its own
+#                 statistics and updates the running statistics like a batch.
+
+
+@torch.library.custom_op("my_ops::batchnorm_forward_chunked", mutates_args=("running_mean", "running_var"))
+def batchnorm_forward_chunked(
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    beta: Tensor,            # [C]
+    running_mean: Tensor,    # [C]
+    running_var: Tensor,     # [C]
+    training: bool,
+    momentum: float,
+    eps: float,
+    chunk_size: int,
+    ghost: bool
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """forward pass of BatchNorm over micro-batches; save_mean / save_invstd are [num_chunks, C] when ghost."""
+
+    shape = _channel_shape(input)
+    acc_dtype = _acc_dtype(input.dtype)
+    chunks = input.split(chunk_size)
+
+    if not training:
+        mean = running_mean.to(acc_dtype).expand(1, -1)
+        var = running_var.to(acc_dtype).expand(1, -1)
+    elif ghost:
+        stats = [_batch_stats(part) for part in chunks]
+        mean = torch.stack([chunk_mean for chunk_mean, _ in stats])
+        var = torch.stack([chunk_var for _, chunk_var in stats])
+    else:
+        mean = m2 = None
+        n = 0
+        for part in chunks:
+            part_mean, part_var = _batch_stats(part)
+            n_part = part.numel() // part.shape[1]
+            if mean is None:
+                mean, m2, n = part_mean, part_var * n_part, n_part
+            else:
+                mean, m2, n = _welford_merge(mean, m2, n, part_mean, part_var * n_part, n_part)
+        mean = mean.unsqueeze(0)
+        var = (m2 / n).unsqueeze(0)
+
+    if training:
+        # one running-statistics update per (ghost) batch, with the unbiased variance
+        for part, part_mean, part_var in zip(chunks if ghost else [input], mean, var):
+            m = part.numel() // part.shape[1]
+            running_mean.mul_(1 - momentum).add_(momentum * part_mean.to(running_mean.dtype))
+            running_var.mul_(1 - momentum).add_(momentum * part_var.to(running_var.dtype) * (m / max(m - 1, 1)))
+
+    # mean / var are [num_chunks, C] for ghost training, [1, C] otherwise
+    invstd = torch.rsqrt(var + eps)
+    scale = gamma.to(acc_dtype) * invstd
+    shift = beta.to(acc_dtype) - mean * scale
+
+    output = torch.empty_like(input)
+    for i, (part, out) in enumerate(zip(chunks, output.split(chunk_size))):
+        j = i if scale.shape[0] > 1 else 0
+        torch.addcmul(shift[j].view(shape), part, scale[j].view(shape), out=out)
+
+    if ghost and training:
+        return output, mean, invstd
+    return output, mean[0].clone(), invstd[0].clone()
+
+
+@torch.library.custom_op("my_ops::batchnorm_backward_chunked", mutates_args=())
+def batchnorm_backward_chunked(
+    grad_output: Tensor,     # [N, C, *]
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    save_mean: Tensor,       # [C], or [num_chunks, C] when ghost
+    save_invstd: Tensor,     # [C], or [num_chunks, C] when ghost
+    chunk_size: int,
+    ghost: bool
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """backward pass of BatchNorm over micro-batches with chunk-sized temporaries."""
+
+    acc_dtype = save_invstd.dtype
+    gamma_acc = gamma.to(acc_dtype)
+
+    input_chunks = input.split(chunk_size)
+    grad_output_chunks = grad_output.split(chunk_size)
+    grad_input = torch.empty_like(input)
+    grad_input_chunks = grad_input.split(chunk_size)
+
+    if ghost:
+        groups = [(i, i + 1) for i in range(len(input_chunks))]
+        means, invstds = save_mean, save_invstd
+    else:
+        groups = [(0, len(input_chunks))]
+        means, invstds = save_mean.unsqueeze(0), save_invstd.unsqueeze(0)
+
+    grad_gamma = torch.zeros_like(gamma_acc, dtype=torch.float64)
+    grad_beta = torch.zeros_like(gamma_acc, dtype=torch.float64)
+    for (start, stop), mean, invstd in zip(groups, means, invstds.double()):
+        # pass 1: per-chunk sum(dy) and sum(dy * (x - mean)), each chunk's grad_input
+        # slot serving as the scratch buffer
+        sum_dy = sum_dy_centered = 0
+        for dy, x, dx in zip(grad_output_chunks[start:stop], input_chunks[start:stop], grad_input_chunks[start:stop]):
+            part_dy, part_centered = _grad_sums(dy, x, mean, dx)
+            sum_dy = sum_dy + part_dy
+            sum_dy_centered = sum_dy_centered + part_centered
+        m = sum(x.numel() for x in input_chunks[start:stop]) // input.shape[1]
+
+        # sum(dy * x_hat) = invstd * sum(dy * (x - mean))
+        sum_dy_x_hat = invstd * sum_dy_centered
+        grad_beta += sum_dy
+        grad_gamma += sum_dy_x_hat
+
+        # pass 2: grad_input = k * dy + a * (x - mean) + c, written chunk by chunk
+        k = gamma_acc.double() * invstd
+        coef_centered = (-k * invstd * sum_dy_x_hat / m).to(acc_dtype)
+        coef_bias = (-k * sum_dy / m).to(acc_dtype)
+        k = k.to(acc_dtype)
+        for dy, x, dx in zip(grad_output_chunks[start:stop], input_chunks[start:stop], grad_input_chunks[start:stop]):
+            _grad_input(dy, x, mean, k, coef_centered, coef_bias, out=dx)
+
+    return grad_input, grad_gamma.to(gamma.dtype), grad_beta.to(gamma.dtype)
+
+
+@batchnorm_forward_chunked.register_fake
+def _(input, gamma, beta, running_mean, running_var, training, momentum, eps, chunk_size, ghost):
+    C = input.shape[1]
+    acc_dtype = _acc_dtype(input.dtype)
+    stats_shape = ((input.shape[0] + chunk_size - 1) // chunk_size, C) if ghost and training else (C,)
+    return (
+        torch.empty_like(input),
+        input.new_empty(stats_shape, dtype=acc_dtype),
+        input.new_empty(stats_shape, dtype=acc_dtype),
+    )
+
+
+@batchnorm_backward_chunked.register_fake
+def _(grad_output, input, gamma, save_mean, save_invstd, chunk_size, ghost):
+    return torch.empty_like(input), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+class BatchNormChunkedCustom(torch.autograd.Function):
+    """
+    Streaming BatchNorm over micro-batches of ``chunk_size`` samples.
+
+    Peak temporary memory is bounded by the chunk size instead of N. With
+    ghost=False the result equals BatchNormCustom; with ghost=True every chunk
+    is normalized with its own statistics (ghost batch norm).
+
+    Usage:
+        output = BatchNormChunkedCustom.apply(input, gamma, beta, running_mean, running_var,
+                                              training, momentum, eps, chunk_size, ghost)
+    """
+
+    @staticmethod
+    def forward(ctx, input, gamma, beta, running_mean, running_var, training, momentum, eps, chunk_size, ghost=False):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_forward_chunked(
+            input, gamma, beta, running_mean, running_var, training, momentum, eps, chunk_size, ghost
+        )
+        ctx.training = training
+        ctx.chunk_size = chunk_size
+        ctx.ghost = ghost
+        ctx.save_for_backward(input, gamma, save_mean, save_invstd)
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        input, gamma, save_mean, save_invstd = ctx.saved_tensors
+        if not ctx.training:
+            grad_input, grad_gamma, grad_beta = _batchnorm_eval_backward(
+                grad_output, input, gamma, save_mean, save_invstd
+            )
+        else:
+            grad_input, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_backward_chunked(
+                grad_output, input, gamma, save_mean, save_invstd, ctx.chunk_size, ctx.ghost
+            )
+        return grad_input, grad_gamma, grad_beta, None, None, None, None, None, None, None
@@ -0,0 +1,166 @@
+from typing import Optional
+
+import torch
+import torch.distributed as dist
+import torch.nn as nn
+from torch import Tensor
+from torch.nn.modules.batchnorm import _BatchNorm
+
+from .modules import _BatchNormCustom
+from .ops import _acc_dtype, _batch_stats, _channel_shape, _grad_input, _grad_sums
+
+
+class SyncBatchNormCustomFunction(torch.autograd.Function):
+    """
+    BatchNorm with statistics synchronized across a torch.distributed process group.
+
+    forward : one all_reduce of the packed per-channel [sum, sum of squares, count]
+    backward: one all_reduce of the packed per-channel [sum(dy), sum(dy * x)]
+
+    grad_gamma / grad_beta are returned for the local batch only; the data-parallel
+    wrapper (e.g. DistributedDataParallel) reduces them like any other parameter.
+
+    Usage:
+        output = SyncBatchNormCustomFunction.apply(input, gamma, beta, running_mean, running_var, momentum, eps, group)
+    """
+
+    @staticmethod
+    def forward(ctx, input, gamma, beta, running_mean, running_var, momentum, eps, process_group):
+        C = input.shape[1]
+        shape = _channel_shape(input)
+        count = input.numel() // C
+
+        # Local sums are derived from single-pass statistics and packed in fp64,
+        # so the whole forward needs exactly one collective.
+        mean, var = _batch_stats(input)
+        local_sum = mean.double() * count
+        local_sum_sq = (var.double() + mean.double().square()) * count
+        packed = torch.cat([local_sum, local_sum_sq, local_sum.new_full((1,), count)])
+        dist.all_reduce(packed, op=dist.ReduceOp.SUM, group=process_group)
+
+        total_count = packed[2 * C].item()
+        global_mean = packed[:C] / total_count
+        global_var = (packed[C:2 * C] / total_count - global_mean.square()).clamp_(min=0)
+
+        running_mean.mul_(1 - momentum).add_(momentum * global_mean.to(running_mean.dtype))
+        unbiased_var = global_var * (total_count / max(total_count - 1, 1))
+        running_var.mul_(1 - momentum).add_(momentum * unbiased_var.to(running_var.dtype))
+
+        acc_dtype = _acc_dtype(input.dtype)
+        save_mean = global_mean.to(acc_dtype)
+        save_invstd = torch.rsqrt(global_var + eps).to(acc_dtype)
+        scale = gamma.to(acc_dtype) * save_invstd
+        shift = beta.to(acc_dtype) - save_mean * scale
+        output = torch.empty_like(input)
+        torch.addcmul(shift.view(shape), input, scale.view(shape), out=output)
+
+        ctx.process_group = process_group
+        ctx.total_count = total_count
+        ctx.save_for_backward(input, gamma, save_mean, save_invstd)
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        input, gamma, save_mean, save_invstd = ctx.saved_tensors
+        C = input.shape[1]
+        m = ctx.total_count
+
+        # one activation-sized buffer (input's dtype and memory format):
+        # dy * (x - global mean), later reused for grad_input
+        buffer = torch.empty_like(input)
+        local_sums = torch.cat(_grad_sums(grad_output, input, save_mean, buffer))
+        invstd = save_invstd.double()
+        grad_beta = local_sums[:C].to(gamma.dtype)
+        grad_gamma = (invstd * local_sums[C:]).to(gamma.dtype)
+
+        # centered on the global mean, so the local sums add up to the global ones
+        dist.all_reduce(local_sums, op=dist.ReduceOp.SUM, group=ctx.process_group)
+        sum_grad_output = local_sums[:C]
+        sum_grad_output_x_hat = invstd * local_sums[C:]
+
+        # grad_input = k * (dy - sum(dy) / m - x_hat * sum(dy * x_hat) / m), k = gamma * invstd,
+        # over the global batch, in the per-channel form k * dy + a * (x - mean) + c
+        acc_dtype = save_invstd.dtype
+        k = gamma.double() * invstd
+        coef_centered = (-k * invstd * sum_grad_output_x_hat / m).to(acc_dtype)
+        coef_bias = (-k * sum_grad_output / m).to(acc_dtype)
+        _grad_input(grad_output, input, save_mean, k.to(acc_dtype), coef_centered, coef_bias, out=buffer)
+
+        return buffer, grad_gamma, grad_beta, None, None, None, None, None
+
+
+class SyncBatchNormCustom(_BatchNormCustom):
+    """
+    Custom BatchNorm whose training statistics are reduced over a process group.
+
+    Works with any backend that supports all_reduce on the input's device
+    (gloo for CPU). Outside training, or without an initialized process group
+    of more than one rank, it behaves like the local custom BatchNorm.
+    """
+
+    def __init__(
+        self,
+        num_features: int,
+        eps: float = 1e-5,
+        momentum: float = 0.1,
+        affine: bool = True,
+        track_running_stats: bool = True,
+        process_group: Optional[dist.ProcessGroup] = None,
+        device=None,
+        dtype=None,
+        memory_policy: str = "recompute",
+    ) -> None:
+        super().__init__(num_features, eps, momentum, affine, track_running_stats, device, dtype, memory_policy)
+        self.process_group = process_group
+
+    def _check_input_dim(self, input: Tensor) -> None:
+        if input.dim() < 2:
+            raise ValueError(f"expected at least 2D input (got {input.dim()}D input)")
+
+    def forward(self, input: Tensor) -> Tensor:
+        bn_training = self.training or (self.running_mean is None and self.running_var is None)
+        world_size = dist.get_world_size(self.process_group) if dist.is_available() and dist.is_initialized() else 1
+        if not bn_training or world_size == 1:
+            return super().forward(input)
+
+        self._check_input_dim(input)
+        exponential_average_factor = self._exponential_average_factor()
+        gamma, beta, running_mean, running_var = self._op_tensors(input)
+        return SyncBatchNormCustomFunction.apply(
+            input, gamma, beta, running_mean, running_var,
+            exponential_average_factor, self.eps, self.process_group or dist.group.WORLD,
+        )
+
+
+def convert_sync_batchnorm(module: nn.Module, process_group: Optional[dist.ProcessGroup] = None) -> nn.Module:
+    """
+    Recursively replace nn.BatchNorm* and custom BatchNorm layers with SyncBatchNormCustom.
+
+    Parameters and buffers are shared with the original layers. Usage:
+        model = convert_sync_batchnorm(model, process_group)
+    """
+    module_output = module
+    if isinstance(module, _BatchNorm) and not isinstance(module, SyncBatchNormCustom):
+        module_output = SyncBatchNormCustom(
+            module.num_features,
+            module.eps,
+            module.momentum,
+            module.affine,
+            module.track_running_stats,
+            process_group,
+            memory_policy=getattr(module, "memory_policy", "recompute"),
+        )
+        if module.affine:
+            module_output.weight = module.weight
+            module_output.bias = module.bias
+        module_output.running_mean = module.running_mean
+        module_output.running_var = module.running_var
+        module_output.num_batches_tracked = module.num_batches_tracked
+        module_output.training = module.training
+        if hasattr(module, "qconfig"):
+            module_output.qconfig = module.qconfig
+
+    for name, child in module.named_children():
+        module_output.add_module(name, convert_sync_batchnorm(child, process_group))
+    del module
+    return module_output
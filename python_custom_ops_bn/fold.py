@@ -0,0 +1,156 @@
+import copy
+from typing import Iterable, Optional, Sequence, Tuple
+
+import torch
+import torch.nn as nn
+from torch import Tensor
+from torch.nn.modules.batchnorm import _BatchNorm
+
+from .ops import _channel_affine
+
+# Layers whose output channels live in weight dim 0 and can absorb a BatchNorm
+FOLDABLE_LAYERS = (nn.Conv1d, nn.Conv2d, nn.Conv3d, nn.Linear)
+
+
+class FoldedBatchNorm(nn.Module):
+    """
+    Inference-only BatchNorm reduced to a cached per-channel affine.
+
+    scale = gamma / sqrt(running_var + eps) and shift = beta - running_mean * scale
+    are computed once, so a forward pass is a single fused multiply-add.
+    """
+
+    def __init__(self, scale: Tensor, shift: Tensor) -> None:
+        super().__init__()
+        self.register_buffer("scale", scale)
+        self.register_buffer("shift", shift)
+
+    @classmethod
+    def from_batchnorm(cls, bn: _BatchNorm) -> "FoldedBatchNorm":
+        return cls(*_batchnorm_scale_shift(bn))
+
+    def forward(self, input: Tensor) -> Tensor:
+        # computed in the buffers' precision, returned in the input's dtype and memory format
+        return _channel_affine(input, self.scale, self.shift)
+
+    def extra_repr(self) -> str:
+        return f"num_features={self.scale.numel()}"
+
+
+def _batchnorm_scale_shift(bn: _BatchNorm) -> Tuple[Tensor, Tensor]:
+    with torch.no_grad():
+        scale = torch.rsqrt(bn.running_var + bn.eps)
+        if bn.weight is not None:
+            scale = scale * bn.weight
+        shift = -bn.running_mean * scale
+        if bn.bias is not None:
+            shift = shift + bn.bias
+    return scale, shift
+
+
+def _can_fold(bn: nn.Module) -> bool:
+    # without running statistics eval-mode BatchNorm still normalizes by batch statistics
+    return isinstance(bn, _BatchNorm) and bn.running_mean is not None and bn.running_var is not None
+
+
+def fold_layer_batchnorm(layer: nn.Module, bn: _BatchNorm) -> nn.Module:
+    """Return a copy of ``layer`` (Conv1d/2d/3d or Linear) with ``bn`` folded into its weight and bias."""
+    if not isinstance(layer, FOLDABLE_LAYERS):
+        raise TypeError(f"cannot fold BatchNorm into {type(layer).__name__}")
+    if not _can_fold(bn):
+        raise ValueError("BatchNorm without running statistics cannot be folded")
+    if layer.weight.shape[0] != bn.num_features:
+        raise ValueError(
+            f"{type(layer).__name__} has {layer.weight.shape[0]} output channels, "
+            f"BatchNorm has {bn.num_features} features"
+        )
+
+    scale, shift = _batchnorm_scale_shift(bn)
+    folded = copy.deepcopy(layer)
+    with torch.no_grad():
+        weight = layer.weight * scale.view((-1,) + (1,) * (layer.weight.dim() - 1)).to(layer.weight.dtype)
+        bias = shift if layer.bias is None else layer.bias * scale + shift
+        folded.weight = nn.Parameter(weight, requires_grad=layer.weight.requires_grad)
+        folded.bias = nn.Parameter(bias.to(layer.weight.dtype), requires_grad=layer.weight.requires_grad)
+    return folded
+
+
+def _set_submodule(model: nn.Module, name: str, module: nn.Module) -> None:
+    parent_name, _, child_name = name.rpartition(".")
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, child_name, module)
+
+
+def _sequential_pairs(model: nn.Module) -> Iterable[Tuple[str, str]]:
+    # Only nn.Sequential guarantees that child order is dataflow order
+    for name, module in model.named_modules():
+        if not isinstance(module, nn.Sequential):
+            continue
+        prefix = f"{name}." if name else ""
+        children = list(module.named_children())
+        for (layer_name, layer), (bn_name, bn) in zip(children, children[1:]):
+            if isinstance(layer, FOLDABLE_LAYERS) and _can_fold(bn):
+                yield prefix + layer_name, prefix + bn_name
+
+
+def fold_batchnorm(
+    model: nn.Module,
+    pairs: Optional[Sequence[Tuple[str, str]]] = None,
+    example_inputs: Optional[Sequence[Tensor]] = None,
+    inplace: bool = False,
+) -> nn.Module:
+    """
+    Fold inference-mode BatchNorm layers (nn.BatchNorm* or the custom modules) away.
+
+    Each BatchNorm directly following a Conv/Linear inside an nn.Sequential is
+    folded into that layer's weight and bias and replaced by nn.Identity.
+    ``pairs`` adds explicit (layer_name, bn_name) pairs for models whose forward
+    is not a Sequential. Every remaining BatchNorm becomes a FoldedBatchNorm.
+
+    If ``example_inputs`` is given, the folded model is checked against the
+    original with verify_folding().
+    """
+    if model.training:
+        raise ValueError("fold_batchnorm requires a model in eval mode; call model.eval() first")
+
+    reference = None
+    if example_inputs is not None:
+        reference = copy.deepcopy(model) if inplace else model
+    folded_model = model if inplace else copy.deepcopy(model)
+
+    fold_pairs = list(pairs or []) + list(_sequential_pairs(folded_model))
+    folded_names = set()
+    for layer_name, bn_name in fold_pairs:
+        if bn_name in folded_names:
+            continue
+        layer = folded_model.get_submodule(layer_name)
+        bn = folded_model.get_submodule(bn_name)
+        _set_submodule(folded_model, layer_name, fold_layer_batchnorm(layer, bn))
+        _set_submodule(folded_model, bn_name, nn.Identity())
+        folded_names.add(bn_name)
+
+    for name, module in list(folded_model.named_modules()):
+        if _can_fold(module):
+            _set_submodule(folded_model, name, FoldedBatchNorm.from_batchnorm(module))
+
+    if reference is not None:
+        verify_folding(reference, folded_model, *example_inputs)
+    return folded_model
+
+
+def verify_folding(
+    reference: nn.Module,
+    folded: nn.Module,
+    *example_inputs: Tensor,
+    atol: float = 1e-5,
+    rtol: float = 1e-4,
+) -> float:
+    """Run both models in eval mode and return the max abs difference; raise if they disagree."""
+    with torch.no_grad():
+        expected = reference.eval()(*example_inputs)
+        actual = folded.eval()(*example_inputs)
+
+    max_diff = torch.abs(expected - actual).max().item()
+    if not torch.allclose(expected, actual, atol=atol, rtol=rtol):
+        raise RuntimeError(f"folded model differs from the reference model (max abs diff {max_diff:.3e})")
+    return max_diff
@@ -0,0 +1,200 @@
+import torch
+from torch import Tensor
+from typing import Tuple
+
+from .ops import _acc_dtype, _batchnorm_eval_backward, _grad_input, _grad_sums, _relu_backward, batchnorm_forward
+
+# BatchNorm fused with the ReLU (and residual add) that follows it in a ResNet block.
+# The forward writes BN, add and ReLU into a single output buffer, and only the
+# input and that output are saved: the ReLU mask is recovered from output > 0,
+# so neither the BN output nor the pre-activation sum is kept alive.
+
+
+def _batchnorm_coefficients(input, gamma, save_invstd, sum_dy, sum_dy_centered):
+    # grad_input = k * (dy - sum(dy) / m - x_hat * sum(dy * x_hat) / m), k = gamma * invstd,
+    # in the per-channel form  k * dy + a * (x - mean) + c
+    acc_dtype = save_invstd.dtype
+    m = input.numel() // input.shape[1]
+    invstd = save_invstd.double()
+    sum_dy_x_hat = invstd * sum_dy_centered
+    k = gamma.double() * invstd
+    coef_centered = (-k * invstd * sum_dy_x_hat / m).to(acc_dtype)
+    coef_bias = (-k * sum_dy / m).to(acc_dtype)
+    return sum_dy_x_hat, k.to(acc_dtype), coef_centered, coef_bias
+
+
+@torch.library.custom_op("my_ops::batchnorm_relu_forward", mutates_args=("running_mean", "running_var"))
+def batchnorm_relu_forward(
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    beta: Tensor,            # [C]
+    running_mean: Tensor,    # [C]
+    running_var: Tensor,     # [C]
+    training: bool,
+    momentum: float,
+    eps: float
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """forward pass of relu(BatchNorm(input)) into a single output buffer."""
+
+    output, save_mean, save_invstd = batchnorm_forward(
+        input, gamma, beta, running_mean, running_var, training, momentum, eps
+    )
+    return output.relu_(), save_mean, save_invstd
+
+
+@torch.library.custom_op("my_ops::batchnorm_add_relu_forward", mutates_args=("running_mean", "running_var"))
+def batchnorm_add_relu_forward(
+    input: Tensor,           # [N, C, *]
+    residual: Tensor,        # [N, C, *]
+    gamma: Tensor,           # [C]
+    beta: Tensor,            # [C]
+    running_mean: Tensor,    # [C]
+    running_var: Tensor,     # [C]
+    training: bool,
+    momentum: float,
+    eps: float
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """forward pass of relu(BatchNorm(input) + residual) into a single output buffer."""
+
+    output, save_mean, save_invstd = batchnorm_forward(
+        input, gamma, beta, running_mean, running_var, training, momentum, eps
+    )
+    return output.add_(residual).relu_(), save_mean, save_invstd
+
+
+@torch.library.custom_op("my_ops::batchnorm_relu_backward", mutates_args=())
+def batchnorm_relu_backward(
+    grad_output: Tensor,     # [N, C, *]
+    output: Tensor,          # [N, C, *] saved forward output, carries the ReLU mask
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    save_mean: Tensor,       # [C]
+    save_invstd: Tensor      # [C]
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """backward pass of relu(BatchNorm(input)) using a single activation-sized buffer."""
+
+    # The masked gradient is cheap to rebuild, so the one buffer holds it,
+    # then the masked dy * (x - mean) for the reduction, then the masked
+    # gradient again and finally grad_input.
+    buffer = torch.empty_like(input)
+    sum_dy, sum_dy_centered = _grad_sums(grad_output, input, save_mean, buffer, output=output)
+
+    sum_dy_x_hat, k, coef_centered, coef_bias = _batchnorm_coefficients(
+        input, gamma, save_invstd, sum_dy, sum_dy_centered
+    )
+    _grad_input(grad_output, input, save_mean, k, coef_centered, coef_bias, out=buffer, output=output)
+    return buffer, sum_dy_x_hat.to(gamma.dtype), sum_dy.to(gamma.dtype)
+
+
+@torch.library.custom_op("my_ops::batchnorm_add_relu_backward", mutates_args=())
+def batchnorm_add_relu_backward(
+    grad_output: Tensor,     # [N, C, *]
+    output: Tensor,          # [N, C, *] saved forward output, carries the ReLU mask
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    save_mean: Tensor,       # [C]
+    save_invstd: Tensor      # [C]
+) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+    """backward pass of relu(BatchNorm(input) + residual); returns grad_input, grad_residual, grad_gamma, grad_beta."""
+
+    # grad_residual is the masked gradient itself; grad_input's buffer doubles
+    # as scratch for the reduction, so both results are the only allocations.
+    grad_residual = _relu_backward(grad_output, output, torch.empty_like(grad_output))
+    grad_input = torch.empty_like(input)
+    sum_dy, sum_dy_centered = _grad_sums(grad_residual, input, save_mean, grad_input)
+
+    sum_dy_x_hat, k, coef_centered, coef_bias = _batchnorm_coefficients(
+        input, gamma, save_invstd, sum_dy, sum_dy_centered
+    )
+    _grad_input(grad_residual, input, save_mean, k, coef_centered, coef_bias, out=grad_input)
+    return grad_input, grad_residual, sum_dy_x_hat.to(gamma.dtype), sum_dy.to(gamma.dtype)
+
+
+@batchnorm_relu_forward.register_fake
+def _(input, gamma, beta, running_mean, running_var, training, momentum, eps):
+    C = input.shape[1]
+    acc_dtype = _acc_dtype(input.dtype)
+    return torch.empty_like(input), input.new_empty(C, dtype=acc_dtype), input.new_empty(C, dtype=acc_dtype)
+
+
+@batchnorm_add_relu_forward.register_fake
+def _(input, residual, gamma, beta, running_mean, running_var, training, momentum, eps):
+    C = input.shape[1]
+    acc_dtype = _acc_dtype(input.dtype)
+    return torch.empty_like(input), input.new_empty(C, dtype=acc_dtype), input.new_empty(C, dtype=acc_dtype)
+
+
+@batchnorm_relu_backward.register_fake
+def _(grad_output, output, input, gamma, save_mean, save_invstd):
+    return torch.empty_like(input), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+@batchnorm_add_relu_backward.register_fake
+def _(grad_output, output, input, gamma, save_mean, save_invstd):
+    return torch.empty_like(input), torch.empty_like(grad_output), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+def _masked_eval_backward(grad_output, output, input, gamma, save_mean, save_invstd):
+    grad_bn = _relu_backward(grad_output, output, torch.empty_like(grad_output))
+    return (grad_bn,) + _batchnorm_eval_backward(grad_bn, input, gamma, save_mean, save_invstd)
+
+
+class BatchNormReLUCustom(torch.autograd.Function):
+    """
+    relu(BatchNorm(input)) as one custom op with a fused backward.
+
+    Saves the input and the output only; the ReLU mask is read from output > 0.
+
+    Usage:
+        output = BatchNormReLUCustom.apply(input, gamma, beta, running_mean, running_var, training, momentum, eps)
+    """
+
+    @staticmethod
+    def forward(ctx, input, gamma, beta, running_mean, running_var, training, momentum, eps):
+        output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_relu_forward(
+            input, gamma, beta, running_mean, running_var, training, momentum, eps
+        )
+        ctx.training = training
+        ctx.save_for_backward(output, input, gamma, save_mean, save_invstd)
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        if ctx.training:
+            grad_input, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_relu_backward(
+                grad_output, *ctx.saved_tensors
+            )
+        else:
+            _, grad_input, grad_gamma, grad_beta = _masked_eval_backward(grad_output, *ctx.saved_tensors)
+        return grad_input, grad_gamma, grad_beta, None, None, None, None, None
+
+
+class BatchNormAddReLUCustom(torch.autograd.Function):
+    """
+    relu(BatchNorm(input) + residual) as one custom op with a fused backward.
+
+    The residual is not saved; its gradient is the ReLU-masked grad_output.
+
+    Usage:
+        output = BatchNormAddReLUCustom.apply(input, residual, gamma, beta, running_mean, running_var,
+                                              training, momentum, eps)
+    """
+
+    @staticmethod
+    def forward(ctx, input, residual, gamma, beta, running_mean, running_var, training, momentum, eps):
+        output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_add_relu_forward(
+            input, residual, gamma, beta, running_mean, running_var, training, momentum, eps
+        )
+        ctx.training = training
+        ctx.save_for_backward(output, input, gamma, save_mean, save_invstd)
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        if ctx.training:
+            grad_input, grad_residual, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_add_relu_backward(
+                grad_output, *ctx.saved_tensors
+            )
+        else:
+            grad_residual, grad_input, grad_gamma, grad_beta = _masked_eval_backward(grad_output, *ctx.saved_tensors)
+        return grad_input, grad_residual, grad_gamma, grad_beta, None, None, None, None, None
@@ -0,0 +1,187 @@
+from typing import Optional
+
+import torch
+import torch.nn as nn
+from torch import Tensor
+from torch.nn.modules.batchnorm import _BatchNorm
+
+from .chunked import BatchNormChunkedCustom
+from .fold import _batchnorm_scale_shift
+from .ops import BatchNormCustom, MEMORY_POLICIES, _acc_dtype, _channel_affine
+
+
+class _BatchNormCustom(_BatchNorm):
+    """
+    nn.Module wrapper around BatchNormCustom.
+
+    Parameters and buffers are inherited from torch.nn's _BatchNorm, so the
+    state_dict layout is the same as nn.BatchNorm*.
+
+    In eval mode the per-channel scale / shift derived from the running
+    statistics is cached and reused until a parameter or buffer changes
+    (tracked through tensor version counters and storage).
+
+    With ``chunk_size`` set, training runs BatchNormChunkedCustom over
+    micro-batches of that many samples (exact statistics, or ghost batch
+    norm with ``ghost=True``) instead of using ``memory_policy``.
+    """
+
+    def __init__(
+        self,
+        num_features: int,
+        eps: float = 1e-5,
+        momentum: float = 0.1,
+        affine: bool = True,
+        track_running_stats: bool = True,
+        device=None,
+        dtype=None,
+        memory_policy: str = "recompute",
+        chunk_size: Optional[int] = None,
+        ghost: bool = False,
+    ) -> None:
+        super().__init__(num_features, eps, momentum, affine, track_running_stats, device, dtype)
+        if memory_policy not in MEMORY_POLICIES:
+            raise ValueError(f"memory_policy must be one of {MEMORY_POLICIES}, got {memory_policy!r}")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if ghost and chunk_size is None:
+            raise ValueError("ghost batch norm requires chunk_size")
+        self.memory_policy = memory_policy
+        self.chunk_size = chunk_size
+        self.ghost = ghost
+        self._eval_cache = None
+
+    def _eval_scale_shift(self):
+        tensors = tuple(t for t in (self.weight, self.bias, self.running_mean, self.running_var) if t is not None)
+        key = tuple((t.data_ptr(), t._version) for t in tensors) + (self.eps, torch.is_inference_mode_enabled())
+        if self._eval_cache is None or self._eval_cache[0] != key:
+            # detached aliases keep the storages alive so their addresses cannot be reused
+            self._eval_cache = (key, tuple(t.detach() for t in tensors)) + _batchnorm_scale_shift(self)
+        return self._eval_cache[2], self._eval_cache[3]
+
+    def invalidate_cache(self) -> None:
+        self._eval_cache = None
+
+    def train(self, mode: bool = True):
+        self.invalidate_cache()
+        return super().train(mode)
+
+    def _exponential_average_factor(self) -> float:
+        # same momentum / num_batches_tracked handling as nn.BatchNorm*
+        exponential_average_factor = 0.0 if self.momentum is None else self.momentum
+        if self.training and self.track_running_stats and self.num_batches_tracked is not None:
+            self.num_batches_tracked.add_(1)
+            if self.momentum is None:
+                exponential_average_factor = 1.0 / float(self.num_batches_tracked)
+        return exponential_average_factor
+
+    def _op_tensors(self, input: Tensor):
+        # The custom op always takes gamma / beta and running buffers; substitute
+        # identity parameters and scratch statistics when they are disabled.
+        C = self.num_features
+        acc_dtype = _acc_dtype(input.dtype)
+        gamma = self.weight if self.affine else input.new_ones(C, dtype=acc_dtype)
+        beta = self.bias if self.affine else input.new_zeros(C, dtype=acc_dtype)
+        if self.running_mean is None:
+            running_mean, running_var = input.new_zeros(C, dtype=acc_dtype), input.new_ones(C, dtype=acc_dtype)
+        else:
+            running_mean, running_var = self.running_mean, self.running_var
+        return gamma, beta, running_mean, running_var
+
+    def forward(self, input: Tensor) -> Tensor:
+        self._check_input_dim(input)
+        exponential_average_factor = self._exponential_average_factor()
+
+        bn_training = self.training or (self.running_mean is None and self.running_var is None)
+
+        # Constant statistics: reuse the cached affine unless gradients for
+        # gamma / beta are needed (or torch.compile is tracing the module).
+        needs_param_grad = torch.is_grad_enabled() and self.affine and (
+            self.weight.requires_grad or self.bias.requires_grad
+        )
+        if not bn_training and not needs_param_grad and not torch.compiler.is_compiling():
+            scale, shift = self._eval_scale_shift()
+            return _channel_affine(input, scale, shift)
+
+        gamma, beta, running_mean, running_var = self._op_tensors(input)
+        if self.chunk_size is not None and bn_training:
+            return BatchNormChunkedCustom.apply(
+                input, gamma, beta, running_mean, running_var,
+                bn_training, exponential_average_factor, self.eps, self.chunk_size, self.ghost,
+            )
+        return BatchNormCustom.apply(
+            input, gamma, beta, running_mean, running_var,
+            bn_training, exponential_average_factor, self.eps, self.memory_policy,
+        )
+
+    def extra_repr(self) -> str:
+        extra = super().extra_repr() + f", memory_policy={self.memory_policy}"
+        if self.chunk_size is not None:
+            extra += f", chunk_size={self.chunk_size}, ghost={self.ghost}"
+        return extra
+
+
+class BatchNorm1dCustom(_BatchNormCustom):
+    """Drop-in replacement for nn.BatchNorm1d on 2D or 3D input [N, C] / [N, C, L]."""
+
+    def _check_input_dim(self, input: Tensor) -> None:
+        if input.dim() != 2 and input.dim() != 3:
+            raise ValueError(f"expected 2D or 3D input (got {input.dim()}D input)")
+
+
+class BatchNorm2dCustom(_BatchNormCustom):
+    """Drop-in replacement for nn.BatchNorm2d on 4D input [N, C, H, W]."""
+
+    def _check_input_dim(self, input: Tensor) -> None:
+        if input.dim() != 4:
+            raise ValueError(f"expected 4D input (got {input.dim()}D input)")
+
+
+class BatchNorm3dCustom(_BatchNormCustom):
+    """Drop-in replacement for nn.BatchNorm3d on 5D input [N, C, D, H, W]."""
+
+    def _check_input_dim(self, input: Tensor) -> None:
+        if input.dim() != 5:
+            raise ValueError(f"expected 5D input (got {input.dim()}D input)")
+
+
+_CUSTOM_BATCHNORM = {
+    nn.BatchNorm1d: BatchNorm1dCustom,
+    nn.BatchNorm2d: BatchNorm2dCustom,
+    nn.BatchNorm3d: BatchNorm3dCustom,
+}
+
+
+def convert_model(module: nn.Module, memory_policy: str = "recompute") -> nn.Module:
+    """
+    Recursively replace nn.BatchNorm1d/2d/3d layers with the custom modules.
+
+    The new layers share the original parameters and buffers, so state_dicts
+    stay interchangeable. Usage:
+        model = convert_model(model)
+    """
+    module_output = module
+    custom_cls = _CUSTOM_BATCHNORM.get(type(module))
+    if custom_cls is not None:
+        module_output = custom_cls(
+            module.num_features,
+            module.eps,
+            module.momentum,
+            module.affine,
+            module.track_running_stats,
+            memory_policy=memory_policy,
+        )
+        if module.affine:
+            module_output.weight = module.weight
+            module_output.bias = module.bias
+        module_output.running_mean = module.running_mean
+        module_output.running_var = module.running_var
+        module_output.num_batches_tracked = module.num_batches_tracked
+        module_output.training = module.training
+        if hasattr(module, "qconfig"):
+            module_output.qconfig = module.qconfig
+
+    for name, child in module.named_children():
+        module_output.add_module(name, convert_model(child, memory_policy))
+    del module
+    return module_output
@@ -1,11 +1,155 @@
 import torch
 from torch import Tensor
-from typing import Tuple
+from typing import Dict, Sequence, Tuple
+
+# Backward memory policies accepted by BatchNormCustom
+#   "recompute" : save the input, rebuild x_hat in backward (reference path)
+#   "fused"     : save the input, compute all gradients with one activation-sized buffer
+#   "xhat"      : save the normalized input instead of the input
+#   "xhat_bf16" : same as "xhat" but x_hat is stored in bfloat16
+MEMORY_POLICIES = ("recompute", "fused", "xhat", "xhat_bf16")
+
+
+def _reduce_dims(input: Tensor):
+    # statistics are per channel: reduce over every dim of [N, C, *] except C
+    return [0] + list(range(2, input.dim()))
+
+
+def _channel_shape(input: Tensor):
+    # broadcast shape of a per-channel [C] tensor against [N, C, *]
+    return (1, input.shape[1]) + (1,) * (input.dim() - 2)
+
+
+def _channel_affine(input: Tensor, scale: Tensor, shift: Tensor) -> Tensor:
+    """input * scale + shift per channel, out of place so autograd can track it.
+
+    The result is cast back to the input's dtype (scale / shift may be float32) and
+    made channels_last only when the input is and addcmul did not keep it.
+    """
+    shape = _channel_shape(input)
+    output = torch.addcmul(shift.view(shape), input, scale.view(shape)).to(input.dtype)
+    if input.dim() in (4, 5) and not input.is_contiguous():
+        memory_format = torch.channels_last if input.dim() == 4 else torch.channels_last_3d
+        if input.is_contiguous(memory_format=memory_format):
+            output = output.contiguous(memory_format=memory_format)
+    return output
+
+
+# Inputs in these dtypes get float32 statistics, scale / shift and gradient sums
+_REDUCED_PRECISION = (torch.float16, torch.bfloat16)
+
+# Elements upcast to float32 at a time while reducing statistics of reduced-precision input
+_STATS_CHUNK_NUMEL = 1 << 22
+
+
+def _acc_dtype(dtype: torch.dtype) -> torch.dtype:
+    return torch.float32 if dtype in _REDUCED_PRECISION else dtype
+
+
+def _welford_merge(mean_a, m2_a, n_a, mean_b, m2_b, n_b):
+    # Chan et al. parallel merge of two partial (mean, sum of squared deviations, count)
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    m2 = m2_a + m2_b + delta.square() * (n_a * n_b / n)
+    return mean, m2, n
+
+
+def _batch_stats(input: Tensor) -> Tuple[Tensor, Tensor]:
+    """Per-channel mean and biased variance of [N, C, *], in the accumulation dtype."""
+
+    dims = _reduce_dims(input)
+    if input.dtype not in _REDUCED_PRECISION:
+        var, mean = torch.var_mean(input, dim=dims, unbiased=False)
+        return mean, var
+
+    # Upcast a few samples at a time (keeping the memory format) instead of
+    # materializing a full float32 copy, and merge the partial statistics exactly.
+    chunk = max(1, _STATS_CHUNK_NUMEL // max(1, input[0].numel()))
+    mean = m2 = None
+    n = 0
+    for part in input.split(chunk):
+        var_part, mean_part = torch.var_mean(part.float(), dim=dims, unbiased=False)
+        n_part = part.numel() // part.shape[1]
+        if mean is None:
+            mean, m2, n = mean_part, var_part * n_part, n_part
+        else:
+            mean, m2, n = _welford_merge(mean, m2, n, mean_part, var_part * n_part, n_part)
+    return mean, m2 / n
+
+
+def _relu_backward(grad_output: Tensor, output: Tensor, out: Tensor) -> Tensor:
+    # out = grad_output where output > 0, else 0 (written in place, no bool mask)
+    return torch.ops.aten.threshold_backward.grad_input(grad_output, output, 0, grad_input=out)
+
+
+def _grad_sums(grad_output: Tensor, input: Tensor, mean: Tensor, buffer=None, output=None):
+    """Per-channel sum(dy) and sum(dy * (x - mean)) in float64.
+
+    The product is taken on the centered input, so sum(dy * x_hat) does not come out of the
+    sum(dy * x) - mean * sum(dy) cancellation. Reduced-precision input is upcast to float32 a few
+    samples at a time; otherwise ``buffer`` (activation-sized, allocated if None) holds the product.
+    With ``output``, dy is masked by output > 0 (BatchNorm followed by ReLU).
+    """
+    dims = _reduce_dims(input)
+    shape = _channel_shape(input)
+    if input.dtype in _REDUCED_PRECISION:
+        chunk = max(1, _STATS_CHUNK_NUMEL // max(1, input[0].numel()))
+        mean = mean.float().view(shape)
+        sum_dy = sum_dy_x = torch.zeros(input.shape[1], dtype=torch.float64, device=input.device)
+        masks = [None] * len(input) if output is None else output.split(chunk)
+        for dy, x, mask in zip(grad_output.split(chunk), input.split(chunk), masks):
+            dy = dy.float()
+            if mask is not None:
+                dy = dy * (mask > 0)
+            sum_dy = sum_dy + torch.sum(dy, dim=dims, dtype=torch.float64)
+            sum_dy_x = sum_dy_x + torch.sum(dy * (x.float() - mean), dim=dims, dtype=torch.float64)
+        return sum_dy, sum_dy_x
+
+    if buffer is None:
+        buffer = torch.empty_like(input)
+    if output is None:
+        sum_dy = torch.sum(grad_output, dim=dims, dtype=torch.float64)
+    else:
+        sum_dy = torch.sum(_relu_backward(grad_output, output, buffer), dim=dims, dtype=torch.float64)
+    torch.sub(input, mean.to(input.dtype).view(shape), out=buffer)
+    if output is not None:
+        _relu_backward(buffer, output, buffer)
+    buffer.mul_(grad_output)
+    return sum_dy, torch.sum(buffer, dim=dims, dtype=torch.float64)
+
+
+def _grad_input(grad_output: Tensor, input: Tensor, mean: Tensor, k: Tensor, coef_centered: Tensor,
+                coef_bias: Tensor, out: Tensor, output=None) -> Tensor:
+    """out = k * dy + coef_centered * (x - mean) + coef_bias, per channel (dy masked by output > 0 if given).
+
+    Reduced-precision input is computed in float32 a few samples at a time and rounded once.
+    """
+    shape = _channel_shape(input)
+    k, coef_centered, coef_bias = k.view(shape), coef_centered.view(shape), coef_bias.view(shape)
+    if input.dtype in _REDUCED_PRECISION:
+        chunk = max(1, _STATS_CHUNK_NUMEL // max(1, input[0].numel()))
+        mean = mean.float().view(shape)
+        k, coef_centered, coef_bias = k.float(), coef_centered.float(), coef_bias.float()
+        masks = [None] * len(input) if output is None else output.split(chunk)
+        for dy, x, dx, mask in zip(grad_output.split(chunk), input.split(chunk), out.split(chunk), masks):
+            dy = dy.float()
+            if mask is not None:
+                dy = dy * (mask > 0)
+            dx.copy_(torch.addcmul(coef_bias, x.float() - mean, coef_centered).addcmul_(dy, k))
+        return out
+
+    # a * dy + b * x + c form: no temporaries besides ``out``
+    if output is None:
+        torch.mul(grad_output, k, out=out)
+    else:
+        _relu_backward(grad_output, output, out).mul_(k)
+    return out.addcmul_(input, coef_centered).add_(coef_bias - coef_centered * mean.view(shape))
 
 # Step 1: Define custom operators using torch.library API
 @torch.library.custom_op("my_ops::batchnorm_forward", mutates_args=("running_mean", "running_var"))
 def batchnorm_forward(
-    input: Tensor,           # [N, C, H, W]
+    input: Tensor,           # [N, C, *]
     gamma: Tensor,           # [C]
     beta: Tensor,            # [C]
     running_mean: Tensor,    # [C]
@@ -14,63 +158,96 @@ def batchnorm_forward(
     momentum: float,
     eps: float
 ) -> Tuple[Tensor, Tensor, Tensor]:
-    """forward pass of BatchNorm for 4D input [N, C, H, W]."""
+    """forward pass of BatchNorm for input [N, C, *] (BatchNorm1d/2d/3d layouts).
 
-    dims = [0, 2, 3] 
-    C = input.shape[1]
+    fp16 / bf16 input is normalized with float32 statistics; save_mean and
+    save_invstd are float32 and the output keeps the input's dtype and memory format.
+    """
+
+    shape = _channel_shape(input)
+    acc_dtype = _acc_dtype(input.dtype)
 
     if training:
-        mean = torch.mean(input, dim=dims)
-        var = torch.var(input, dim=dims, unbiased=False)
+        # Single pass over the input: mean and biased variance are reduced together
+        # (Welford, accumulated in fp32/fp64) instead of two full reductions.
+        mean, var = _batch_stats(input)
 
-        running_mean.mul_((1 - momentum)).add_(momentum * mean.detach())
-        running_var.mul_((1 - momentum)).add_(momentum * var.detach())
+        # running_var tracks the unbiased variance, as nn.BatchNorm* does
+        m = input.numel() // input.shape[1]
+        running_mean.mul_((1 - momentum)).add_(momentum * mean.detach().to(running_mean.dtype))
+        running_var.mul_((1 - momentum)).add_(
+            momentum * var.detach().to(running_var.dtype) * (m / max(m - 1, 1))
+        )
 
         save_mean = mean
-        save_invstd = 1.0 / torch.sqrt(var + eps)
+        save_invstd = torch.rsqrt(var + eps)
     else:
         # 추론 모드일 때
-        mean = running_mean
-        var = running_var
+        mean = running_mean.to(acc_dtype)
+        var = running_var.to(acc_dtype)
         
         # <--- 수정된 부분 ---
         # 입력 텐서(running_mean)를 직접 반환하지 않고, 복사본(.clone())을 반환하도록 수정합니다.
-        save_mean = running_mean.clone()
-        save_invstd = 1.0 / torch.sqrt(var + eps)
+        save_mean = mean.clone() if mean is running_mean else mean
+        save_invstd = torch.rsqrt(var + eps)
 
-    mean_reshaped = mean.view(1, C, 1, 1)
-    invstd_reshaped = save_invstd.view(1, C, 1, 1)
-    gamma_reshaped = gamma.view(1, C, 1, 1)
-    beta_reshaped = beta.view(1, C, 1, 1)
+    # Fold gamma / invstd / beta into a per-channel affine so the output is
+    # produced by one fused multiply-add: output = input * scale + shift.
+    # Writing into empty_like(input) keeps dtype and memory format (e.g. channels_last).
+    scale = gamma.to(acc_dtype) * save_invstd
+    shift = beta.to(acc_dtype) - mean * scale
 
-    normalized_input = (input - mean_reshaped) * invstd_reshaped
-    output = normalized_input * gamma_reshaped + beta_reshaped
+    output = torch.empty_like(input)
+    torch.addcmul(shift.view(shape), input, scale.view(shape), out=output)
     
     return output, save_mean, save_invstd
 
 
+@torch.library.custom_op("my_ops::batchnorm_forward_functional", mutates_args=())
+def batchnorm_forward_functional(
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    beta: Tensor,            # [C]
+    running_mean: Tensor,    # [C]
+    running_var: Tensor,     # [C]
+    training: bool,
+    momentum: float,
+    eps: float
+) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]:
+    """functional variant of batchnorm_forward that returns the updated running statistics."""
+
+    new_running_mean = running_mean.clone()
+    new_running_var = running_var.clone()
+    output, save_mean, save_invstd = batchnorm_forward(
+        input, gamma, beta, new_running_mean, new_running_var, training, momentum, eps
+    )
+    return output, save_mean, save_invstd, new_running_mean, new_running_var
+
+
 @torch.library.custom_op("my_ops::batchnorm_backward", mutates_args=())
 def batchnorm_backward(
-    grad_output: Tensor,     # [N, C, H, W]
-    input: Tensor,           # [N, C, H, W]
+    grad_output: Tensor,     # [N, C, *]
+    input: Tensor,           # [N, C, *]
     gamma: Tensor,           # [C]
     save_mean: Tensor,       # [C]
     save_invstd: Tensor      # [C]
 ) -> Tuple[Tensor, Tensor, Tensor]:
-    """backward pass of BatchNorm for 4D input."""
+    """backward pass of BatchNorm for input [N, C, *]."""
 
-    N, C, H, W = input.shape
-    dims = [0, 2, 3] 
-    m = N * H * W 
+    dims = _reduce_dims(input)
+    shape = _channel_shape(input)
+    m = input.numel() // input.shape[1]
 
-    mean_reshaped = save_mean.view(1, C, 1, 1)
-    invstd_reshaped = save_invstd.view(1, C, 1, 1)
-    gamma_reshaped = gamma.view(1, C, 1, 1)
+    mean_reshaped = save_mean.view(shape)
+    invstd_reshaped = save_invstd.view(shape)
+    gamma_reshaped = gamma.view(shape)
 
+    # save_mean / save_invstd are in the accumulation dtype, so the temporaries below
+    # are promoted to float32 for fp16 / bf16 input
     normalized_input = (input - mean_reshaped) * invstd_reshaped
 
     # --- Calculate Gradients ---
-    grad_beta = torch.sum(grad_output, dim=dims)
+    grad_beta = torch.sum(grad_output, dim=dims, dtype=save_invstd.dtype)
     grad_gamma = torch.sum(grad_output * normalized_input, dim=dims)
 
     grad_normalized = grad_output * gamma_reshaped
@@ -78,30 +255,253 @@ def batchnorm_backward(
     sum_grad_normalized = torch.sum(grad_normalized, dim=dims)
     sum_grad_normalized_x_hat = torch.sum(grad_normalized * normalized_input, dim=dims)
 
-    sum_grad_normalized = sum_grad_normalized.view(1, C, 1, 1)
-    sum_grad_normalized_x_hat = sum_grad_normalized_x_hat.view(1, C, 1, 1)
+    sum_grad_normalized = sum_grad_normalized.view(shape)
+    sum_grad_normalized_x_hat = sum_grad_normalized_x_hat.view(shape)
     
-    grad_input = (1.0 / m) * invstd_reshaped * (
-        m * grad_normalized - sum_grad_normalized - normalized_input * sum_grad_normalized_x_hat
+    # grad_input takes the input's dtype and memory format
+    grad_input = torch.empty_like(input)
+    torch.mul(
+        invstd_reshaped / m,
+        m * grad_normalized - sum_grad_normalized - normalized_input * sum_grad_normalized_x_hat,
+        out=grad_input,
     )
 
-    return grad_input, grad_gamma, grad_beta
+    return grad_input, grad_gamma.to(gamma.dtype), grad_beta.to(gamma.dtype)
+
+
+@torch.library.custom_op("my_ops::batchnorm_backward_fused", mutates_args=())
+def batchnorm_backward_fused(
+    grad_output: Tensor,     # [N, C, *]
+    input: Tensor,           # [N, C, *]
+    gamma: Tensor,           # [C]
+    save_mean: Tensor,       # [C]
+    save_invstd: Tensor      # [C]
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """backward pass of BatchNorm using a single activation-sized buffer."""
+
+    m = input.numel() // input.shape[1]
+
+    # The only activation-sized allocation: it first holds dy * (x - mean)
+    # for the reduction, then is overwritten in place with grad_input. It has
+    # the input's dtype and memory format; per-channel math stays in save_invstd's dtype.
+    # (fp16 / bf16 input is reduced in float32 chunks instead, see _grad_sums.)
+    buffer = torch.empty_like(input)
+    sum_dy, sum_dy_centered = _grad_sums(grad_output, input, save_mean, buffer)
+    grad_beta = sum_dy.to(save_invstd.dtype)
+
+    # sum(dy * x_hat) = invstd * sum(dy * (x - mean))
+    grad_gamma = (save_invstd * sum_dy_centered).to(save_invstd.dtype)
+
+    # grad_input = k * (dy - sum(dy) / m - x_hat * grad_gamma / m) with k = gamma * invstd,
+    # expanded into the per-channel form  k * dy + a * (x - mean) + c
+    k = gamma.to(save_invstd.dtype) * save_invstd
+    coef_centered = -k * save_invstd * grad_gamma / m
+    coef_bias = -k * grad_beta / m
+    _grad_input(grad_output, input, save_mean, k, coef_centered, coef_bias, out=buffer)
+
+    return buffer, grad_gamma.to(gamma.dtype), grad_beta.to(gamma.dtype)
+
+
+@torch.library.custom_op("my_ops::batchnorm_backward_xhat", mutates_args=())
+def batchnorm_backward_xhat(
+    grad_output: Tensor,     # [N, C, *]
+    x_hat: Tensor,           # [N, C, *], normalized input saved by forward
+    gamma: Tensor,           # [C]
+    save_invstd: Tensor      # [C]
+) -> Tuple[Tensor, Tensor, Tensor]:
+    """backward pass of BatchNorm from a saved normalized input."""
+
+    dims = _reduce_dims(x_hat)
+    shape = _channel_shape(x_hat)
+    m = x_hat.numel() // x_hat.shape[1]
+
+    grad_beta = torch.sum(grad_output, dim=dims, dtype=save_invstd.dtype)
+
+    # Same single-buffer scheme as batchnorm_backward_fused; x_hat may be stored
+    # in a narrower dtype, the buffer follows grad_output's dtype and x_hat's layout.
+    buffer = torch.empty_like(x_hat, dtype=grad_output.dtype)
+    torch.mul(grad_output, x_hat, out=buffer)
+    grad_gamma = torch.sum(buffer, dim=dims, dtype=save_invstd.dtype)
+
+    k = gamma.to(save_invstd.dtype) * save_invstd
+    torch.mul(grad_output, k.view(shape), out=buffer)
+    buffer.addcmul_(x_hat, (-k * grad_gamma / m).view(shape))
+    buffer.sub_((k * grad_beta / m).view(shape))
+
+    return buffer, grad_gamma.to(gamma.dtype), grad_beta.to(gamma.dtype)
+
+
+# Fake (meta) implementations: shape/dtype propagation for FakeTensor tracing,
+# so torch.compile can keep the custom ops inside a single graph.
+@batchnorm_forward.register_fake
+def _(input, gamma, beta, running_mean, running_var, training, momentum, eps):
+    C = input.shape[1]
+    acc_dtype = _acc_dtype(input.dtype)
+    return torch.empty_like(input), input.new_empty(C, dtype=acc_dtype), input.new_empty(C, dtype=acc_dtype)
+
+
+@batchnorm_forward_functional.register_fake
+def _(input, gamma, beta, running_mean, running_var, training, momentum, eps):
+    C = input.shape[1]
+    acc_dtype = _acc_dtype(input.dtype)
+    return (
+        torch.empty_like(input), input.new_empty(C, dtype=acc_dtype), input.new_empty(C, dtype=acc_dtype),
+        torch.empty_like(running_mean), torch.empty_like(running_var),
+    )
+
+
+@batchnorm_backward.register_fake
+def _(grad_output, input, gamma, save_mean, save_invstd):
+    return torch.empty_like(input), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+@batchnorm_backward_fused.register_fake
+def _(grad_output, input, gamma, save_mean, save_invstd):
+    return torch.empty_like(input), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+@batchnorm_backward_xhat.register_fake
+def _(grad_output, x_hat, gamma, save_invstd):
+    return torch.empty_like(x_hat, dtype=grad_output.dtype), torch.empty_like(gamma), torch.empty_like(gamma)
+
+
+def _batchnorm_eval_backward(grad_output, input, gamma, save_mean, save_invstd):
+    """backward pass of BatchNorm when the statistics are constants (inference mode)."""
+
+    acc_dtype = save_invstd.dtype
+
+    sum_dy, sum_dy_centered = _grad_sums(grad_output, input, save_mean)
+    grad_beta = sum_dy.to(acc_dtype)
+    grad_gamma = save_invstd * sum_dy_centered.to(acc_dtype)
+    grad_input = torch.empty_like(input)
+    torch.mul(grad_output, (gamma.to(acc_dtype) * save_invstd).view(_channel_shape(input)), out=grad_input)
+    return grad_input, grad_gamma.to(gamma.dtype), grad_beta.to(gamma.dtype)
+
+
+# Op-level autograd: batchnorm_forward mutates the running statistics, so the
+# formula is registered on its functional variant. AOTAutograd can then trace
+# forward and backward of the op without a graph break.
+def _batchnorm_forward_setup_context(ctx, inputs, output):
+    input, gamma, beta, running_mean, running_var, training, momentum, eps = inputs
+    _, save_mean, save_invstd, _, _ = output
+    ctx.training = training
+    ctx.save_for_backward(input, gamma, save_mean, save_invstd)
+
+
+def _batchnorm_forward_backward(ctx, grad_output, *grad_auxiliary_outputs):
+    # save_mean / save_invstd and the running statistics are auxiliary outputs;
+    # their gradients are ignored
+    input, gamma, save_mean, save_invstd = ctx.saved_tensors
+    if ctx.training:
+        grad_input, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_backward(
+            grad_output, input, gamma, save_mean, save_invstd
+        )
+    else:
+        grad_input, grad_gamma, grad_beta = _batchnorm_eval_backward(
+            grad_output, input, gamma, save_mean, save_invstd
+        )
+    return grad_input, grad_gamma, grad_beta, None, None, None, None, None
+
+
+batchnorm_forward_functional.register_autograd(
+    _batchnorm_forward_backward, setup_context=_batchnorm_forward_setup_context
+)
+
+
+def batchnorm(input, gamma, beta, running_mean, running_var, training=True, momentum=0.1, eps=1e-5):
+    """Differentiable BatchNorm built on the functional op; traceable by torch.compile.
+
+    The running statistics are written back in place, like batchnorm_forward.
+    """
+    output, _, _, new_running_mean, new_running_var = torch.ops.my_ops.batchnorm_forward_functional(
+        input, gamma, beta, running_mean, running_var, training, momentum, eps
+    )
+    if training:
+        running_mean.copy_(new_running_mean.detach())
+        running_var.copy_(new_running_var.detach())
+    return output
 
 
 # Step 2: Connect forward and backward with autograd
 class BatchNormCustom(torch.autograd.Function):
     @staticmethod
-    def forward(ctx, input, gamma, beta, running_mean, running_var, training, momentum, eps):
+    def forward(ctx, input, gamma, beta, running_mean, running_var, training, momentum, eps,
+                memory_policy="recompute"):
+        if memory_policy not in MEMORY_POLICIES:
+            raise ValueError(f"memory_policy must be one of {MEMORY_POLICIES}, got {memory_policy!r}")
+
         output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_forward(
             input, gamma, beta, running_mean, running_var, training, momentum, eps
         )
-        ctx.save_for_backward(input, gamma, save_mean, save_invstd)
+
+        ctx.memory_policy = memory_policy
+        ctx.training = training
+        if training and memory_policy.startswith("xhat"):
+            # Store x_hat = input * invstd - mean * invstd instead of the input
+            shape = _channel_shape(input)
+            x_hat_dtype = torch.bfloat16 if memory_policy == "xhat_bf16" else input.dtype
+            x_hat = torch.empty_like(input, dtype=x_hat_dtype)
+            torch.addcmul(
+                (-save_mean * save_invstd).view(shape), input, save_invstd.view(shape), out=x_hat
+            )
+            ctx.save_for_backward(x_hat, gamma, save_invstd)
+        else:
+            ctx.save_for_backward(input, gamma, save_mean, save_invstd)
         return output
 
     @staticmethod
     def backward(ctx, grad_output):
-        input, gamma, save_mean, save_invstd = ctx.saved_tensors
-        grad_input, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_backward(
-            grad_output, input, gamma, save_mean, save_invstd
-        )
-        return grad_input, grad_gamma, grad_beta, None, None, None, None, None
\ No newline at end of file
+        if not ctx.training:
+            grad_input, grad_gamma, grad_beta = _batchnorm_eval_backward(grad_output, *ctx.saved_tensors)
+        elif ctx.memory_policy.startswith("xhat"):
+            x_hat, gamma, save_invstd = ctx.saved_tensors
+            grad_input, grad_gamma, grad_beta = torch.ops.my_ops.batchnorm_backward_xhat(
+                grad_output, x_hat, gamma, save_invstd
+            )
+        else:
+            input, gamma, save_mean, save_invstd = ctx.saved_tensors
+            backward_op = (
+                torch.ops.my_ops.batchnorm_backward_fused
+                if ctx.memory_policy == "fused"
+                else torch.ops.my_ops.batchnorm_backward
+            )
+            grad_input, grad_gamma, grad_beta = backward_op(
+                grad_output, input, gamma, save_mean, save_invstd
+            )
+        return grad_input, grad_gamma, grad_beta, None, None, None, None, None, None
+
+
+# Activation-sized temporaries alive at the peak of each backward implementation,
+# not counting grad_output (owned by the caller) and grad_input (the result).
+# "recompute" holds normalized_input, grad_normalized and two product temporaries.
+_BACKWARD_WORKSPACE_BUFFERS = {"recompute": 4, "fused": 0, "xhat": 0, "xhat_bf16": 0}
+
+
+def backward_memory_footprint(
+    input_shape: Sequence[int],
+    dtype: torch.dtype = torch.float32,
+    memory_policy: str = "recompute",
+) -> Dict[str, int]:
+    """Report the activation memory (in bytes) one BatchNormCustom layer needs for backward.
+
+    ``saved_bytes`` is kept alive between forward and backward, ``workspace_bytes``
+    is the peak of temporaries inside backward and ``peak_bytes`` adds grad_input.
+    """
+    if memory_policy not in MEMORY_POLICIES:
+        raise ValueError(f"memory_policy must be one of {MEMORY_POLICIES}, got {memory_policy!r}")
+
+    numel = 1
+    for size in input_shape:
+        numel *= size
+    itemsize = torch.empty((), dtype=dtype).element_size()
+    saved_itemsize = 2 if memory_policy == "xhat_bf16" else itemsize
+
+    saved_bytes = numel * saved_itemsize
+    workspace_bytes = _BACKWARD_WORKSPACE_BUFFERS[memory_policy] * numel * itemsize
+    grad_input_bytes = numel * itemsize
+    return {
+        "saved_bytes": saved_bytes,
+        "workspace_bytes": workspace_bytes,
+        "grad_input_bytes": grad_input_bytes,
+        "peak_bytes": saved_bytes + workspace_bytes + grad_input_bytes,
+    }
@@ -0,0 +1,84 @@
+import asyncio
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214", "server"))
+
+from adapter_registry import ADAPTER_CONFIG, AdapterRegistry
+
+
+class RecordingEngine:
+    """add_lora / remove_lora 로 엔진에 올라간 lora id 를 기록"""
+
+    def __init__(self):
+        self.loaded = set()
+
+    async def add_lora(self, adapter):
+        self.loaded.add(adapter.lora_int_id)
+
+    async def remove_lora(self, adapter):
+        self.loaded.discard(adapter.lora_int_id)
+
+
+def _make_adapter(adapter_dir, name):
+    os.makedirs(os.path.join(adapter_dir, name))
+    with open(os.path.join(adapter_dir, name, ADAPTER_CONFIG), 'w') as f:
+        f.write("{}")
+
+
+def test_scan_and_lru():
+    print("Testing AdapterRegistry scan and recently used adapters...")
+    with tempfile.TemporaryDirectory() as adapter_dir:
+        for name in ("chat_bot", "art_curator"):
+            _make_adapter(adapter_dir, name)
+        os.makedirs(os.path.join(adapter_dir, "not_an_adapter"))
+        registry = AdapterRegistry(adapter_dir, max_loras=1)
+        assert registry.stats()["adapters"] == {"art_curator": 1, "chat_bot": 2}
+        assert "not_an_adapter" not in registry
+
+        _make_adapter(adapter_dir, "docent")
+        assert registry.scan() == ["docent"] and registry.get("docent").lora_int_id == 3
+        assert registry.scan() == []
+
+    assert registry.acquire("missing") is None
+    registry.acquire("chat_bot")
+    registry.acquire("chat_bot")
+    registry.acquire("art_curator")
+    assert registry.stats()["recently_used"] == ["art_curator"] and registry.estimated_loads == 2
+    print("✓ AdapterRegistry scan and recently used adapters PASSED")
+
+
+def test_reload_removes_old_id():
+    print("Testing AdapterRegistry reload...")
+
+    async def run(registry, engine):
+        assert await registry.preload(engine, ["art_curator", "missing"]) == ["art_curator"]
+        ids = []
+        for _ in range(3):
+            lora_req = await registry.reload(engine, "art_curator")
+            await engine.add_lora(registry.acquire("art_curator"))
+            ids.append(lora_req.lora_int_id)
+        assert await registry.reload(engine, "missing") is None
+        return ids
+
+    with tempfile.TemporaryDirectory() as adapter_dir:
+        _make_adapter(adapter_dir, "art_curator")
+        registry = AdapterRegistry(adapter_dir, max_loras=2)
+        engine = RecordingEngine()
+        ids = asyncio.run(run(registry, engine))
+    # reload 마다 새 id, 엔진에는 마지막 id 하나만 남음
+    assert ids == [2, 3, 4]
+    assert engine.loaded == {4}
+    print("✓ AdapterRegistry reload PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_scan_and_lru()
+        test_reload_removes_old_id()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,112 @@
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214", "server"))
+
+from admission import AdmissionController, AdmissionRejected
+
+
+async def _rejection(awaitable):
+    """거절되면 status code, 입장하면 None"""
+    try:
+        await awaitable
+    except AdmissionRejected as e:
+        return e.status_code
+    return None
+
+
+def test_priority_order():
+    print("Testing AdmissionController priority order...")
+
+    async def run():
+        controller = AdmissionController(max_inflight=1, max_queue=8, queue_timeout_s=5.0)
+        await controller.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await controller.acquire(priority)
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name, priority))
+                 for name, priority in [("batch", 2), ("standard-1", 1), ("interactive", 0), ("standard-2", 1)]]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 4
+        for _ in tasks:
+            controller.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        controller.release()
+        assert controller.inflight == 0
+        return order
+
+    order = asyncio.run(run())
+    assert order == ["interactive", "standard-1", "standard-2", "batch"], order
+    print("✓ AdmissionController priority order PASSED")
+
+
+def test_queue_full_and_shed():
+    print("Testing AdmissionController 429 and shedding...")
+
+    async def run():
+        controller = AdmissionController(max_inflight=1, max_queue=2, queue_timeout_s=5.0)
+        await controller.acquire()
+        standard = asyncio.create_task(_rejection(controller.acquire(1)))
+        batch = asyncio.create_task(_rejection(controller.acquire(2)))
+        await asyncio.sleep(0)
+
+        # 대기열이 가득 찼고 더 낮은 우선순위가 없음 -> 즉시 429
+        assert await _rejection(controller.acquire(2)) == 429
+        # 대화형 요청은 batch 대기자를 밀어내고(503) 대기
+        interactive = asyncio.create_task(_rejection(controller.acquire(0)))
+        await asyncio.sleep(0)
+        assert await batch == 503
+
+        # bounded=False 는 대기열 한도에 걸리지 않음
+        unbounded = asyncio.create_task(_rejection(controller.acquire(2, bounded=False)))
+        await asyncio.sleep(0)
+        for _ in range(3):
+            controller.release()
+            await asyncio.sleep(0)
+        assert [await interactive, await standard, await unbounded] == [None, None, None]
+        return controller.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected_full"] == 1 and stats["shed"] == 1
+    assert stats["inflight"] == 1 and stats["queued"] == 0
+    print("✓ AdmissionController 429 and shedding PASSED")
+
+
+def test_queue_timeout_and_ticket():
+    print("Testing AdmissionController timeout and ticket release...")
+
+    async def run():
+        controller = AdmissionController(max_inflight=1, max_queue=4, queue_timeout_s=0.05)
+        ticket = await controller.admit()
+        assert await _rejection(controller.acquire()) == 503
+        assert controller.stats()["queued"] == 0
+
+        ticket.release()
+        ticket.release()                # 두 번째 release 는 무시
+        assert controller.inflight == 0
+
+        # 버려진 ticket 도 자리를 반납
+        await controller.admit()
+        assert controller.inflight == 0
+        return controller.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected_timeout"] == 1 and stats["admitted"] == 2
+    print("✓ AdmissionController timeout and ticket release PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_priority_order()
+        test_queue_full_and_shed()
+        test_queue_timeout_and_ticket()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
@@ -4,7 +4,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from python_custom_ops_bn import BatchNormCustom
+from python_custom_ops_bn import BatchNormCustom, MEMORY_POLICIES, backward_memory_footprint, batchnorm
 
 
 def test_custom_batchnorm():
@@ -98,10 +98,510 @@ def test_inference_mode():
     print(f"✓ Inference test {'PASSED' if diff < 1e-5 else 'FAILED'}")
 
 
+def test_fused_statistics():
+    print("\n" + "=" * 40)
+    print("Testing Single-pass Statistics / Fused Affine")
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    # offset input and non-trivial gamma / beta exercise the folded scale & shift
+    N, C, H, W = 16, 32, 14, 14
+    input_tensor = torch.randn(N, C, H, W, device=device) * 3.0 + 5.0
+    gamma = torch.rand(C, device=device) + 0.5
+    beta = torch.randn(C, device=device)
+    running_mean = torch.zeros(C, device=device)
+    running_var = torch.ones(C, device=device)
+
+    output_custom, save_mean, save_invstd = torch.ops.my_ops.batchnorm_forward(
+        input_tensor, gamma, beta, running_mean, running_var, True, 0.1, 1e-5
+    )
+
+    var_ref, mean_ref = torch.var_mean(input_tensor.double(), dim=[0, 2, 3], unbiased=False)
+    output_ref = torch.nn.functional.batch_norm(
+        input_tensor.double(), None, None, gamma.double(), beta.double(), True, 0.1, 1e-5
+    )
+
+    out_diff = torch.abs(output_custom.double() - output_ref).max().item()
+    mean_diff = torch.abs(save_mean.double() - mean_ref).max().item()
+    invstd_diff = torch.abs(save_invstd.double() - torch.rsqrt(var_ref + 1e-5)).max().item()
+    print(f"   Output max difference: {out_diff:.2e}")
+    print(f"   Mean / invstd max difference: {mean_diff:.2e} / {invstd_diff:.2e}")
+
+    passed = all(diff < 1e-4 for diff in [out_diff, mean_diff, invstd_diff])
+    print(f"✓ Fused statistics test {'PASSED' if passed else 'FAILED'}")
+    assert passed
+
+
+def test_memory_policies():
+    print("\n" + "=" * 40)
+    print("Testing Backward Memory Policies")
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    N, C, H, W = 16, 32, 14, 14
+    input_base = torch.randn(N, C, H, W, device=device) * 2.0 + 1.0
+    gamma_base = torch.rand(C, device=device) + 0.5
+    beta_base = torch.randn(C, device=device)
+    grad_output = torch.randn(N, C, H, W, device=device)
+
+    bn_pytorch = nn.BatchNorm2d(C, eps=1e-5, momentum=0.1, device=device)
+    bn_pytorch.weight.data = gamma_base.clone()
+    bn_pytorch.bias.data = beta_base.clone()
+    input_pytorch = input_base.clone().requires_grad_(True)
+    bn_pytorch(input_pytorch).backward(grad_output)
+
+    all_passed = True
+    for policy in MEMORY_POLICIES:
+        input_custom = input_base.clone().requires_grad_(True)
+        gamma = gamma_base.clone().requires_grad_(True)
+        beta = beta_base.clone().requires_grad_(True)
+        running_mean = torch.zeros(C, device=device)
+        running_var = torch.ones(C, device=device)
+
+        output = BatchNormCustom.apply(input_custom, gamma, beta, running_mean, running_var, True, 0.1, 1e-5, policy)
+        output.backward(grad_output)
+
+        # relative differences; bf16 x_hat trades precision for memory
+        tol = 1e-2 if policy == "xhat_bf16" else 1e-4
+        diffs = [
+            (torch.abs(grad - grad_ref).max() / torch.abs(grad_ref).max()).item()
+            for grad, grad_ref in [
+                (input_custom.grad, input_pytorch.grad),
+                (gamma.grad, bn_pytorch.weight.grad),
+                (beta.grad, bn_pytorch.bias.grad),
+            ]
+        ]
+        footprint = backward_memory_footprint(input_base.shape, input_base.dtype, policy)
+        passed = all(diff < tol for diff in diffs)
+        all_passed = all_passed and passed
+        print(f"   {policy:>10}: max relative grad diff {max(diffs):.2e}, peak {footprint['peak_bytes'] / 2**20:.1f} MiB")
+
+    peaks = {policy: backward_memory_footprint((N, C, H, W), memory_policy=policy)["peak_bytes"] for policy in MEMORY_POLICIES}
+    all_passed = all_passed and peaks["xhat_bf16"] < peaks["fused"] < peaks["recompute"]
+    print(f"✓ Memory policy test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_opcheck():
+    print("\n" + "=" * 40)
+    print("Testing Custom Operator Registration (opcheck)")
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    N, C, H, W = 4, 8, 6, 6
+    input_tensor = torch.randn(N, C, H, W, device=device)
+    gamma = torch.rand(C, device=device) + 0.5
+    beta = torch.randn(C, device=device)
+    grad_output = torch.randn(N, C, H, W, device=device)
+    save_mean = torch.randn(C, device=device)
+    save_invstd = torch.rand(C, device=device) + 0.5
+
+    cases = []
+    for training in (True, False):
+        cases.append((torch.ops.my_ops.batchnorm_forward, (
+            input_tensor, gamma, beta, torch.zeros(C, device=device), torch.ones(C, device=device), training, 0.1, 1e-5
+        )))
+        cases.append((torch.ops.my_ops.batchnorm_forward_functional, (
+            input_tensor.clone().requires_grad_(True), gamma.clone().requires_grad_(True),
+            beta.clone().requires_grad_(True), torch.zeros(C, device=device), torch.ones(C, device=device),
+            training, 0.1, 1e-5
+        )))
+    cases.append((torch.ops.my_ops.batchnorm_backward, (grad_output, input_tensor, gamma, save_mean, save_invstd)))
+    cases.append((torch.ops.my_ops.batchnorm_backward_fused, (grad_output, input_tensor, gamma, save_mean, save_invstd)))
+    cases.append((torch.ops.my_ops.batchnorm_backward_xhat, (grad_output, input_tensor, gamma, save_invstd)))
+
+    for op, args in cases:
+        torch.library.opcheck(op, args)
+        print(f"   {op}: ok")
+    print("✓ opcheck test PASSED")
+
+
+def test_compile():
+    print("\n" + "=" * 40)
+    print("Testing torch.compile (fullgraph, no graph breaks)")
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    C = 8
+
+    class ConvBNReLU(nn.Module):
+        def __init__(self, use_function):
+            super().__init__()
+            self.use_function = use_function
+            self.conv = nn.Conv2d(3, C, 3, padding=1)
+            self.gamma = nn.Parameter(torch.rand(C) + 0.5)
+            self.beta = nn.Parameter(torch.randn(C))
+            self.register_buffer("running_mean", torch.zeros(C))
+            self.register_buffer("running_var", torch.ones(C))
+
+        def forward(self, x):
+            x = self.conv(x)
+            if self.use_function:
+                x = BatchNormCustom.apply(x, self.gamma, self.beta, self.running_mean, self.running_var,
+                                          self.training, 0.1, 1e-5, "fused")
+            else:
+                x = batchnorm(x, self.gamma, self.beta, self.running_mean, self.running_var, self.training, 0.1, 1e-5)
+            return torch.relu(x)
+
+    all_passed = True
+    for use_function in (True, False):
+        for training in (True, False):
+            eager = ConvBNReLU(use_function).to(device).train(training)
+            compiled_model = ConvBNReLU(use_function).to(device).train(training)
+            compiled_model.load_state_dict(eager.state_dict())
+            compiled = torch.compile(compiled_model, backend="aot_eager", fullgraph=True)
+
+            x = torch.randn(4, 3, 10, 10, device=device)
+            out_eager = eager(x)
+            out_compiled = compiled(x)
+            out_eager.square().sum().backward()
+            out_compiled.square().sum().backward()
+
+            diffs = [torch.abs(out_eager - out_compiled).max().item()]
+            diffs += [torch.abs(p_e.grad - p_c.grad).max().item()
+                      for p_e, p_c in zip(eager.parameters(), compiled_model.parameters())]
+            diffs += [torch.abs(b_e - b_c).max().item()
+                      for b_e, b_c in zip(eager.buffers(), compiled_model.buffers())]
+            passed = all(diff < 1e-4 for diff in diffs)
+            all_passed = all_passed and passed
+            name = "BatchNormCustom" if use_function else "batchnorm"
+            print(f"   {name:>15} (training={training}): max diff {max(diffs):.2e}")
+
+    print(f"✓ Compile test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_inference_mode_backward():
+    print("\n" + "=" * 40)
+    print("Testing Inference Mode Backward")
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    N, C, H, W = 4, 8, 6, 6
+    bn_pytorch = nn.BatchNorm2d(C, eps=1e-5, device=device)
+    bn_pytorch.weight.data = torch.rand(C, device=device) + 0.5
+    bn_pytorch.bias.data = torch.randn(C, device=device)
+    bn_pytorch.running_mean.data = torch.randn(C, device=device)
+    bn_pytorch.running_var.data = torch.rand(C, device=device) + 0.5
+    bn_pytorch.eval()
+
+    input_pytorch = torch.randn(N, C, H, W, device=device, requires_grad=True)
+    grad_output = torch.randn(N, C, H, W, device=device)
+    bn_pytorch(input_pytorch).backward(grad_output)
+
+    all_passed = True
+    for use_function in (True, False):
+        input_custom = input_pytorch.detach().clone().requires_grad_(True)
+        gamma = bn_pytorch.weight.detach().clone().requires_grad_(True)
+        beta = bn_pytorch.bias.detach().clone().requires_grad_(True)
+        args = (input_custom, gamma, beta, bn_pytorch.running_mean.clone(), bn_pytorch.running_var.clone(), False, 0.1, 1e-5)
+        output = BatchNormCustom.apply(*args) if use_function else batchnorm(*args)
+        output.backward(grad_output)
+
+        diffs = [
+            torch.abs(input_custom.grad - input_pytorch.grad).max().item(),
+            torch.abs(gamma.grad - bn_pytorch.weight.grad).max().item(),
+            torch.abs(beta.grad - bn_pytorch.bias.grad).max().item(),
+        ]
+        all_passed = all_passed and all(diff < 1e-4 for diff in diffs)
+        print(f"   {'BatchNormCustom' if use_function else 'batchnorm':>15}: max grad diff {max(diffs):.2e}")
+
+    print(f"✓ Inference backward test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_mixed_precision_channels_last():
+    print("\n" + "=" * 40)
+    print("Testing bf16/fp16 Input and channels_last")
+
+    from python_custom_ops_bn import BatchNorm2dCustom, ops
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    N, C, H, W = 8, 16, 12, 12
+
+    # small chunks exercise the merged (chunked) float32 statistics
+    chunk_numel = ops._STATS_CHUNK_NUMEL
+    ops._STATS_CHUNK_NUMEL = C * H * W * 3
+
+    all_passed = True
+    try:
+        for dtype in (torch.bfloat16, torch.float16):
+            for memory_format in (torch.contiguous_format, torch.channels_last):
+                for policy in MEMORY_POLICIES:
+                    input_low = (torch.randn(N, C, H, W, device=device) * 2.0 + 3.0).to(dtype)
+                    input_low = input_low.contiguous(memory_format=memory_format).requires_grad_(True)
+                    input_ref = input_low.detach().double().requires_grad_(True)
+                    grad_output = torch.randn(N, C, H, W, device=device).to(dtype).contiguous(memory_format=memory_format)
+
+                    bn_custom = BatchNorm2dCustom(C, memory_policy=policy).to(device)   # fp32 parameters / buffers
+                    bn_ref = nn.BatchNorm2d(C).to(device).double()
+                    output_low = bn_custom(input_low)
+                    output_ref = bn_ref(input_ref)
+                    output_low.backward(grad_output)
+                    output_ref.backward(grad_output.double())
+
+                    layout_ok = (
+                        output_low.dtype == dtype and input_low.grad.dtype == dtype
+                        and output_low.is_contiguous(memory_format=memory_format)
+                        and input_low.grad.is_contiguous(memory_format=memory_format)
+                        and bn_custom.running_mean.dtype == torch.float32
+                    )
+                    diffs = [
+                        (torch.abs(a.double() - b).max() / torch.abs(b).max()).item()
+                        for a, b in [
+                            (output_low, output_ref),
+                            (input_low.grad, input_ref.grad),
+                            (bn_custom.weight.grad, bn_ref.weight.grad),
+                            (bn_custom.running_mean, bn_ref.running_mean),
+                            (bn_custom.running_var, bn_ref.running_var),
+                        ]
+                    ]
+                    passed = layout_ok and all(diff < 2e-2 for diff in diffs)
+                    all_passed = all_passed and passed
+                    format_name = "channels_last" if memory_format == torch.channels_last else "contiguous"
+                    print(f"   {str(dtype):>14} {format_name:>13} {policy:>10}: "
+                          f"layout {'ok' if layout_ok else 'WRONG'}, max relative diff {max(diffs):.2e}")
+    finally:
+        ops._STATS_CHUNK_NUMEL = chunk_numel
+
+    print(f"✓ Mixed precision test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_mixed_precision_large_mean():
+    print("\n" + "=" * 40)
+    print("Testing bf16/fp16 Gradients with Large Channel Means")
+
+    from python_custom_ops_bn import BatchNorm2dCustom
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    N, C, H, W = 8, 16, 12, 12
+
+    # sum(dy * x_hat) must not be formed as sum(dy * x) - mean * sum(dy) in low precision:
+    # the cancellation grows with |mean| / std. Policies that save the input are
+    # held to float32 accuracy; "xhat" / "xhat_bf16" store x_hat itself rounded, which
+    # bounds them by the storage precision regardless of the mean.
+    configs = [(policy, dict(memory_policy=policy)) for policy in MEMORY_POLICIES]
+    configs.append(("chunked", dict(chunk_size=3)))
+    tolerance = {"xhat": 1e-2, "xhat_bf16": 1e-2}
+
+    all_passed = True
+    for dtype in (torch.bfloat16, torch.float16):
+        for offset in (100.0, 1000.0):
+            channel_mean = torch.linspace(-offset, offset, C, device=device).view(1, C, 1, 1)
+            for name, kwargs in configs:
+                for training in (True, False):
+                    input_low = (torch.randn(N, C, H, W, device=device) * 2.0 + channel_mean).to(dtype)
+                    input_low.requires_grad_(True)
+                    input_ref = input_low.detach().double().requires_grad_(True)
+                    grad_output = torch.randn(N, C, H, W, device=device).to(dtype)
+
+                    bn_custom = BatchNorm2dCustom(C, **kwargs).to(device)
+                    bn_ref = nn.BatchNorm2d(C).to(device).double()
+                    if not training:
+                        with torch.no_grad():
+                            bn_ref.running_mean.copy_(channel_mean.flatten())
+                            bn_custom.running_mean.copy_(channel_mean.flatten())
+                        bn_custom.eval()
+                        bn_ref.eval()
+                    bn_custom(input_low).backward(grad_output)
+                    bn_ref(input_ref).backward(grad_output.double())
+
+                    diff = (torch.abs(bn_custom.weight.grad.double() - bn_ref.weight.grad).max()
+                            / torch.abs(bn_ref.weight.grad).max()).item()
+                    passed = diff < tolerance.get(name, 1e-4) if training else diff < 1e-4
+                    all_passed = all_passed and passed
+                    print(f"   {str(dtype):>14} mean ±{offset:<6g} {name:>10} {'train' if training else 'eval':>5}: "
+                          f"grad_gamma relative diff {diff:.2e} {'✓' if passed else '✗'}")
+
+    print(f"✓ Large mean test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_chunked():
+    print("\n" + "=" * 40)
+    print("Testing Chunked / Ghost-Batch Statistics")
+
+    from python_custom_ops_bn import BatchNorm2dCustom
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    N, C, H, W = 10, 8, 6, 6
+    chunk_size = 3   # does not divide N, so the last chunk is smaller
+
+    input_base = torch.randn(N, C, H, W, device=device) * 2.0 + 1.0
+    grad_output = torch.randn(N, C, H, W, device=device)
+
+    def run(layers, inputs):
+        inputs = [x.detach().requires_grad_(True) for x in inputs]
+        output = torch.cat([layer(x) for layer, x in zip(layers, inputs)])
+        output.backward(grad_output)
+        return output, torch.cat([x.grad for x in inputs])
+
+    all_passed = True
+    for ghost in (False, True):
+        bn_chunked = BatchNorm2dCustom(C, chunk_size=chunk_size, ghost=ghost).to(device)
+        bn_ref = nn.BatchNorm2d(C).to(device)
+        with torch.no_grad():
+            bn_ref.weight.uniform_(0.5, 1.5)
+            bn_ref.bias.uniform_(-0.5, 0.5)
+            bn_chunked.weight.copy_(bn_ref.weight)
+            bn_chunked.bias.copy_(bn_ref.bias)
+
+        output_chunked, grad_chunked = run([bn_chunked], [input_base])
+        if ghost:
+            # ghost batch norm == the reference applied to every chunk as its own batch
+            chunks = input_base.split(chunk_size)
+            output_ref, grad_ref = run([bn_ref] * len(chunks), chunks)
+        else:
+            output_ref, grad_ref = run([bn_ref], [input_base])
+
+        diffs = [
+            torch.abs(a - b).max().item()
+            for a, b in [
+                (output_chunked, output_ref),
+                (grad_chunked, grad_ref),
+                (bn_chunked.weight.grad, bn_ref.weight.grad),
+                (bn_chunked.bias.grad, bn_ref.bias.grad),
+                (bn_chunked.running_mean, bn_ref.running_mean),
+                (bn_chunked.running_var, bn_ref.running_var),
+            ]
+        ]
+        passed = all(diff < 1e-4 for diff in diffs)
+        all_passed = all_passed and passed
+        print(f"   ghost={ghost!s:>5}: max diff {max(diffs):.2e}")
+
+    input_tensor = torch.randn(N, C, H, W, device=device)
+    gamma = torch.rand(C, device=device) + 0.5
+    for training in (True, False):
+        for ghost in (False, True):
+            output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_forward_chunked(
+                input_tensor, gamma, torch.randn(C, device=device), torch.zeros(C, device=device),
+                torch.ones(C, device=device), training, 0.1, 1e-5, chunk_size, ghost
+            )
+            torch.library.opcheck(torch.ops.my_ops.batchnorm_forward_chunked, (
+                input_tensor, gamma, torch.randn(C, device=device), torch.zeros(C, device=device),
+                torch.ones(C, device=device), training, 0.1, 1e-5, chunk_size, ghost
+            ))
+            if training:
+                torch.library.opcheck(torch.ops.my_ops.batchnorm_backward_chunked, (
+                    grad_output, input_tensor, gamma, save_mean, save_invstd, chunk_size, ghost
+                ))
+
+    print(f"✓ Chunked statistics test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_fused_activation():
+    print("\n" + "=" * 40)
+    print("Testing Fused BatchNorm + ReLU (+ Add)")
+
+    from python_custom_ops_bn import BatchNormAddReLUCustom, BatchNormReLUCustom
+
+    torch.manual_seed(0)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    N, C, H, W = 4, 8, 6, 6
+
+    all_passed = True
+    for with_residual in (False, True):
+        for training in (True, False):
+            for memory_format in (torch.contiguous_format, torch.channels_last):
+                input_base = (torch.randn(N, C, H, W, device=device) + 0.5).contiguous(memory_format=memory_format)
+                residual_base = torch.randn_like(input_base)
+                grad_output = torch.randn_like(input_base)
+
+                bn_ref = nn.BatchNorm2d(C).to(device).train(training)
+                with torch.no_grad():
+                    bn_ref.weight.uniform_(0.5, 1.5)
+                    bn_ref.bias.uniform_(-0.5, 0.5)
+                    bn_ref.running_mean.uniform_(-0.5, 0.5)
+                    bn_ref.running_var.uniform_(0.5, 1.5)
+                gamma = bn_ref.weight.detach().clone().requires_grad_(True)
+                beta = bn_ref.bias.detach().clone().requires_grad_(True)
+                running_mean = bn_ref.running_mean.clone()
+                running_var = bn_ref.running_var.clone()
+
+                input_custom = input_base.clone().requires_grad_(True)
+                residual_custom = residual_base.clone().requires_grad_(True)
+                input_ref = input_base.clone().requires_grad_(True)
+                residual_ref = residual_base.clone().requires_grad_(True)
+
+                if with_residual:
+                    output_custom = BatchNormAddReLUCustom.apply(
+                        input_custom, residual_custom, gamma, beta, running_mean, running_var, training, 0.1, 1e-5
+                    )
+                    output_ref = torch.relu(bn_ref(input_ref) + residual_ref)
+                else:
+                    output_custom = BatchNormReLUCustom.apply(
+                        input_custom, gamma, beta, running_mean, running_var, training, 0.1, 1e-5
+                    )
+                    output_ref = torch.relu(bn_ref(input_ref))
+                output_custom.backward(grad_output)
+                output_ref.backward(grad_output)
+
+                pairs = [
+                    (output_custom, output_ref),
+                    (input_custom.grad, input_ref.grad),
+                    (gamma.grad, bn_ref.weight.grad),
+                    (beta.grad, bn_ref.bias.grad),
+                    (running_mean, bn_ref.running_mean),
+                    (running_var, bn_ref.running_var),
+                ]
+                if with_residual:
+                    pairs.append((residual_custom.grad, residual_ref.grad))
+                diffs = [torch.abs(a - b).max().item() for a, b in pairs]
+                layout_ok = output_custom.is_contiguous(memory_format=memory_format) and \
+                    input_custom.grad.is_contiguous(memory_format=memory_format)
+                passed = layout_ok and all(diff < 1e-4 for diff in diffs)
+                all_passed = all_passed and passed
+                name = "bn+add+relu" if with_residual else "bn+relu"
+                format_name = "channels_last" if memory_format == torch.channels_last else "contiguous"
+                print(f"   {name:>11} {'train' if training else 'eval':>5} {format_name:>13}: "
+                      f"layout {'ok' if layout_ok else 'WRONG'}, max diff {max(diffs):.2e}")
+
+    input_tensor = torch.randn(N, C, H, W, device=device)
+    residual = torch.randn(N, C, H, W, device=device)
+    grad_output = torch.randn(N, C, H, W, device=device)
+    gamma = torch.rand(C, device=device) + 0.5
+    beta = torch.randn(C, device=device)
+    output, save_mean, save_invstd = torch.ops.my_ops.batchnorm_add_relu_forward(
+        input_tensor, residual, gamma, beta, torch.zeros(C, device=device), torch.ones(C, device=device), True, 0.1, 1e-5
+    )
+    for training in (True, False):
+        torch.library.opcheck(torch.ops.my_ops.batchnorm_relu_forward, (
+            input_tensor, gamma, beta, torch.zeros(C, device=device), torch.ones(C, device=device), training, 0.1, 1e-5
+        ))
+        torch.library.opcheck(torch.ops.my_ops.batchnorm_add_relu_forward, (
+            input_tensor, residual, gamma, beta, torch.zeros(C, device=device), torch.ones(C, device=device),
+            training, 0.1, 1e-5
+        ))
+    backward_args = (grad_output, output, input_tensor, gamma, save_mean, save_invstd)
+    torch.library.opcheck(torch.ops.my_ops.batchnorm_relu_backward, backward_args)
+    torch.library.opcheck(torch.ops.my_ops.batchnorm_add_relu_backward, backward_args)
+
+    print(f"✓ Fused activation test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
 if __name__ == "__main__":
     try:
         test_custom_batchnorm()
         test_inference_mode()
+        test_fused_statistics()
+        test_memory_policies()
+        test_opcheck()
+        test_compile()
+        test_inference_mode_backward()
+        test_mixed_precision_channels_last()
+        test_mixed_precision_large_mean()
+        test_chunked()
+        test_fused_activation()
         print("\n" + "=" * 40)
         print("All tests completed!")
     except Exception as e:
@@ -0,0 +1,98 @@
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_custom_ops_bn import BatchNorm2dCustom, SyncBatchNormCustom, convert_sync_batchnorm
+
+WORLD_SIZE = 2
+N, C, H, W = 8, 16, 7, 7
+
+
+def _reference():
+    # single-process run on the full (concatenated) batch
+    torch.manual_seed(0)
+    input_full = torch.randn(N, C, H, W) * 2.0 + 1.0
+    grad_output = torch.randn(N, C, H, W)
+    bn = BatchNorm2dCustom(C)
+    bn.weight.data = torch.rand(C) + 0.5
+    bn.bias.data = torch.randn(C)
+    return input_full, grad_output, bn
+
+
+def _worker(rank, init_file):
+    dist.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=WORLD_SIZE)
+    try:
+        input_full, grad_output, bn_reference = _reference()
+        bn_sync = convert_sync_batchnorm(BatchNorm2dCustom(C))
+        bn_sync.load_state_dict(bn_reference.state_dict())
+
+        input_reference = input_full.clone().requires_grad_(True)
+        output_reference = bn_reference(input_reference)
+        output_reference.backward(grad_output)
+
+        # each rank sees its own shard of the batch
+        shard = slice(rank * N // WORLD_SIZE, (rank + 1) * N // WORLD_SIZE)
+        input_local = input_full[shard].clone().requires_grad_(True)
+        output_local = bn_sync(input_local)
+        output_local.backward(grad_output[shard])
+
+        # parameter gradients are local; summing over ranks gives the full-batch gradient
+        grad_gamma = bn_sync.weight.grad.clone()
+        grad_beta = bn_sync.bias.grad.clone()
+        dist.all_reduce(grad_gamma)
+        dist.all_reduce(grad_beta)
+
+        diffs = [
+            torch.abs(output_local - output_reference[shard]).max().item(),
+            torch.abs(input_local.grad - input_reference.grad[shard]).max().item(),
+            torch.abs(grad_gamma - bn_reference.weight.grad).max().item(),
+            torch.abs(grad_beta - bn_reference.bias.grad).max().item(),
+            torch.abs(bn_sync.running_mean - bn_reference.running_mean).max().item(),
+            torch.abs(bn_sync.running_var - bn_reference.running_var).max().item(),
+        ]
+        if rank == 0:
+            print(f"   Max difference vs. single process: {max(diffs):.2e}")
+        assert isinstance(bn_sync, SyncBatchNormCustom)
+        assert all(diff < 1e-4 for diff in diffs), diffs
+    finally:
+        dist.destroy_process_group()
+
+
+def test_sync_batchnorm():
+    print("Testing SyncBatchNormCustom (gloo, 2 processes)")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mp.spawn(_worker, args=(os.path.join(tmp, "init"),), nprocs=WORLD_SIZE, join=True)
+    print("✓ SyncBatchNorm test PASSED")
+
+
+def test_sync_batchnorm_single_process():
+    print("\n" + "=" * 40)
+    print("Testing SyncBatchNormCustom without a process group")
+
+    torch.manual_seed(0)
+    input_tensor = torch.randn(4, C, 5, 5)
+    bn_sync = SyncBatchNormCustom(C)
+    bn_pytorch = nn.BatchNorm2d(C)
+    diff = torch.abs(bn_sync(input_tensor) - bn_pytorch(input_tensor)).max().item()
+    print(f"   Max difference: {diff:.2e}")
+    assert diff < 1e-5
+    print("✓ Local fallback test PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_sync_batchnorm()
+        test_sync_batchnorm_single_process()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
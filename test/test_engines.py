@@ -0,0 +1,123 @@
+import asyncio
+import time
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214", "server"))
+
+from adapter_registry import AdapterRequest
+from engines import SimulatedEngine, simulated_tokenize
+
+
+def _engine(engine_args=None, **costs):
+    # 기본은 비용 0 -> step 수만 확인
+    kwargs = dict(step_overhead_s=0.0, prefill_s_per_token=0.0, decode_s_per_step=0.0,
+                  decode_s_per_seq=0.0, lora_load_s=0.0)
+    kwargs.update(costs)
+    return SimulatedEngine(engine_args or {}, **kwargs)
+
+
+async def _generate(engine, prompt, request_id, max_tokens=8, adapter=None, seed=None):
+    final = None
+    async for request_output in engine.generate(prompt, {"temperature": 0.0, "max_tokens": max_tokens, "seed": seed},
+                                                request_id, adapter):
+        final = request_output
+    return final
+
+
+def test_deterministic_output():
+    print("Testing SimulatedEngine deterministic output...")
+
+    async def run():
+        engine = _engine()
+        a = await _generate(engine, "water lilies", "r1")
+        b = await _generate(engine, "water lilies", "r2")
+        c = await _generate(engine, "water lilies", "r3", seed=7)
+        return a, b, c
+
+    a, b, c = asyncio.run(run())
+    assert a.finished and len(a.outputs[0].token_ids) == 8
+    assert a.prompt_token_ids == simulated_tokenize("water lilies")
+    assert a.outputs[0].text == b.outputs[0].text
+    assert a.outputs[0].text != c.outputs[0].text
+    print("✓ SimulatedEngine deterministic output PASSED")
+
+
+def test_continuous_batching():
+    print("Testing SimulatedEngine continuous batching...")
+    decode_s, num_requests, max_tokens = 0.02, 8, 10
+
+    async def run():
+        engine = _engine(decode_s_per_step=decode_s)
+        t0 = time.perf_counter()
+        outputs = await asyncio.gather(*[_generate(engine, f"prompt {i}", f"r{i}", max_tokens)
+                                         for i in range(num_requests)])
+        return outputs, time.perf_counter() - t0
+
+    outputs, elapsed = asyncio.run(run())
+    serial = num_requests * max_tokens * decode_s
+    print(f"   {num_requests} requests in {elapsed:.3f}s (one at a time: {serial:.3f}s)")
+    assert all(o.finished for o in outputs)
+    # 모든 요청이 같은 decode step 을 공유
+    assert elapsed < serial / 2
+    print("✓ SimulatedEngine continuous batching PASSED")
+
+
+def test_max_loras_and_abort():
+    print("Testing SimulatedEngine max_loras and abort...")
+
+    async def run():
+        engine = _engine({"max_loras": 1})
+        adapters = [AdapterRequest(name, i, f"/adapters/{name}") for i, name in enumerate(["a", "b"], 1)]
+        tasks = [asyncio.create_task(_generate(engine, "same prompt", f"r{i}", 4, adapter))
+                 for i, adapter in enumerate(adapters)]
+        a, b = await asyncio.gather(*tasks)
+
+        stream = asyncio.create_task(_generate(engine, "long prompt", "long", 100000))
+        await asyncio.sleep(0.01)
+        await engine.abort("long")
+        aborted = await stream
+        return a, b, aborted, engine
+
+    a, b, aborted, engine = asyncio.run(run())
+    assert a.outputs[0].text != b.outputs[0].text       # 어댑터마다 다른 출력
+    # 한 batch 에 어댑터 하나 -> b 는 a 가 끝난 뒤 스케줄됨
+    assert b.metrics.first_scheduled_time >= a.metrics.finished_time
+    assert aborted is None or not aborted.finished
+    assert not engine._requests and not engine._running and not engine._waiting
+    print("✓ SimulatedEngine max_loras and abort PASSED")
+
+
+def test_prefix_cache():
+    print("Testing SimulatedEngine prefix cache...")
+    prefix = " ".join(f"w{i}" for i in range(40))      # 40 토큰 -> 꽉 찬 블록 2개 (block_size 16)
+
+    async def run(engine_args):
+        engine = _engine(engine_args)
+        adapter = AdapterRequest("a", 1, "/adapters/a")
+        first = await _generate(engine, prefix + " first question", "r1")
+        second = await _generate(engine, prefix + " second question", "r2")
+        other_adapter = await _generate(engine, prefix + " third question", "r3", adapter=adapter)
+        return first, second, other_adapter
+
+    first, second, other_adapter = asyncio.run(run({"enable_prefix_caching": True}))
+    assert first.num_cached_tokens == 0
+    assert second.num_cached_tokens == 32
+    assert other_adapter.num_cached_tokens == 0        # 어댑터가 다르면 KV 도 다름
+
+    _, second, _ = asyncio.run(run({"enable_prefix_caching": False}))
+    assert second.num_cached_tokens == 0
+    print("✓ SimulatedEngine prefix cache PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_deterministic_output()
+        test_continuous_batching()
+        test_max_loras_and_abort()
+        test_prefix_cache()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
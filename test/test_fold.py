@@ -0,0 +1,118 @@
+import torch
+import torch.nn as nn
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_custom_ops_bn import BatchNorm2dCustom, FoldedBatchNorm, fold_batchnorm, verify_folding
+
+
+def _randomize_batchnorm(model):
+    # non-trivial running statistics and affine parameters
+    for module in model.modules():
+        if isinstance(module, nn.modules.batchnorm._BatchNorm):
+            C = module.num_features
+            module.running_mean.copy_(torch.randn(C))
+            module.running_var.copy_(torch.rand(C) + 0.5)
+            module.weight.data = torch.rand(C) + 0.5
+            module.bias.data = torch.randn(C)
+
+
+class Block(nn.Module):
+    """Non-Sequential block: the conv -> bn pair is only known by name."""
+
+    def __init__(self, C):
+        super().__init__()
+        self.conv = nn.Conv2d(C, C, 3, padding=1, bias=False)
+        self.bn = BatchNorm2dCustom(C)
+
+    def forward(self, x):
+        return torch.relu(self.bn(self.conv(x))) + x
+
+
+def test_fold_sequential():
+    print("Testing Conv2d + BatchNormCustom Folding")
+    print("=" * 40)
+
+    torch.manual_seed(0)
+    C = 16
+    model = nn.Sequential(
+        BatchNorm2dCustom(3),                     # nothing to fold into -> FoldedBatchNorm
+        nn.Conv2d(3, C, 3, padding=1),
+        BatchNorm2dCustom(C),
+        nn.ReLU(),
+        nn.Conv2d(C, C, 3, padding=1, bias=False),
+        nn.BatchNorm2d(C),
+        Block(C),
+        nn.Flatten(),
+        nn.Linear(C * 8 * 8, 10),
+        nn.BatchNorm1d(10),
+    )
+    _randomize_batchnorm(model)
+    model.eval()
+
+    x = torch.randn(4, 3, 8, 8)
+    folded = fold_batchnorm(model, pairs=[("6.conv", "6.bn")], example_inputs=(x,))
+    max_diff = verify_folding(model, folded, x)
+    print(f"   Max difference: {max_diff:.2e}")
+
+    remaining = [m for m in folded.modules() if isinstance(m, nn.modules.batchnorm._BatchNorm)]
+    scale_shift = [m for m in folded.modules() if isinstance(m, FoldedBatchNorm)]
+    print(f"   Remaining BatchNorm layers: {len(remaining)}, cached scale/shift layers: {len(scale_shift)}")
+
+    # the input model is left untouched
+    passed = not remaining and len(scale_shift) == 1 and isinstance(model[2], BatchNorm2dCustom)
+    print(f"✓ Folding test {'PASSED' if passed else 'FAILED'}")
+    assert passed
+
+
+def test_fold_requires_eval():
+    print("\n" + "=" * 40)
+    print("Testing Folding Rejects Training Mode")
+
+    model = nn.Sequential(nn.Conv2d(3, 4, 3), BatchNorm2dCustom(4))
+    try:
+        fold_batchnorm(model)
+    except ValueError:
+        print("✓ Training-mode model rejected")
+    else:
+        raise AssertionError("fold_batchnorm accepted a model in training mode")
+
+
+
+def test_folded_batchnorm_backward():
+    print("\n" + "=" * 40)
+    print("Testing FoldedBatchNorm after a Trainable Layer")
+
+    torch.manual_seed(0)
+    C = 8
+    conv = nn.Conv2d(3, C, 3, padding=1)
+    bn = nn.BatchNorm2d(C)
+    _randomize_batchnorm(bn)
+    bn.eval()
+    folded = FoldedBatchNorm.from_batchnorm(bn)
+
+    # gradients flow through the folded affine to the layer before it
+    x = torch.randn(2, 3, 6, 6)
+    folded(conv(x)).sum().backward()
+    grad_folded = conv.weight.grad.clone()
+    conv.weight.grad = None
+    bn(conv(x)).sum().backward()
+
+    diff = torch.abs(grad_folded - conv.weight.grad).max().item()
+    print(f"   conv weight grad max diff {diff:.2e}")
+    assert diff < 1e-4
+    print("✓ Folded BatchNorm backward PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_fold_sequential()
+        test_fold_requires_eval()
+        test_folded_batchnorm_backward()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
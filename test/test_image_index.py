@@ -0,0 +1,83 @@
+import io
+import random
+import tempfile
+import numpy as np
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214"))
+
+from PIL import Image
+
+from image_index import HASH_BITS, MAX_DISTANCE, ImageHashIndex, dhash
+
+
+def _flip(value, n, rng):
+    for p in rng.sample(range(HASH_BITS), n):
+        value ^= 1 << p
+    return value
+
+
+def test_query_matches_linear_scan():
+    print("Testing ImageHashIndex against linear scan...")
+    rng = random.Random(0)
+    index = ImageHashIndex()
+    hashes = {}
+    for i in range(2000):
+        hashes[f"a{i:04d}"] = rng.getrandbits(HASH_BITS)
+    # 일부는 다른 작품의 near-duplicate
+    for i in range(200):
+        hashes[f"d{i:04d}"] = _flip(hashes[f"a{i:04d}"], rng.randint(0, MAX_DISTANCE), rng)
+    for pid, value in hashes.items():
+        index.add(pid, value)
+
+    for i in range(300):
+        query = _flip(hashes[f"a{i:04d}"], rng.randint(0, MAX_DISTANCE), rng) if i % 2 else rng.getrandbits(HASH_BITS)
+        expected = sorted(((value ^ query).bit_count(), pid) for pid, value in hashes.items()
+                          if (value ^ query).bit_count() <= MAX_DISTANCE)
+        assert index.query(query, k=5) == [(pid, d) for d, pid in expected[:5]]
+    print("✓ ImageHashIndex linear scan PASSED")
+
+
+def test_near_duplicate_image():
+    print("Testing ImageHashIndex near-duplicate image lookup...")
+    rng = np.random.default_rng(0)
+    images = {}
+    for i in range(20):
+        # 부드러운 무늬 (노이즈를 크게 늘린 것) -> 크기 변경 / 재압축에도 해시가 안정적
+        pixels = rng.integers(0, 256, size=(6, 6, 3), dtype=np.uint8)
+        images[f"art{i:02d}"] = Image.fromarray(pixels).resize((240, 180), Image.BICUBIC)
+    index = ImageHashIndex()
+    for pid, image in images.items():
+        index.add(pid, dhash(image.copy()))
+
+    # 업로드: 크기를 바꾸고 JPEG 로 다시 저장한 사본
+    buffer = io.BytesIO()
+    images["art07"].resize((173, 130)).save(buffer, format="JPEG", quality=60)
+    buffer.seek(0)
+    with Image.open(buffer) as upload:
+        matches = index.query(dhash(upload), k=3)
+    print(f"   matches: {matches}")
+    assert matches and matches[0][0] == "art07"
+
+    # 저장 / 불러오기 후에도 같은 결과, 삭제한 작품은 찾지 않음
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, "image_hashes.json")
+        index.save(path)
+        loaded = ImageHashIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.query(index._hashes["art07"]) == [("art07", 0)]
+    loaded.remove("art07")
+    assert all(pid != "art07" for pid, _ in loaded.query(index._hashes["art07"], k=20))
+    print("✓ ImageHashIndex near-duplicate image lookup PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_query_matches_linear_scan()
+        test_near_duplicate_image()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,74 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214"))
+
+from inference_client import InferenceClient, InferenceError
+
+# 요청 prompt -> /generate_stream 응답 본문의 data: 줄들
+STREAMS = {
+    "ok": [json.dumps({"delta": " hello"}), json.dumps({"delta": " world"}),
+           json.dumps({"done": True, "usage": {"completion_tokens": 2}})],
+    "malformed": [json.dumps({"delta": " hello"}), "{not json"],
+    "server_error": [json.dumps({"error": "engine failed"})],
+}
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if body["prompt"] not in STREAMS:
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"detail": "queue is full"}).encode())
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for line in STREAMS[body["prompt"]]:
+            self.wfile.write(f"data: {line}\n\n".encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def _stream_error(client, prompt):
+    try:
+        client.stream(prompt, max_tokens=2).result()
+    except InferenceError as e:
+        return str(e)
+    return None
+
+
+def test_stream_errors():
+    print("Testing InferenceClient stream errors...")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with InferenceClient(f"http://127.0.0.1:{server.server_port}", retries=0) as client:
+            gen = client.stream("ok", max_tokens=2).result()
+            assert gen.text == " hello world" and gen.usage == {"completion_tokens": 2}
+            assert gen.ttft_s is not None and gen.latency_s >= gen.ttft_s
+
+            # 깨진 data: 줄도 InferenceError (app.py 의 except InferenceError 에서 기록됨)
+            assert "malformed stream event" in _stream_error(client, "malformed")
+            assert _stream_error(client, "server_error") == "engine failed"
+            assert _stream_error(client, "busy") == "HTTP 429: queue is full"
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✓ InferenceClient stream errors PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_stream_errors()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
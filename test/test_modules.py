@@ -0,0 +1,181 @@
+import torch
+import torch.nn as nn
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_custom_ops_bn import BatchNorm1dCustom, BatchNorm2dCustom, BatchNorm3dCustom, convert_model
+
+
+def test_modules_match_pytorch():
+    print("Testing BatchNorm1d/2d/3dCustom against nn.BatchNorm*")
+    print("=" * 40)
+
+    torch.manual_seed(0)
+    cases = [
+        (nn.BatchNorm1d, BatchNorm1dCustom, (16, 8)),
+        (nn.BatchNorm1d, BatchNorm1dCustom, (16, 8, 20)),
+        (nn.BatchNorm2d, BatchNorm2dCustom, (8, 8, 10, 10)),
+        (nn.BatchNorm3d, BatchNorm3dCustom, (4, 8, 4, 6, 6)),
+    ]
+
+    all_passed = True
+    for nn_cls, custom_cls, shape in cases:
+        bn_pytorch = nn_cls(shape[1])
+        bn_custom = custom_cls(shape[1])
+        bn_pytorch.weight.data = torch.rand(shape[1]) + 0.5
+        bn_pytorch.bias.data = torch.randn(shape[1])
+        bn_custom.load_state_dict(bn_pytorch.state_dict())
+
+        input_pytorch = (torch.randn(shape) * 2.0 + 1.0).requires_grad_(True)
+        input_custom = input_pytorch.detach().clone().requires_grad_(True)
+        grad_output = torch.randn(shape)
+
+        # two training steps, then eval
+        diffs = []
+        for _ in range(2):
+            output_pytorch = bn_pytorch(input_pytorch)
+            output_custom = bn_custom(input_custom)
+            output_pytorch.backward(grad_output)
+            output_custom.backward(grad_output)
+            diffs.append(torch.abs(output_custom - output_pytorch).max().item())
+        diffs.append(torch.abs(input_custom.grad - input_pytorch.grad).max().item())
+        diffs.append(torch.abs(bn_custom.weight.grad - bn_pytorch.weight.grad).max().item())
+        for name, buffer in bn_pytorch.named_buffers():
+            diffs.append(torch.abs(getattr(bn_custom, name) - buffer).float().max().item())
+
+        bn_pytorch.eval()
+        bn_custom.eval()
+        with torch.no_grad():
+            diffs.append(torch.abs(bn_custom(input_custom) - bn_pytorch(input_pytorch)).max().item())
+
+        passed = all(diff < 1e-4 for diff in diffs)
+        all_passed = all_passed and passed
+        print(f"   {custom_cls.__name__} {list(shape)}: max diff {max(diffs):.2e}")
+
+    print(f"✓ Module test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+def test_convert_model():
+    print("\n" + "=" * 40)
+    print("Testing convert_model")
+
+    torch.manual_seed(0)
+    model = nn.Sequential(
+        nn.Conv2d(3, 8, 3, padding=1),
+        nn.BatchNorm2d(8),
+        nn.ReLU(),
+        nn.Flatten(),
+        nn.Linear(8 * 6 * 6, 10),
+        nn.BatchNorm1d(10),
+    )
+    x = torch.randn(4, 3, 6, 6)
+    model(x)  # populate running statistics
+    model.eval()
+    with torch.no_grad():
+        expected = model(x)
+
+    reference_state = {k: v.clone() for k, v in model.state_dict().items()}
+    converted = convert_model(model)
+    with torch.no_grad():
+        actual = converted(x)
+
+    custom_layers = [m for m in converted.modules() if isinstance(m, (BatchNorm1dCustom, BatchNorm2dCustom))]
+    state = converted.state_dict()
+    same_state = state.keys() == reference_state.keys() and all(
+        torch.equal(state[k], reference_state[k]) for k in state
+    )
+    diff = torch.abs(actual - expected).max().item()
+    print(f"   Converted layers: {len(custom_layers)}, state_dict compatible: {same_state}")
+    print(f"   Max difference: {diff:.2e}")
+
+    # the converted model loads checkpoints saved from the nn.BatchNorm model
+    converted.load_state_dict(reference_state)
+
+    passed = len(custom_layers) == 2 and same_state and diff < 1e-5
+    print(f"✓ convert_model test {'PASSED' if passed else 'FAILED'}")
+    assert passed
+
+
+def test_eval_cache_invalidation():
+    print("\n" + "=" * 40)
+    print("Testing Eval-mode Scale/Shift Cache")
+
+    torch.manual_seed(0)
+    C = 8
+    bn_pytorch = nn.BatchNorm2d(C).eval()
+    bn_custom = BatchNorm2dCustom(C).eval()
+    x = torch.randn(4, C, 5, 5)
+
+    diffs = []
+    with torch.no_grad():
+        diffs.append(torch.abs(bn_custom(x) - bn_pytorch(x)).max().item())
+        cached = bn_custom._eval_cache
+        bn_custom(x)
+        cache_reused = bn_custom._eval_cache is cached
+
+        # in-place buffer / parameter updates and state_dict loads invalidate the cache
+        for bn in (bn_pytorch, bn_custom):
+            bn.running_mean.add_(1.0)
+            bn.weight.mul_(2.0)
+        diffs.append(torch.abs(bn_custom(x) - bn_pytorch(x)).max().item())
+
+        bn_pytorch.running_var.copy_(torch.rand(C) + 0.5)
+        bn_custom.load_state_dict(bn_pytorch.state_dict())
+        diffs.append(torch.abs(bn_custom(x) - bn_pytorch(x)).max().item())
+
+    print(f"   Cache reused across calls: {cache_reused}")
+    print(f"   Max difference after updates: {max(diffs):.2e}")
+    passed = cache_reused and all(diff < 1e-5 for diff in diffs)
+    print(f"✓ Cache test {'PASSED' if passed else 'FAILED'}")
+    assert passed
+
+
+
+def test_eval_input_grad():
+    print("\n" + "=" * 40)
+    print("Testing Eval-mode Input Gradients (frozen parameters)")
+
+    torch.manual_seed(0)
+    C = 8
+    bn_pytorch = nn.BatchNorm2d(C)
+    bn_pytorch.running_mean.copy_(torch.randn(C))
+    bn_pytorch.running_var.copy_(torch.rand(C) + 0.5)
+    bn_custom = BatchNorm2dCustom(C)
+    bn_custom.load_state_dict(bn_pytorch.state_dict())
+    for bn in (bn_pytorch, bn_custom):
+        bn.eval().requires_grad_(False)   # frozen model: the cached scale / shift path
+
+    all_passed = True
+    for dtype, memory_format in [(torch.float32, torch.contiguous_format), (torch.bfloat16, torch.channels_last)]:
+        # e.g. saliency maps / adversarial inputs: only the input requires grad
+        x = torch.randn(4, C, 5, 5).to(dtype).contiguous(memory_format=memory_format).requires_grad_()
+        x_ref = x.detach().float().requires_grad_()
+        grad_output = torch.randn(4, C, 5, 5)
+        output = bn_custom(x)
+        output.backward(grad_output.to(dtype))
+        bn_pytorch(x_ref).backward(grad_output)
+
+        layout_ok = output.dtype == dtype and output.is_contiguous(memory_format=memory_format)
+        diff = (torch.abs(x.grad.float() - x_ref.grad).max() / torch.abs(x_ref.grad).max()).item()
+        passed = layout_ok and diff < (1e-2 if dtype == torch.bfloat16 else 1e-5)
+        all_passed = all_passed and passed
+        print(f"   {str(dtype):>14}: layout {'ok' if layout_ok else 'WRONG'}, input grad relative diff {diff:.2e}")
+
+    print(f"✓ Eval input grad test {'PASSED' if all_passed else 'FAILED'}")
+    assert all_passed
+
+
+if __name__ == "__main__":
+    try:
+        test_modules_match_pytorch()
+        test_convert_model()
+        test_eval_cache_invalidation()
+        test_eval_input_grad()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
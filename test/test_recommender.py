@@ -0,0 +1,84 @@
+import random
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214"))
+
+from recommender import FACETS, FACET_WEIGHTS, MAX_TERMS, Recommender
+
+
+def _synthetic_db(n=2000, seed=0):
+    # facet 값 개수가 MAX_TERMS 보다 많은 작품도 섞음
+    rng = random.Random(seed)
+    pools = {"artist": 200, "style": 30, "genre": 15, "material": 20}
+    db = {}
+    for i in range(n):
+        many = rng.random() < 0.2
+        metadata = {facet: [f"{facet}{rng.randrange(size)}" for _ in range(rng.randint(0, 6 if many else 2))]
+                    for facet, size in pools.items()}
+        db[f"a{i:05d}"] = {"title": f"Artwork {i}", "metadata": metadata}
+    return db
+
+
+def _brute_force(db, target_id, k):
+    """작품마다 공유 facet 값의 가중치 합을 직접 계산"""
+    target = {facet: set(db[target_id]["metadata"].get(facet, [])) for facet in FACETS}
+    scored = []
+    for pid, info in db.items():
+        if pid == target_id:
+            continue
+        score = sum(FACET_WEIGHTS[facet] * len(target[facet] & set(info["metadata"].get(facet, [])))
+                    for facet in FACETS)
+        if score > 0:
+            scored.append((-score, pid))
+    return [(pid, -neg) for neg, pid in sorted(scored)[:k]]
+
+
+def test_recommend_matches_brute_force():
+    print("Testing Recommender against brute force...")
+    db = _synthetic_db()
+    rec = Recommender(db)
+    ids = sorted(db)
+    many_terms = 0
+    for target_id in random.Random(1).sample(ids, 300):
+        many_terms += sum(len(set(v)) for v in db[target_id]["metadata"].values()) > MAX_TERMS
+        expected = _brute_force(db, target_id, k=5)
+        got = [(r["id"], r["score"]) for r in rec.recommend(target_id, k=5)][:len(expected)]
+        assert got == expected, f"{target_id}: {got} != {expected}"
+    print(f"   300 queries, {many_terms} with more than {MAX_TERMS} facet values")
+    assert many_terms > 0
+    print("✓ Recommender brute force PASSED")
+
+
+def test_recommend_fill_and_sync():
+    print("Testing Recommender fill and sync...")
+    db = {
+        "a": {"title": "A", "metadata": {"artist": ["x"], "style": ["s"]}},
+        "b": {"title": "B", "metadata": {"style": ["s"]}},
+        "c": {"title": "C", "metadata": {"artist": ["x"]}},
+        "d": {"title": "D", "metadata": {"genre": ["g"]}},
+    }
+    rec = Recommender(db)
+    recs = rec.recommend("a", k=3)
+    assert [(r["id"], r["score"], r["shared"]) for r in recs] == \
+        [("c", 3.0, ("artist", "x")), ("b", 2.0, ("style", "s")), ("d", 0.0, None)]
+
+    # b 삭제 + d 가 a 와 같은 artist 로 변경 -> 바뀐 항목만 다시 색인
+    new_db = dict(db)
+    del new_db["b"]
+    new_db["d"] = {"title": "D", "metadata": {"artist": ["x"], "style": ["s"]}}
+    assert rec.sync(new_db) == (1, 1)
+    assert "b" not in rec and len(rec) == 3
+    assert [r["id"] for r in rec.recommend("a", k=2)] == ["d", "c"]
+    print("✓ Recommender fill and sync PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_recommend_matches_brute_force()
+        test_recommend_fill_and_sync()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,59 @@
+import time
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214", "server"))
+
+from response_cache import ResponseCache, make_cache_key
+
+
+def test_lru_eviction():
+    print("Testing ResponseCache LRU eviction...")
+    cache = ResponseCache(max_entries=2, ttl=600.0)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"     # a 를 최근 사용으로 -> 다음 추가 시 b 가 밀려남
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    print("✓ ResponseCache LRU eviction PASSED")
+
+
+def test_ttl_expiration():
+    print("Testing ResponseCache TTL expiration...")
+    cache = ResponseCache(max_entries=8, ttl=0.05)
+    cache.put("a", "A")
+    assert cache.get("a") == "A"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["expirations"] == 1
+
+    # 다시 저장하면 시각이 갱신됨
+    cache.put("a", "A2")
+    assert cache.get("a") == "A2"
+    print("✓ ResponseCache TTL expiration PASSED")
+
+
+def test_cache_key():
+    print("Testing make_cache_key...")
+    key = make_cache_key("chat_bot", "hello", {"temperature": 0.0, "max_tokens": 16})
+    assert key == make_cache_key("chat_bot", "hello", {"max_tokens": 16, "temperature": 0.0})
+    assert key != make_cache_key("art_curator", "hello", {"temperature": 0.0, "max_tokens": 16})
+    assert key != make_cache_key("chat_bot", "hello", {"temperature": 0.0, "max_tokens": 32})
+    assert key != make_cache_key("chat_bot", "hello!", {"temperature": 0.0, "max_tokens": 16})
+    print("✓ make_cache_key PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_lru_eviction()
+        test_ttl_expiration()
+        test_cache_key()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,77 @@
+import math
+import random
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214"))
+
+from run_log import FIELDS, LogHistogram, RunLog, aggregate, iter_runs
+
+
+def _exact_percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * q / 100)) - 1]
+
+
+def test_histogram_percentiles():
+    print("Testing LogHistogram percentiles...")
+    rng = random.Random(0)
+    values = [rng.lognormvariate(-2, 1.5) for _ in range(20000)]
+    histogram = LogHistogram(error=0.01)
+    for v in values:
+        histogram.add(v)
+    for q in (1, 50, 90, 95, 99, 100):
+        exact = _exact_percentile(values, q)
+        approx = histogram.percentile(q)
+        assert abs(approx - exact) / exact <= 0.01 + 1e-9, (q, approx, exact)
+    # 버킷 수는 값의 범위에 로그 비례
+    assert len(histogram.buckets) < 2000
+    assert LogHistogram().percentile(50) is None
+    print("✓ LogHistogram percentiles PASSED")
+
+
+def test_run_log_roundtrip_and_report():
+    print("Testing RunLog write and aggregate...")
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, "runs.jsonl")
+        run_log = RunLog(path, flush_every=8, flush_interval_s=0.05)
+        latencies = {"baseline": [], "optimized": []}
+        for i in range(100):
+            mode = "baseline" if i % 2 else "optimized"
+            latency = rng.uniform(0.5, 2.0) * (2 if mode == "baseline" else 1)
+            latencies[mode].append(latency)
+            run_log.record(mode=mode, adapter="art_curator", ttft_s=latency / 4, latency_s=latency,
+                           prompt_tokens=100, cached_tokens=60 if mode == "optimized" else 0, completion_tokens=11)
+        run_log.record(mode="optimized", adapter="art_curator", status="error", error="timeout")
+        run_log.close()
+        run_log.close()             # 두 번째 close 는 무시
+        assert run_log.written == 101
+
+        runs = list(iter_runs([path]))
+        assert len(runs) == 101 and all(set(run) == set(FIELDS) for run in runs)
+        assert len({run["request_id"] for run in runs}) == 101
+
+        stats = aggregate(runs)
+        summary = {mode: stats[(mode, "*")].summary() for mode in latencies}
+        assert stats[("optimized", "art_curator")].requests == 51
+        assert abs(summary["optimized"]["error_rate"] - 1 / 51) < 1e-9
+        for mode, values in latencies.items():
+            exact = _exact_percentile(values, 95)
+            assert abs(summary[mode]["latency_p95_s"] - exact) / exact <= 0.01 + 1e-9
+        assert summary["optimized"]["prefix_cache_hit_rate"] == 0.6
+        assert summary["baseline"]["prefix_cache_hit_rate"] == 0.0
+        assert not aggregate(runs, adapter="chat_bot")
+    print("✓ RunLog write and aggregate PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_histogram_percentiles()
+        test_run_log_roundtrip_and_report()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
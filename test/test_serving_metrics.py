@@ -0,0 +1,46 @@
+import json
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214", "server"))
+
+from serving_metrics import ServingMetrics
+
+
+def test_metrics_and_request_log():
+    print("Testing ServingMetrics counters and request log...")
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, "request_log.jsonl")
+        metrics = ServingMetrics("optimized", log_path=path)
+        for i in range(100):
+            metrics.record(f"r{i}", "art_curator", "success", prompt_tokens=20, completion_tokens=11,
+                           queue_wait_s=0.001, ttft_s=0.05, e2e_latency_s=0.25, cached_tokens=16)
+        metrics.record("r-err", "chat_bot", "error", prompt_tokens=5, completion_tokens=0,
+                       queue_wait_s=None, ttft_s=None, e2e_latency_s=0.01)
+        metrics.close()
+        metrics.close()             # 두 번째 close 는 무시
+
+        # close() 후에는 모든 요청이 순서대로 파일에 있음
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+    assert [e["request_id"] for e in entries] == [f"r{i}" for i in range(100)] + ["r-err"]
+    assert abs(entries[0]["tpot_s"] - 0.02) < 1e-9 and entries[-1]["tpot_s"] is None
+
+    text = metrics.render()
+    assert 'llm_requests_total{adapter="art_curator",profile="optimized",status="success"} 100' in text
+    assert 'llm_requests_total{adapter="chat_bot",profile="optimized",status="error"} 1' in text
+    assert 'llm_prompt_tokens_cached_total{adapter="art_curator",profile="optimized"} 1600' in text
+    assert 'llm_request_ttft_seconds_bucket{adapter="art_curator",profile="optimized",le="0.05"} 100' in text
+    assert 'llm_request_ttft_seconds_count{adapter="chat_bot"' not in text
+    print("✓ ServingMetrics counters and request log PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_metrics_and_request_log()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
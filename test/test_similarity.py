@@ -0,0 +1,82 @@
+import random
+import tempfile
+import numpy as np
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project-code-1214"))
+
+from similarity import SimilarityIndex, build_index
+
+
+def _synthetic_db(n=500, seed=0):
+    rng = random.Random(seed)
+    pools = {"artist": 60, "style": 12, "genre": 8, "material": 10}
+    return {f"a{i:04d}": {"metadata": {facet: [f"{facet}{rng.randrange(size)}" for _ in range(rng.randint(0, 2))]
+                                       for facet, size in pools.items()}}
+            for i in range(n)}
+
+
+def _dense_top_k(ids, dense, row, k):
+    """밀집 점수 한 행의 상위 k개 (점수 내림차순, 같은 점수면 id 순)"""
+    scores = dense[row].astype(np.float64)
+    scores[row] = -np.inf
+    order = sorted(range(len(ids)), key=lambda c: (-scores[c], ids[c]))[:k]
+    return [(ids[c], scores[c]) for c in order]
+
+
+def test_top_k_matches_dense():
+    print("Testing SimilarityIndex top-k against dense scores...")
+    db = _synthetic_db()
+    with tempfile.TemporaryDirectory() as out_dir:
+        build_index(db, out_dir)
+        index = SimilarityIndex(out_dir)
+        X = index.query_matrix(index.ids)
+        dense = X @ X.T
+
+        # 행마다 L2 정규화 -> 자기 자신과의 cosine = 1
+        nonempty = np.flatnonzero(X.any(axis=1))
+        assert np.allclose(dense[nonempty, nonempty], 1.0, atol=1e-5)
+
+        queries = index.ids[::7]
+        sparse = index.scores(index.query_matrix(queries))
+        rows = [index.row_of[pid] for pid in queries]
+        assert np.allclose(sparse, dense[rows], atol=1e-5)
+
+        k = 10
+        for pid, got in zip(queries, index.top_k_batch(queries, k)):
+            expected = _dense_top_k(index.ids, dense, index.row_of[pid], k)
+            assert len(got) == k and pid not in {other for other, _ in got}
+            assert np.allclose([s for _, s in got], [s for _, s in expected], atol=1e-5)
+            # 같은 점수면 id 순
+            assert got == sorted(got, key=lambda item: (-round(item[1], 5), item[0]))
+
+        # 색인에 없는 작품(메타데이터)으로 조회해도 같은 결과
+        pid = queries[3]
+        assert np.allclose(index.encode([db[pid]]), index.query_matrix([pid]), atol=1e-6)
+        searched = index.search([db[pid]], k + 1)[0]
+        assert [other for other, _ in searched if other != pid][:k] == [other for other, _ in index.top_k(pid, k)]
+    print("✓ SimilarityIndex top-k PASSED")
+
+
+def test_top_k_ties():
+    print("Testing SimilarityIndex tie order...")
+    db = {pid: {"metadata": {"style": ["s"]}} for pid in ("d", "b", "a", "c")}
+    db["e"] = {"metadata": {"style": ["t"]}}
+    with tempfile.TemporaryDirectory() as out_dir:
+        build_index(db, out_dir)
+        index = SimilarityIndex(out_dir, mmap=False)
+        assert [other for other, _ in index.top_k("c", 2)] == ["a", "b"]
+        assert [other for other, _ in index.top_k("c", 10)] == ["a", "b", "d", "e"]
+    print("✓ SimilarityIndex tie order PASSED")
+
+
+if __name__ == "__main__":
+    try:
+        test_top_k_matches_dense()
+        test_top_k_ties()
+        print("\n" + "=" * 40)
+        print("All tests completed!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()